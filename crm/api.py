@@ -0,0 +1,20 @@
+from rest_framework import pagination, serializers
+
+
+class SparseFieldsetMixin:
+    # `?fields=a,b` limits the top-level serializer to the listed fields, nested serializers are left as is.
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        is_root = self.parent is None or isinstance(self.parent, serializers.ListSerializer)
+        if not is_root or request is None or not request.query_params.get('fields'):
+            return fields
+        requested = set(request.query_params['fields'].split(','))
+        return {name: field for name, field in fields.items() if name in requested}
+
+
+class CursorPagination(pagination.CursorPagination):
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
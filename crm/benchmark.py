@@ -0,0 +1,293 @@
+import random
+import re
+import time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.template.backends.django import DjangoTemplates
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from orders import counters, history, page_cache, stats
+from orders.models import Order, OrderWorker, ArchivedOrder
+from users.models import User, Contact
+
+EMAIL_DOMAIN = 'bench.test'
+PASSWORD = 'bench12345'
+CHUNK_SIZE = 5000
+# Share of every status among the generated orders and of NEW orders that already have a worker.
+STATUS_WEIGHTS = {'N': 2, 'P': 2, 'D': 6}
+ASSIGNED_NEW = 0.7
+HISTORY_DAYS = 365
+PERCENTILES = (50, 95, 99)
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def customer_email(number):
+    return f'customer{number}@{EMAIL_DOMAIN}'
+
+
+def worker_email(number):
+    return f'worker{number}@{EMAIL_DOMAIN}'
+
+
+def make_users(emails, is_staff, password):
+    users = [baker.prepare(User, email=email, is_staff=is_staff, is_active=True, password=password)
+             for email in emails]
+    User.objects.bulk_create(users, ignore_conflicts=True)
+    ids = list(User.objects.filter(email__in=emails).order_by('id').values_list('id', flat=True))
+    Contact.objects.bulk_create([baker.prepare(Contact, user_id=user_id)
+                                 for user_id in ids], ignore_conflicts=True)
+    return ids
+
+
+def make_orders(rng, first_id, size, customers, workers, now):
+    orders = []
+    assignments = []
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    for order_id in range(first_id, first_id + size):
+        status = rng.choices(statuses, weights)[0]
+        order = baker.prepare(Order, order_id=order_id, customer_id_id=rng.choice(customers), status=status,
+                              order_type=rng.choice('RMC'), description=f'Benchmark order {order_id}',
+                              created_date=now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400)))
+        orders.append(order)
+        if status != 'N' or rng.random() < ASSIGNED_NEW:
+            assignments.append(OrderWorker(order_id=order, worker_id_id=rng.choice(workers)))
+    with transaction.atomic():
+        Order.objects.bulk_create(orders)
+        OrderWorker.objects.bulk_create(assignments)
+        history.record_status_changes([(order, 'N') for order in orders if order.status != 'N'])
+    return len(orders)
+
+
+def generate(orders, customers=1000, workers=50, chunk_size=CHUNK_SIZE, seed=0, progress=None):
+    # Orders are added to what is already there, the users are created once and reused by later runs.
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)
+    customer_ids = make_users([customer_email(i) for i in range(customers)], False, password)
+    worker_ids = make_users([worker_email(i) for i in range(workers)], True, password)
+    # Explicit keys let the assignments be inserted with the orders on every database.
+    next_id = max(Order.objects.aggregate(pk=Max('order_id'))['pk'] or 0,
+                  ArchivedOrder.objects.aggregate(pk=Max('order_id'))['pk'] or 0) + 1
+    now = timezone.now()
+    created = 0
+    while created < orders:
+        size = min(chunk_size, orders - created)
+        created += make_orders(rng, next_id + created, size, customer_ids, worker_ids, now)
+        if progress:
+            progress(created)
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Order]):
+            cursor.execute(sql)
+    # Bulk inserts skip the signals, the statistics and counters are rebuilt once at the end.
+    stats.rebuild()
+    counters.reconcile()
+    page_cache.invalidate_all()
+    return created
+
+
+class Fixture:
+    # Users and objects the scenarios pick from, the same seed gives the same request sequence.
+
+    def __init__(self, seed=0, sample_size=1000):
+        self.rng = random.Random(seed)
+        users = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}')
+        self.workers = list(users.filter(is_staff=True).order_by('id').values_list('id', flat=True))
+        self.customers = list(users.filter(is_staff=False).order_by('id').values_list('id', flat=True))
+        if not self.workers or not self.customers:
+            raise ValueError('No benchmark data, run `manage.py generate_benchmark_data` first.')
+        self.staff = User.objects.get(id=self.workers[0])
+        self.customer = User.objects.filter(id__in=self.customers).order_by('-orders_count').first()
+        bounds = Order.objects.aggregate(low=Min('order_id'), high=Max('order_id'))
+        if bounds['low'] is None:
+            raise ValueError('No benchmark orders, run `manage.py generate_benchmark_data` first.')
+        candidates = [self.rng.randint(bounds['low'], bounds['high']) for _ in range(sample_size)]
+        self.orders = sorted(Order.objects.filter(order_id__in=candidates).values_list('order_id', flat=True))
+
+    def order(self):
+        return self.rng.choice(self.orders)
+
+    def order_form(self, order_id):
+        order = Order.objects.select_related('orderworker').get(order_id=order_id)
+        worker = getattr(order, 'orderworker', None)
+        # The same values are posted back, the status does not change and nothing is sent.
+        return {'status': order.status, 'order_type': order.order_type, 'description': order.description or '',
+                'worker_id': worker.worker_id_id if worker and worker.worker_id_id else self.workers[0]}
+
+
+def staff_update(fixture):
+    order_id = fixture.order()
+    return 'post', reverse('order-staff-update', args=[order_id]), fixture.order_form(order_id)
+
+
+# name: (role, request factory), a factory returns (method, path, data).
+SCENARIOS = {
+    'orders': ('staff', lambda fixture: ('get', reverse('orders'), None)),
+    'orders-customer': ('customer', lambda fixture: ('get', reverse('orders'), None)),
+    'user-orders': ('staff', lambda fixture: ('get', reverse('user-orders', args=[fixture.rng.choice(
+        fixture.customers)]), None)),
+    'users': ('staff', lambda fixture: ('get', reverse('users'), None)),
+    'order-detail': ('staff', lambda fixture: ('get', reverse('order-detail', args=[fixture.order()]), None)),
+    'order-staff-update-form': ('staff', lambda fixture: (
+        'get', reverse('order-staff-update', args=[fixture.order()]), None)),
+    'order-staff-update': ('staff', staff_update),
+}
+
+
+def logged_in_client(user):
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+class ClientRunner:
+    # In-process requests through the Django test client, queries are counted on the connection.
+    name = 'client'
+
+    def __init__(self, fixture):
+        self.clients = {'staff': logged_in_client(fixture.staff), 'customer': logged_in_client(fixture.customer)}
+
+    def request(self, role, method, path, data):
+        client = self.clients[role]
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(client, method)(path, data)
+            duration = time.perf_counter() - start
+        return response.status_code, duration, len(queries)
+
+
+class HttpRunner:
+    # Requests to a running server (gunicorn), queries are read from the Server-Timing header
+    # set by crm.middleware.RequestMetricsMiddleware.
+    name = 'http'
+
+    def __init__(self, fixture, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.sessions = {role: self.session(user) for role, user in
+                         (('staff', fixture.staff), ('customer', fixture.customer))}
+
+    def session(self, user):
+        session = requests.Session()
+        cookie = logged_in_client(user).cookies[settings.SESSION_COOKIE_NAME]
+        session.cookies.set(settings.SESSION_COOKIE_NAME, cookie.value)
+        return session
+
+    def request(self, role, method, path, data):
+        session = self.sessions[role]
+        url = self.base_url + path
+        headers = {}
+        if method == 'post':
+            if settings.CSRF_COOKIE_NAME not in session.cookies:
+                session.get(url)
+            headers = {'X-CSRFToken': session.cookies[settings.CSRF_COOKIE_NAME], 'Referer': url}
+        start = time.perf_counter()
+        response = session.request(method, url, data=data, headers=headers, allow_redirects=False)
+        duration = time.perf_counter() - start
+        match = SERVER_TIMING_QUERIES.search(response.headers.get('Server-Timing', ''))
+        return response.status_code, duration, int(match.group(1)) if match else None
+
+
+def run_scenario(runner, fixture, name, count, warmup=0):
+    role, factory = SCENARIOS[name]
+    durations = []
+    queries = []
+    errors = 0
+    elapsed = 0
+    for number in range(warmup + count):
+        method, path, data = factory(fixture)
+        status, duration, query_count = runner.request(role, method, path, data)
+        if number < warmup:
+            continue
+        elapsed += duration
+        durations.append(duration * 1000)
+        if query_count is not None:
+            queries.append(query_count)
+        if status >= 400:
+            errors += 1
+    durations.sort()
+    result = {'requests': count, 'errors': errors, 'mean_ms': sum(durations) / len(durations),
+              **{f'p{p}_ms': history.percentile(durations, p) for p in PERCENTILES},
+              'queries': sum(queries) / len(queries) if queries else None,
+              'throughput': count / elapsed if elapsed else None}
+    return result
+
+
+def run(runner, fixture, scenarios, count, warmup=0):
+    return {'runner': runner.name, 'orders': Order.objects.count(), 'requests': count,
+            'scenarios': {name: run_scenario(runner, fixture, name, count, warmup) for name in scenarios}}
+
+
+def compare(baseline, results, tolerance=0.1):
+    # Latency and queries may grow and throughput may drop by `tolerance` before it counts as a regression.
+    rows = []
+    for name, result in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if old is None:
+            continue
+        for metric in [f'p{p}_ms' for p in PERCENTILES] + ['queries', 'throughput']:
+            before, after = old.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            if metric == 'throughput':
+                regressed = after < before * (1 - tolerance)
+            else:
+                regressed = after > before * (1 + tolerance)
+            rows.append({'scenario': name, 'metric': metric, 'baseline': before, 'result': after,
+                         'change': (after - before) / before if before else None, 'regressed': regressed})
+    return rows
+
+
+# name: (cached loader, fragment cache)
+TEMPLATE_MODES = {
+    'loaders': (False, False),
+    'cached-loader': (True, False),
+    'cached-loader+fragments': (True, True),
+}
+
+
+def template_roles():
+    return {'anonymous': AnonymousUser(), 'customer': User(id=1, email=customer_email(0)),
+            'staff': User(id=2, email=worker_email(0), is_staff=True)}
+
+
+def template_engine(cached_loader):
+    config = settings.TEMPLATES[0]
+    loaders = settings.TEMPLATE_LOADERS
+    options = {**config.get('OPTIONS', {}),
+               'loaders': [('django.template.loaders.cached.Loader', loaders)] if cached_loader else loaders}
+    return DjangoTemplates({'NAME': 'benchmark', 'DIRS': config['DIRS'], 'APP_DIRS': False, 'OPTIONS': options})
+
+
+def render_time(engine, template_name, request, renders):
+    # The template is looked up on every render like a view does, the plain loaders parse it each time.
+    engine.get_template(template_name).render({}, request)
+    start = time.perf_counter()
+    for _ in range(renders):
+        engine.get_template(template_name).render({}, request)
+    return (time.perf_counter() - start) / renders
+
+
+def benchmark_templates(template_names, renders=500):
+    fragments_off = {**settings.CACHES, 'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    results = {}
+    for mode, (cached_loader, fragments) in TEMPLATE_MODES.items():
+        engine = template_engine(cached_loader)
+        with override_settings(**({} if fragments else {'CACHES': fragments_off})):
+            for template_name in template_names:
+                for role, user in template_roles().items():
+                    request = RequestFactory().get('/')
+                    request.user = user
+                    results.setdefault(template_name, {}).setdefault(role, {})[mode] = \
+                        render_time(engine, template_name, request, renders)
+    return results
@@ -0,0 +1,66 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from crm import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Measure latency, queries per request and throughput of the main pages on the generated data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=list(benchmark.SCENARIOS),
+                            help='Scenario to run, can be repeated. All of them by default.')
+        parser.add_argument('--requests', type=int, default=100, help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--url', help='Base URL of a running server (e.g. gunicorn on http://127.0.0.1:8000), '
+                                          'the Django test client is used without it.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the results to this JSON file, e.g. to keep them as a baseline.')
+        parser.add_argument('--baseline', help='Compare with the results stored in this JSON file.')
+        parser.add_argument('--tolerance', type=float, default=0.1)
+
+    def handle(self, *args, **options):
+        try:
+            fixture = benchmark.Fixture(options['seed'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        scenarios = options['scenario'] or list(benchmark.SCENARIOS)
+        # The test client talks to the "testserver" host.
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            if options['url']:
+                runner = benchmark.HttpRunner(fixture, options['url'])
+            else:
+                runner = benchmark.ClientRunner(fixture)
+            results = benchmark.run(runner, fixture, scenarios, options['requests'], options['warmup'])
+        self.print_results(results)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                rows = benchmark.compare(json.load(f), results, options['tolerance'])
+            self.print_comparison(rows)
+            regressed = [row for row in rows if row['regressed']]
+            if regressed:
+                raise CommandError(f'{len(regressed)} metrics regressed by more than {options["tolerance"]:.0%}.')
+
+    def print_results(self, results):
+        self.stdout.write(f'{results["runner"]} runner, {results["orders"]} orders, '
+                          f'{results["requests"]} requests per scenario')
+        columns = ('scenario', 'mean ms', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'req/s', 'errors')
+        self.stdout.write('{:<26}'.format(columns[0]) + ''.join('{:>10}'.format(column) for column in columns[1:]))
+        for name, result in results['scenarios'].items():
+            row = [result['mean_ms'], result['p50_ms'], result['p95_ms'], result['p99_ms'], result['queries'],
+                   result['throughput']]
+            self.stdout.write(f'{name:<26}' + ''.join('{:>10}'.format('-' if value is None else f'{value:.1f}')
+                                                      for value in row) + f'{result["errors"]:>10}')
+
+    def print_comparison(self, rows):
+        self.stdout.write(f'{"scenario":<26}{"metric":>12}{"baseline":>10}{"result":>10}{"change":>10}')
+        for row in rows:
+            change = '' if row['change'] is None else f'{row["change"]:+.1%}'
+            line = f'{row["scenario"]:<26}{row["metric"]:>12}{row["baseline"]:>10.1f}{row["result"]:>10.1f}{change:>10}'
+            self.stdout.write(self.style.ERROR(line) if row['regressed'] else line)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from crm import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Compare the render time of pages with the plain loaders, the cached loader and fragment caching.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', action='append', help='Template to render, can be repeated. '
+                                                                 'index.html by default.')
+        parser.add_argument('--renders', type=int, default=500)
+
+    def handle(self, *args, **options):
+        results = benchmark.benchmark_templates(options['template'] or ['index.html'], options['renders'])
+        modes = list(benchmark.TEMPLATE_MODES)
+        self.stdout.write('{:<36}'.format('template / role') + ''.join(f'{mode + " us":>28}' for mode in modes)
+                          + '{:>10}'.format('saved'))
+        for template_name, roles in results.items():
+            for role, times in roles.items():
+                saved = 1 - times[modes[-1]] / times[modes[0]]
+                self.stdout.write(f'{template_name + " / " + role:<36}'
+                                  + ''.join(f'{times[mode] * 1e6:>28.1f}' for mode in modes) + f'{saved:>10.0%}')
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from crm import metrics
+
+
+class Command(BaseCommand):
+    help = 'Print the per-view request metrics collected by RequestMetricsMiddleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', help='Metrics directory, REQUEST_METRICS_DIR by default.')
+        parser.add_argument('--json', action='store_true', help='Print the merged histograms as JSON.')
+        parser.add_argument('--reset', action='store_true', help='Remove the collected metrics after printing.')
+
+    def handle(self, *args, **options):
+        views = metrics.load(options['dir'])
+        if options['json']:
+            self.stdout.write(json.dumps({'buckets': metrics.BUCKETS, 'views': views}, indent=2))
+        else:
+            self.print_table(views)
+        if options['reset']:
+            metrics.clear(options['dir'])
+
+    def print_table(self, views):
+        columns = ('view', 'requests', 'avg ms', 'p50', 'p95', 'p99', 'max ms', 'queries', 'max q',
+                   'db ms', 'tpl ms', 'tg ms')
+        self.stdout.write('{:<30}'.format(columns[0]) + ''.join('{:>10}'.format(column) for column in columns[1:]))
+        for name, view in sorted(views.items(), key=lambda item: -item[1]['total_ms']):
+            count = view['count'] or 1
+            quantiles = [metrics.quantile(view['buckets'], q) for q in (0.5, 0.95, 0.99)]
+            row = [view['count'], f'{view["total_ms"] / count:.1f}',
+                   *[f'<={value}' if value is not None else f'>{metrics.BUCKETS[-1]}' for value in quantiles],
+                   f'{view["max_ms"]:.1f}', f'{view["queries"] / count:.1f}', view['max_queries'],
+                   *[f'{view[f"{kind}_ms"] / count:.1f}' for kind in metrics.TIMINGS]]
+            self.stdout.write(f'{name:<30}' + ''.join(f'{value:>10}' for value in row))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from crm import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Add generated customers, workers and orders for `manage.py benchmark`.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=10000, help='Orders to add, up to 10^6 and more.')
+        parser.add_argument('--customers', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=50)
+        parser.add_argument('--chunk-size', type=int, default=benchmark.CHUNK_SIZE)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(created):
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'orders: {created}, {created / max(elapsed, 1e-6):.0f} rows/s')
+
+        created = benchmark.generate(options['orders'], options['customers'], options['workers'],
+                                     options['chunk_size'], options['seed'], progress)
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {created} orders in {time.monotonic() - started:.1f}s, '
+            f'users log in with password "{benchmark.PASSWORD}".'))
@@ -0,0 +1,199 @@
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template
+
+# Upper bounds of the latency buckets in milliseconds, the last bucket counts everything slower.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+TIMINGS = ('db', 'template', 'telegram')
+
+_current = ContextVar('request_metrics', default=None)
+_lock = threading.Lock()
+_views = {}
+_last_flush = time.monotonic()
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.queries = 0
+        self.timings = defaultdict(float)
+        self.depth = defaultdict(int)
+
+
+def count_query(execute, sql, params, many, context):
+    # Stays on every connection, queries are counted for the request in the current context.
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.timings['db'] += time.perf_counter() - start
+
+
+def install(connection, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+connection_created.connect(install)
+
+
+@contextmanager
+def collect():
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(kind):
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    # Nested renders (a template rendered from a template tag) are counted once.
+    metrics.depth[kind] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.depth[kind] -= 1
+        if not metrics.depth[kind]:
+            metrics.timings[kind] += time.perf_counter() - start
+
+
+def empty_view():
+    return {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'queries': 0, 'max_queries': 0,
+            **{f'{kind}_ms': 0.0 for kind in TIMINGS}, 'buckets': [0] * (len(BUCKETS) + 1)}
+
+
+def bucket(duration_ms):
+    for index, bound in enumerate(BUCKETS):
+        if duration_ms <= bound:
+            return index
+    return len(BUCKETS)
+
+
+def record(name, duration, metrics):
+    global _last_flush
+    duration_ms = duration * 1000
+    with _lock:
+        view = _views.setdefault(name, empty_view())
+        view['count'] += 1
+        view['total_ms'] += duration_ms
+        view['max_ms'] = max(view['max_ms'], duration_ms)
+        view['queries'] += metrics.queries
+        view['max_queries'] = max(view['max_queries'], metrics.queries)
+        for kind in TIMINGS:
+            view[f'{kind}_ms'] += metrics.timings[kind] * 1000
+        view['buckets'][bucket(duration_ms)] += 1
+        # Decided under the lock, so one of the concurrent requests flushes.
+        due = time.monotonic() - _last_flush >= settings.REQUEST_METRICS_FLUSH_INTERVAL
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        try:
+            flush()
+        except OSError:
+            # Metrics must not fail the request, the next interval tries again.
+            pass
+
+
+def snapshot():
+    with _lock:
+        return {name: dict(view, buckets=list(view['buckets'])) for name, view in _views.items()}
+
+
+def reset():
+    with _lock:
+        _views.clear()
+
+
+def flush(directory=None):
+    # Every process keeps its own totals in <pid>.json, dump_request_metrics merges the files.
+    global _last_flush
+    with _lock:
+        _last_flush = time.monotonic()
+    directory = directory or settings.REQUEST_METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    # A temporary file of its own for every writer, os.replace() swaps in a complete file.
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(snapshot(), f)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def merge(target, views):
+    for name, view in views.items():
+        total = target.setdefault(name, empty_view())
+        for key, value in view.items():
+            if key == 'buckets':
+                total[key] = [a + b for a, b in zip(total[key], value)]
+            elif key.startswith('max_'):
+                total[key] = max(total[key], value)
+            else:
+                total[key] += value
+    return target
+
+
+def load(directory=None):
+    views = {}
+    for path in sorted(glob.glob(os.path.join(directory or settings.REQUEST_METRICS_DIR, '*.json'))):
+        with open(path) as f:
+            merge(views, json.load(f))
+    return views
+
+
+def clear(directory=None):
+    for path in glob.glob(os.path.join(directory or settings.REQUEST_METRICS_DIR, '*.json')):
+        os.remove(path)
+    reset()
+
+
+def quantile(buckets, q):
+    # Upper bound of the bucket holding the q-th request, None when it is past the last bound.
+    rank = q * sum(buckets)
+    seen = 0
+    for index, count in enumerate(buckets):
+        seen += count
+        if count and seen >= rank:
+            return BUCKETS[index] if index < len(BUCKETS) else None
+    return None
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    # The regular Django engine, renders are added to the template time of the current request.
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from crm import metrics
+
+
+class RequestMetricsMiddleware:
+    # Query count, DB, template and Telegram time of every request, per URL name. It is sync only: under ASGI
+    # Django runs it in a thread, so recording and flushing the totals never block the event loop.
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Connections opened before the middleware was loaded missed connection_created.
+        for connection in connections.all():
+            metrics.install(connection)
+        start = time.perf_counter()
+        with metrics.collect() as request_metrics:
+            response = self.get_response(request)
+        return self.finish(request, response, time.perf_counter() - start, request_metrics)
+
+    def finish(self, request, response, duration, request_metrics):
+        match = request.resolver_match
+        metrics.record(match.view_name if match else '<unresolved>', duration, request_metrics)
+        response['Server-Timing'] = self.server_timing(duration, request_metrics)
+        return response
+
+    def server_timing(self, duration, request_metrics):
+        timings = request_metrics.timings
+        entries = [f'db;dur={timings["db"] * 1000:.1f};desc="{request_metrics.queries} queries"',
+                   f'template;dur={timings["template"] * 1000:.1f}']
+        if timings['telegram']:
+            entries.append(f'telegram;dur={timings["telegram"] * 1000:.1f}')
+        entries.append(f'total;dur={duration * 1000:.1f}')
+        return ', '.join(entries)
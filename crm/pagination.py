@@ -0,0 +1,184 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+def encode_cursor(values, backwards=False):
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    data = json.dumps([values, backwards]).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(cursor, model, fields):
+    try:
+        values, backwards = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(fields):
+            raise ValueError(cursor)
+        values = [model._meta.get_field(field.lstrip('-')).to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, binascii.Error, ValidationError):
+        raise Http404('Invalid cursor.')
+    return values, bool(backwards)
+
+
+def keyset_filter(fields, values, backwards=False):
+    # (a, b) > (x, y) is expanded to a > x OR (a = x AND b > y) so every branch can use the index.
+    condition = Q()
+    equal = {}
+    for field, value in zip(fields, values):
+        name = field.lstrip('-')
+        descending = field.startswith('-') != backwards
+        condition |= Q(**equal, **{f'{name}__{"lt" if descending else "gt"}': value})
+        equal[name] = value
+    return condition
+
+
+class KeysetPage:
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.paginator = None
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def keyset_page(queryset, fields, cursor, page_size):
+    values, backwards = decode_cursor(cursor, queryset.model, fields) if cursor else (None, False)
+    ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in fields] if backwards else fields
+    queryset = queryset.order_by(*ordering)
+    if values is not None:
+        queryset = queryset.filter(keyset_filter(fields, values, backwards))
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return KeysetPage(rows)
+
+    def key(row):
+        return [getattr(row, field.lstrip('-')) for field in fields]
+
+    next_cursor = None
+    previous_cursor = None
+    if has_more or backwards:
+        next_cursor = encode_cursor(key(rows[-1]))
+    if values is not None and (has_more or not backwards):
+        previous_cursor = encode_cursor(key(rows[0]), backwards=True)
+    return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+class KeysetPaginationMixin:
+    # `?page=N` keeps OFFSET pagination, `?cursor=` switches to keyset pagination over keyset_fields,
+    # which must be unique together and should be backed by an index. When keyset_by_default() is true
+    # a request without either starts with the first keyset page, so the page links carry cursors.
+    keyset_fields = ()
+    cursor_kwarg = 'cursor'
+
+    def keyset_by_default(self):
+        return False
+
+    def uses_keyset(self):
+        if self.cursor_kwarg in self.request.GET:
+            return True
+        return self.page_kwarg not in self.request.GET and self.keyset_by_default()
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_keyset() or not isinstance(queryset, QuerySet):
+            return super().paginate_queryset(queryset, page_size)
+        page = keyset_page(queryset, self.keyset_fields, self.request.GET.get(self.cursor_kwarg, ''), page_size)
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        params.pop(self.cursor_kwarg, None)
+        context['pagination_query'] = f'{params.urlencode()}&' if params else ''
+        return context
+
+
+def estimated_count(queryset):
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+class LookaheadPage(Page):
+    # has_next comes from one extra row read past the page, not from the estimated page count.
+
+    def __init__(self, object_list, number, paginator, more):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+
+class ApproximateCountPaginator(Paginator):
+    # COUNT(*) reads the whole table. For an unfiltered queryset on PostgreSQL the planner's row estimate
+    # from pg_class.reltuples is used instead, small or never analyzed tables are still counted exactly.
+    # With an estimate the page number is not checked against num_pages: pages past a low estimate are
+    # still served, and only a page without rows is an error.
+    approximate_threshold = 10000
+
+    @cached_property
+    def estimate(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where \
+                and connections[queryset.db].vendor == 'postgresql':
+            estimate = estimated_count(queryset)
+            if estimate >= self.approximate_threshold:
+                return estimate
+        return None
+
+    @cached_property
+    def count(self):
+        if self.estimate is not None:
+            return self.estimate
+        return super().count
+
+    def validate_number(self, number):
+        if self.estimate is None:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.estimate is None:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not object_list and number > 1:
+            raise EmptyPage('That page contains no results')
+        return LookaheadPage(object_list[:self.per_page], number, self, len(object_list) > self.per_page)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
 import whitenoise
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,12 +44,16 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django_filters',
+    'rest_framework',
+    'rest_framework.authtoken',
+    'crm',
     'orders',
     'users',
 ]
 
 MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'crm.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,12 +65,21 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'crm.urls'
 
+# Production template mode: parsed templates are kept in memory by the cached loader. On by default when DEBUG
+# is off, DJANGO_TEMPLATE_CACHE=True turns it on with DEBUG as well (template changes then need a restart).
+TEMPLATE_CACHE = os.environ.get('DJANGO_TEMPLATE_CACHE', str(not DEBUG)) == 'True'
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'crm.metrics.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)] if TEMPLATE_CACHE
+            else TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -141,6 +155,46 @@ AUTH_USER_MODEL = 'users.User'
 
 LOGIN_REDIRECT_URL = '/'
 
+# Telegram sends this value in X-Telegram-Bot-Api-Secret-Token, the webhook is disabled while it is empty.
+TELEGRAM_WEBHOOK_SECRET = os.environ.get('DJANGO_TELEGRAM_WEBHOOK_SECRET', '')
+
+# New orders get a worker from orders.assignment right away, otherwise run `manage.py assign_orders`.
+ORDER_AUTO_ASSIGN = os.environ.get('DJANGO_ORDER_AUTO_ASSIGN', '') == 'True'
+
+# DONE orders not updated for this many days are moved to the archive by `manage.py archive_orders`.
+ORDER_ARCHIVE_DAYS = int(os.environ.get('DJANGO_ORDER_ARCHIVE_DAYS', 365))
+
+# Bounded in-process cache, DJANGO_CACHE_BACKEND/DJANGO_CACHE_LOCATION select a shared one (file on one host,
+# memcached or database across hosts).
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'crm'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('DJANGO_CACHE_MAX_ENTRIES', 5000))},
+    },
+    # {% cache %} fragments of the templates, kept apart so pages do not push them out.
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template_fragments',
+        'OPTIONS': {'MAX_ENTRIES': 100},
+    },
+}
+
+# Seconds a rendered order list page is kept (orders.page_cache), 0 turns the page cache off. It is off by default
+# with a per-process cache: the web workers and the management commands would not see each other's invalidations
+# and kept serving a dropped page.
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',
+                        'django.core.cache.backends.dummy.DummyCache')
+ORDER_LIST_CACHE_TIMEOUT = int(os.environ.get('DJANGO_ORDER_LIST_CACHE_TIMEOUT',
+                                              0 if CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES else 300))
+
+# Per-view query count and timings (crm.middleware), every process writes its totals to REQUEST_METRICS_DIR
+# at most every REQUEST_METRICS_FLUSH_INTERVAL seconds, `manage.py dump_request_metrics` prints them.
+REQUEST_METRICS = os.environ.get('DJANGO_REQUEST_METRICS', 'True') == 'True'
+REQUEST_METRICS_DIR = os.environ.get('DJANGO_REQUEST_METRICS_DIR',
+                                     os.path.join(tempfile.gettempdir(), 'crm-request-metrics'))
+REQUEST_METRICS_FLUSH_INTERVAL = float(os.environ.get('DJANGO_REQUEST_METRICS_FLUSH_INTERVAL', 10))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
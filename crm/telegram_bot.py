@@ -1,10 +1,19 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from crm import metrics
 from local_settings import TELEGRAM_TOKEN
 
-BASE_URL = 'https://api.telegram.org/bot'
+API_URL = os.environ.get('DJANGO_TELEGRAM_API_URL', 'https://api.telegram.org')
+BASE_URL = f'{API_URL}/bot'
 TOKEN = os.environ.get('DJANGO_TELEGRAM_TOKEN', TELEGRAM_TOKEN)
+CONNECT_TIMEOUT = float(os.environ.get('DJANGO_TELEGRAM_CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.environ.get('DJANGO_TELEGRAM_READ_TIMEOUT', 10))
+POOL_SIZE = int(os.environ.get('DJANGO_TELEGRAM_POOL_SIZE', 10))
 
 
 def create_url(token, method):
@@ -12,26 +21,76 @@ def create_url(token, method):
     return url
 
 
-def get_update():
-    method = 'getUpdates'
-    request = requests.get(create_url(TOKEN, method))
-    return request
+class TelegramClient:
+
+    def __init__(self, token=TOKEN, base_url=BASE_URL, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, pool_size=POOL_SIZE):
+        self.token = token
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=Retry(total=2, read=0, status=0, backoff_factor=0.3))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def url(self, method):
+        return f'{self.base_url}{self.token}/{method}'
+
+    def request(self, method, params=None, poll_timeout=0):
+        # A long-polling getUpdates holds the response for poll_timeout seconds.
+        timeout = (self.connect_timeout, self.read_timeout + poll_timeout)
+        with metrics.timed('telegram'):
+            return self.session.post(self.url(method), json=params or {}, timeout=timeout)
+
+    def get_updates(self, offset=None, limit=100, poll_timeout=0):
+        params = {'limit': limit, 'timeout': poll_timeout}
+        if offset is not None:
+            params['offset'] = offset
+        return self.request('getUpdates', params, poll_timeout=poll_timeout).json()
+
+    def send_message(self, chat_id, text):
+        return self.request('sendMessage', {'chat_id': chat_id, 'text': text}).json()
+
+    def set_webhook(self, url, secret_token):
+        return self.request('setWebhook', {'url': url, 'secret_token': secret_token}).json()
+
+    def delete_webhook(self):
+        return self.request('deleteWebhook').json()
 
+    def _send_safe(self, message):
+        try:
+            return self.send_message(*message)
+        except (requests.RequestException, ValueError) as e:
+            return {'ok': False, 'description': str(e)}
 
-def get_chat_id(username: str):
-    updates = get_update().json()
-    for result in updates['result']:
-        if result['message']['chat']['username'] == username.replace('@', ''):
-            return result['message']['chat']['id']
-    return updates
+    def send_many(self, messages, concurrency=None):
+        messages = list(messages)
+        if not messages:
+            return []
+        workers = min(concurrency or self.pool_size, self.pool_size, len(messages))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._send_safe, messages))
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = TelegramClient()
+    return _client
 
 
 def send_message(to, text):
-    method = 'sendMessage'
-    params = {
-        'chat_id': to,
-        'text': text,
-    }
-    url = create_url(TOKEN, method)
-    request = requests.post(url, params=params)
-    return request.json()
+    return get_client().send_message(to, text)
+
+
+def send_many(messages, concurrency=None):
+    return get_client().send_many(messages, concurrency)
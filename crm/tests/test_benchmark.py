@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import TestCase
+
+from crm import benchmark
+from orders.models import Order, OrderStats, OrderWorker
+from users.models import User
+
+
+class BenchmarkTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        benchmark.generate(60, customers=5, workers=2, chunk_size=25)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_generated_data(self):
+        self.assertEqual(Order.objects.count(), 60)
+        self.assertEqual(User.objects.filter(is_staff=True).count(), 2)
+        self.assertFalse(Order.objects.exclude(status='N').filter(orderworker__isnull=True).exists())
+        self.assertEqual(OrderStats.objects.aggregate(total=Sum('count'))['total'], 60)
+        self.assertEqual(User.objects.filter(is_staff=False).aggregate(total=Sum('orders_count'))['total'], 60)
+        self.assertTrue(self.client.login(email=benchmark.customer_email(0), password=benchmark.PASSWORD))
+
+    def test_generate_again_adds_orders(self):
+        benchmark.generate(10, customers=5, workers=2)
+        self.assertEqual(Order.objects.count(), 70)
+        self.assertEqual(User.objects.count(), 7)
+        # The sequence continues after the generated keys.
+        Order.objects.create(customer_id=User.objects.filter(is_staff=False).first())
+        self.assertEqual(OrderWorker.objects.filter(order_id__in=Order.objects.values('order_id')).count(),
+                         OrderWorker.objects.count())
+
+    def test_scenarios(self):
+        fixture = benchmark.Fixture()
+        results = benchmark.run(benchmark.ClientRunner(fixture), fixture, benchmark.SCENARIOS, 3)
+        self.assertEqual(set(results['scenarios']), set(benchmark.SCENARIOS))
+        for name, result in results['scenarios'].items():
+            self.assertEqual(result['errors'], 0, name)
+            self.assertGreater(result['queries'], 0, name)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'], name)
+
+    def test_compare(self):
+        baseline = {'scenarios': {'orders': {'p50_ms': 10, 'p95_ms': 20, 'p99_ms': 30, 'queries': 5,
+                                             'throughput': 100}}}
+        results = {'scenarios': {'orders': {'p50_ms': 10.5, 'p95_ms': 25, 'p99_ms': 30, 'queries': 5,
+                                            'throughput': 80}}}
+        regressed = {row['metric'] for row in benchmark.compare(baseline, results) if row['regressed']}
+        self.assertEqual(regressed, {'p95_ms', 'throughput'})
+
+    def test_command_with_baseline(self):
+        out = StringIO()
+        call_command('benchmark', '--scenario', 'orders', '--scenario', 'order-detail', '--requests', '3',
+                     '--output', self.path('baseline.json'), stdout=out)
+        self.assertIn('order-detail', out.getvalue())
+        with open(self.path('baseline.json')) as f:
+            baseline = json.load(f)
+        self.assertEqual(set(baseline['scenarios']), {'orders', 'order-detail'})
+
+        baseline['scenarios']['orders']['queries'] = 1
+        with open(self.path('baseline.json'), 'w') as f:
+            json.dump(baseline, f)
+        with self.assertRaises(CommandError):
+            call_command('benchmark', '--scenario', 'orders', '--requests', '3',
+                         '--baseline', self.path('baseline.json'), stdout=StringIO())
+
+    def test_command_without_data(self):
+        Order.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('benchmark', stdout=StringIO())
+
+    def test_templates(self):
+        results = benchmark.benchmark_templates(['index.html'], renders=2)
+        self.assertEqual(set(results['index.html']), {'anonymous', 'customer', 'staff'})
+        self.assertEqual(set(results['index.html']['staff']), set(benchmark.TEMPLATE_MODES))
+        call_command('benchmark_templates', '--renders', '2', stdout=StringIO())
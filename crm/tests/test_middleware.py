@@ -0,0 +1,105 @@
+import json
+import os
+import re
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from crm import metrics
+from crm.telegram_bot import TelegramClient
+from orders.models import Order
+from users.models import User
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_order = Order.objects.create(customer_id=cls.test_user)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings = override_settings(REQUEST_METRICS_DIR=self.directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        metrics.reset()
+        self.client.login(email='testuser@test.org', password='12345')
+
+    def test_server_timing_header(self):
+        resp = self.client.get(reverse('order-detail', args=[self.test_order.order_id]))
+        timing = resp['Server-Timing']
+        queries = int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing).group(1))
+        self.assertGreater(queries, 0)
+        self.assertRegex(timing, r'template;dur=[\d.]+')
+        self.assertRegex(timing, r'total;dur=[\d.]+$')
+        self.assertNotIn('telegram', timing)
+
+    def test_metrics_per_url_name(self):
+        for _ in range(2):
+            self.client.get(reverse('order-detail', args=[self.test_order.order_id]))
+        self.client.get(reverse('orders'))
+        views = metrics.snapshot()
+        self.assertEqual(views['order-detail']['count'], 2)
+        self.assertEqual(sum(views['order-detail']['buckets']), 2)
+        self.assertGreater(views['order-detail']['queries'], 0)
+        self.assertGreater(views['order-detail']['template_ms'], 0)
+        self.assertEqual(views['orders']['count'], 1)
+
+    def test_concurrent_flushes(self):
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(50):
+                    metrics.flush()
+            except OSError as error:
+                errors.append(error)
+        threads = [threading.Thread(target=flush) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(os.listdir(self.directory.name), [f'{os.getpid()}.json'])
+
+    @override_settings(REQUEST_METRICS_FLUSH_INTERVAL=0)
+    def test_flush_error_does_not_fail_request(self):
+        with mock.patch('crm.metrics.flush', side_effect=OSError('disk full')) as flush:
+            resp = self.client.get(reverse('order-detail', args=[self.test_order.order_id]))
+        self.assertEqual(resp.status_code, 200)
+        flush.assert_called_once()
+
+    def test_unresolved_url(self):
+        self.client.get('/no-such-page/')
+        self.assertEqual(metrics.snapshot()['<unresolved>']['count'], 1)
+
+    def test_telegram_time(self):
+        client = TelegramClient(token='token', base_url='http://telegram.test/bot')
+        with metrics.collect() as request_metrics, mock.patch.object(client.session, 'post'):
+            client.send_message(1, 'text')
+        self.assertGreater(request_metrics.timings['telegram'], 0)
+
+    def test_dump_command(self):
+        self.client.get(reverse('order-detail', args=[self.test_order.order_id]))
+        metrics.flush()
+        out = StringIO()
+        call_command('dump_request_metrics', '--json', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['views']['order-detail']['count'], 1)
+        out = StringIO()
+        call_command('dump_request_metrics', '--reset', stdout=out)
+        self.assertIn('order-detail', out.getvalue())
+        self.assertEqual(metrics.load(), {})
+
+    def test_quantile(self):
+        buckets = [0] * (len(metrics.BUCKETS) + 1)
+        buckets[0], buckets[3], buckets[-1] = 90, 9, 1
+        self.assertEqual(metrics.quantile(buckets, 0.5), metrics.BUCKETS[0])
+        self.assertEqual(metrics.quantile(buckets, 0.95), metrics.BUCKETS[3])
+        self.assertIsNone(metrics.quantile(buckets, 1))
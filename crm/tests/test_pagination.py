@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.core.paginator import EmptyPage
+from django.test import TestCase
+
+from crm.pagination import ApproximateCountPaginator
+from users.models import User
+
+
+def estimated(count):
+    return mock.patch.object(ApproximateCountPaginator, 'estimate', property(lambda self: count))
+
+
+class ApproximateCountPaginatorTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(25):
+            User.objects.create_user(email=f'user{i}@test.org', password='12345')
+
+    def paginator(self):
+        return ApproximateCountPaginator(User.objects.order_by('id'), 10)
+
+    def test_pages_past_low_estimate(self):
+        with estimated(5):
+            paginator = self.paginator()
+            self.assertEqual(paginator.num_pages, 1)
+            page = paginator.page(2)
+            self.assertEqual(len(page), 10)
+            self.assertTrue(page.has_next())
+            page = paginator.page(3)
+            self.assertEqual(len(page), 5)
+            self.assertFalse(page.has_next())
+            with self.assertRaises(EmptyPage):
+                paginator.page(4)
+
+    def test_high_estimate_has_no_empty_pages(self):
+        with estimated(1000):
+            paginator = self.paginator()
+            self.assertFalse(paginator.page(3).has_next())
+            with self.assertRaises(EmptyPage):
+                paginator.page(4)
+
+    def test_exact_count_without_estimate(self):
+        paginator = self.paginator()
+        self.assertEqual(paginator.count, 25)
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
@@ -1,6 +1,11 @@
-from django.test import TestCase
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase, TestCase
 from crm import telegram_bot
 
+
 class TelegreamTest(TestCase):
 
     def test_create_url(self):
@@ -9,15 +14,86 @@ class TelegreamTest(TestCase):
         expect = f'https://api.telegram.org/bot{token}/{method}'
         self.assertEqual(expect, telegram_bot.create_url(token, method))
 
-    def test_get_update(self):
-        self.assertTrue(telegram_bot.get_update().json()['ok'])
-
-    def test_get_chat_id(self):
-        id = ''
-        self.assertTrue(telegram_bot.get_chat_id(id)['ok'])
-
     def test_send_message(self):
         to = '1'
         text = '1'
         self.assertEqual(telegram_bot.send_message(to, text)['description'], 'Bad Request: chat not found')
 
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        params = json.loads(self.rfile.read(length) or b'{}')
+        self.server.requests.append((self.path, params, self.client_address[1]))
+        if self.path.endswith('/sendMessage'):
+            body = {'ok': True, 'result': {'chat': {'id': params['chat_id']}, 'text': params['text']}}
+        elif self.path.endswith('/getUpdates'):
+            body = {'ok': True, 'result': []}
+        else:
+            body = {'ok': False, 'description': 'Not Found'}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TelegramClientTest(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeTelegramHandler)
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests.clear()
+        host, port = self.server.server_address
+        self.client = telegram_bot.TelegramClient(token='token', base_url=f'http://{host}:{port}/bot', pool_size=4)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_url(self):
+        self.assertTrue(self.client.url('getMe').endswith('/bottoken/getMe'))
+
+    def test_get_updates(self):
+        self.assertTrue(self.client.get_updates(offset=10)['ok'])
+        path, params, port = self.server.requests[0]
+        self.assertEqual(path, '/bottoken/getUpdates')
+        self.assertEqual(params['offset'], 10)
+
+    def test_send_message_reuses_connection(self):
+        for i in range(10):
+            self.assertTrue(self.client.send_message(1, str(i))['ok'])
+        ports = {port for path, params, port in self.server.requests}
+        self.assertEqual(len(self.server.requests), 10)
+        self.assertEqual(len(ports), 1)
+
+    def test_send_many(self):
+        messages = [(i, f'text {i}') for i in range(50)]
+        results = self.client.send_many(messages, concurrency=3)
+        self.assertEqual([r['result']['text'] for r in results], [text for chat_id, text in messages])
+        ports = {port for path, params, port in self.server.requests}
+        self.assertLessEqual(len(ports), 3)
+
+    def test_send_many_reports_connection_errors(self):
+        client = telegram_bot.TelegramClient(token='token', base_url='http://127.0.0.1:1/bot', connect_timeout=0.5)
+        results = client.send_many([(1, 'text')])
+        self.assertFalse(results[0]['ok'])
+        client.close()
@@ -0,0 +1,71 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from users.models import TelegramUpdate, User
+
+
+@override_settings(TELEGRAM_WEBHOOK_SECRET='secret')
+class TelegramWebhookTest(TestCase):
+
+    def post(self, payload, secret='secret'):
+        return self.client.post(reverse('telegram-webhook'), json.dumps(payload), content_type='application/json',
+                                HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret)
+
+    def test_update_is_queued(self):
+        payload = {'update_id': 1, 'message': {'chat': {'id': 42, 'username': 'user'}}}
+        resp = self.post(payload)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(TelegramUpdate.objects.get(update_id=1).payload), payload)
+
+    def test_duplicate_update_is_ignored(self):
+        self.post({'update_id': 1})
+        resp = self.post({'update_id': 1})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(TelegramUpdate.objects.count(), 1)
+
+    def test_wrong_secret(self):
+        resp = self.post({'update_id': 1}, secret='wrong')
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(TelegramUpdate.objects.exists())
+
+    def test_bad_payload(self):
+        resp = self.post({'message': {}})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_malformed_update(self):
+        for payload in [{'update_id': 1, 'message': 'x'}, {'update_id': 1, 'message': {'chat': 'x'}}, [1],
+                        {'update_id': 'x'}]:
+            resp = self.post(payload)
+            self.assertEqual(resp.status_code, 400)
+        self.assertFalse(TelegramUpdate.objects.exists())
+
+    def test_get_not_allowed(self):
+        resp = self.client.get(reverse('telegram-webhook'))
+        self.assertEqual(resp.status_code, 405)
+
+    @override_settings(TELEGRAM_WEBHOOK_SECRET='')
+    def test_disabled_without_secret(self):
+        resp = self.post({'update_id': 1}, secret='')
+        self.assertEqual(resp.status_code, 403)
+
+
+class SidebarTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+
+    def test_links_are_cached_per_role(self):
+        self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('user-detail', args=[self.test_staff_user.id]))
+        self.assertContains(resp, reverse('users'))
+        self.assertContains(resp, reverse('user-orders', args=[self.test_staff_user.id]))
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('user-detail', args=[self.test_user.id]))
+        self.assertNotContains(resp, reverse('users'))
+        self.assertContains(resp, reverse('order-create'))
+        self.assertContains(resp, reverse('user-orders', args=[self.test_user.id]))
+        self.assertContains(resp, 'User: testuser@test.org')
@@ -16,12 +16,23 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
+from rest_framework import routers
 from crm import settings, views
+from orders.api import OrderViewSet, OrderWorkerViewSet
+from users.api import UserViewSet, ContactViewSet
+
+router = routers.DefaultRouter()
+router.register('orders', OrderViewSet, basename='api-order')
+router.register('order-workers', OrderWorkerViewSet, basename='api-orderworker')
+router.register('users', UserViewSet, basename='api-user')
+router.register('contacts', ContactViewSet, basename='api-contact')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('django.contrib.auth.urls')),
     path('', views.index, name='index'),
+    path('telegram/webhook/', views.telegram_webhook, name='telegram-webhook'),
+    path('api/', include(router.urls)),
     path('', include('users.urls')),
     path('', include('orders.urls')),
 ]
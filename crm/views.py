@@ -1,5 +1,12 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
 from django.shortcuts import render, redirect
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from users import telegram
 
 
 @login_required
@@ -7,3 +14,17 @@ def index(request):
     if request.user:
         id = request.user.id
         return redirect(f'/user/{id}')
+
+
+@csrf_exempt
+@require_POST
+def telegram_webhook(request):
+    secret = settings.TELEGRAM_WEBHOOK_SECRET
+    token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+    if not secret or not constant_time_compare(token, secret):
+        return HttpResponseForbidden()
+    update = telegram.parse_update(request.body)
+    if update is None:
+        return HttpResponseBadRequest()
+    telegram.enqueue_update(int(update['update_id']), request.body.decode())
+    return HttpResponse()
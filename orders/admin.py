@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderWorker
+from .models import Order, OrderWorker, Notification, OrderStatusEvent, ArchivedOrder
 
 
 @admin.register(Order)
@@ -10,3 +10,29 @@ class OrderAdmin(admin.ModelAdmin):
 @admin.register(OrderWorker)
 class OrderWorkerAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'order_id', 'chat_id', 'status', 'attempts', 'next_attempt_date')
+    list_filter = ('status',)
+
+
+@admin.register(OrderStatusEvent)
+class OrderStatusEventAdmin(admin.ModelAdmin):
+    list_display = ('order_id', 'old_status', 'status', 'changed_date')
+    list_filter = ('status',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ('order_id', 'customer_id', 'worker_id', 'order_type', 'updated_date', 'archived_date')
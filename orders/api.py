@@ -0,0 +1,62 @@
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from crm.api import CursorPagination
+from orders import bulk
+from orders.filters import OrderFilter
+from orders.models import Order, OrderWorker
+from orders.serializers import OrderSerializer, OrderWorkerSerializer
+
+
+class OrderPagination(CursorPagination):
+    ordering = ('updated_date', 'order_id')
+
+
+class OrderWorkerPagination(CursorPagination):
+    ordering = ('id',)
+
+
+class OrderViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = OrderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = OrderFilter
+
+    def get_queryset(self):
+        queryset = Order.objects.select_related('orderworker')
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(customer_id=self.request.user.id)
+        return queryset
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def bulk(self, request):
+        data = request.data if isinstance(request.data, dict) else {}
+        create_rows = data.get('create', [])
+        update_rows = data.get('update', [])
+        if not isinstance(create_rows, list) or not isinstance(update_rows, list):
+            return Response({'detail': '"create" and "update" must be lists.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(create_rows) + len(update_rows) > bulk.MAX_ROWS:
+            return Response({'detail': f'At most {bulk.MAX_ROWS} rows per request.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        errors = bulk.validate(create_rows, update_rows)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        created, updated = bulk.apply(create_rows, update_rows)
+        # Only PostgreSQL returns primary keys from bulk inserts, elsewhere created ids are null.
+        return Response({'created': [order.order_id for order in created],
+                         'updated': [order.order_id for order in updated]})
+
+
+class OrderWorkerViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = OrderWorkerSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderWorkerPagination
+
+    def get_queryset(self):
+        queryset = OrderWorker.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(order_id__customer_id=self.request.user.id)
+        return queryset
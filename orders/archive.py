@@ -0,0 +1,96 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField, Value
+from django.utils import timezone
+
+from orders import page_cache, signals
+from orders.models import Order, ArchivedOrder
+
+BATCH_SIZE = 1000
+
+
+def cutoff(days=None):
+    return timezone.now() - timedelta(days=settings.ORDER_ARCHIVE_DAYS if days is None else days)
+
+
+def archivable(before):
+    # Served by order_status_updated_idx (status, updated_date, order_id).
+    return Order.objects.filter(status='D', updated_date__lt=before)
+
+
+def claim_batch(before, batch_size):
+    queryset = archivable(before).select_related('orderworker').order_by('updated_date', 'order_id')
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True, of=('self',))
+    return list(queryset[:batch_size])
+
+
+def archive_batch(before, batch_size=BATCH_SIZE):
+    with transaction.atomic():
+        orders = claim_batch(before, batch_size)
+        if not orders:
+            return 0
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(order_id=order.order_id, customer_id_id=order.customer_id_id, order_type=order.order_type,
+                          status=order.status, description=order.description, created_date=order.created_date,
+                          updated_date=order.updated_date,
+                          worker_id_id=getattr(getattr(order, 'orderworker', None), 'worker_id_id', None))
+            for order in orders], ignore_conflicts=True)
+        # The orders still exist, only their storage changes: stats, counters and history stay as they are.
+        with signals.muted():
+            Order.objects.filter(order_id__in=[order.order_id for order in orders]).delete()
+        page_cache.invalidate([order.customer_id_id for order in orders] +
+                              [getattr(getattr(order, 'orderworker', None), 'worker_id_id', None) for order in orders])
+    return len(orders)
+
+
+def archive(days=None, batch_size=BATCH_SIZE, limit=None, pause=0):
+    # Every batch commits on its own, an interrupted run is continued by running it again.
+    before = cutoff(days)
+    archived = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        done = archive_batch(before, size)
+        archived += done
+        if done < size:
+            break
+        if pause:
+            time.sleep(pause)
+    return archived
+
+
+class CombinedOrders:
+    # Hot and archived orders as one sequence for the Paginator: the page is picked from a UNION of
+    # the sort keys, then each side is loaded by primary key.
+    model = Order
+
+    def __init__(self, hot, archived, ordering, hot_related=(), archived_related=()):
+        self.hot = hot.order_by()
+        self.archived = archived.order_by()
+        self.ordering = ordering
+        self.hot_related = hot_related
+        self.archived_related = archived_related
+
+    def count(self):
+        return self.hot.count() + self.archived.count()
+
+    def keys(self):
+        columns = [field.lstrip('-') for field in self.ordering]
+        if 'order_id' not in columns:
+            columns.append('order_id')
+        self.pk_index = columns.index('order_id')
+        hot = self.hot.values_list(*columns).annotate(archived=Value(False, output_field=BooleanField()))
+        archived = self.archived.values_list(*columns).annotate(archived=Value(True, output_field=BooleanField()))
+        return hot.union(archived, all=True).order_by(*self.ordering)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        keys = [(key[self.pk_index], key[-1]) for key in self.keys()[item]]
+        hot = Order.objects.select_related(*self.hot_related).in_bulk([pk for pk, archived in keys if not archived])
+        archived = ArchivedOrder.objects.select_related(*self.archived_related)\
+            .in_bulk([pk for pk, archived in keys if archived])
+        return [archived[pk] if is_archived else hot[pk] for pk, is_archived in keys]
@@ -0,0 +1,95 @@
+import heapq
+from itertools import count
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from orders import counters, page_cache, stats
+from orders.models import Order, OrderWorker
+from orders.stats import weight
+from users.models import User
+
+BATCH_SIZE = 1000
+
+
+class Scheduler:
+    # Min-heap of (load, turn, worker_id). The least loaded worker is picked, on a tie the one whose last
+    # assignment is the oldest (round robin). Loads are read once, every pick is O(log workers).
+
+    def __init__(self, loads, last_assigned):
+        self.heap = [(loads.get(worker_id, 0), last, worker_id) for worker_id, last in last_assigned.items()]
+        heapq.heapify(self.heap)
+        self.turns = count(max(last_assigned.values(), default=0) + 1)
+
+    @classmethod
+    def load(cls):
+        # One row per active worker from the incrementally kept WorkerStats, the assignments are not scanned.
+        workers = User.objects.filter(is_staff=True, is_active=True)\
+            .values_list('id', 'workerstats__open_load', 'workerstats__last_assigned_date')
+        # Workers without any assignment yet come before everybody else.
+        workers = sorted(workers, key=lambda row: (row[2] is not None, row[2] and row[2].timestamp(), row[0]))
+        return cls({worker_id: load or 0 for worker_id, load, _ in workers},
+                   {worker_id: turn for turn, (worker_id, _, _) in enumerate(workers)})
+
+    def pick(self, order_type):
+        if not self.heap:
+            return None
+        load, _, worker_id = self.heap[0]
+        heapq.heapreplace(self.heap, (load + weight(order_type), next(self.turns), worker_id))
+        return worker_id
+
+
+def unassigned_orders():
+    return Order.objects.filter(Q(orderworker__isnull=True) | Q(orderworker__worker_id__isnull=True), status='N')
+
+
+def claim_unassigned(batch_size):
+    queryset = unassigned_orders().select_related('orderworker').order_by('created_date', 'order_id')
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True, of=('self',))
+    return list(queryset[:batch_size])
+
+
+def assign(orders, scheduler):
+    new_rows = []
+    empty_rows = []
+    changes = []
+    for order in orders:
+        worker_id = scheduler.pick(order.order_type)
+        if worker_id is None:
+            break
+        row = getattr(order, 'orderworker', None)
+        if row is None:
+            new_rows.append(OrderWorker(order_id=order, worker_id_id=worker_id))
+        else:
+            row.worker_id_id = worker_id
+            empty_rows.append(row)
+        # Only the worker side changes, the customer is left out of the snapshot so it is not counted twice.
+        changes.append((None, (order.status, order.order_type, order.created_date, None), worker_id))
+    OrderWorker.objects.bulk_create(new_rows)
+    OrderWorker.objects.bulk_update(empty_rows, ['worker_id'])
+    stats.apply_deltas({}, {}, *stats.order_deltas(changes)[2:])
+    stats.mark_assigned([worker_id for _, _, worker_id in changes])
+    counters.record_changes(changes)
+    page_cache.invalidate([order.customer_id_id for order in orders[:len(changes)]] +
+                          [worker_id for _, _, worker_id in changes])
+    return len(changes)
+
+
+def assign_order(order):
+    with transaction.atomic():
+        return assign([order], Scheduler.load())
+
+
+def assign_backlog(batch_size=BATCH_SIZE, limit=None):
+    scheduler = Scheduler.load()
+    assigned = 0
+    while limit is None or assigned < limit:
+        size = batch_size if limit is None else min(batch_size, limit - assigned)
+        with transaction.atomic():
+            batch = claim_unassigned(size)
+            done = assign(batch, scheduler)
+        assigned += done
+        if done < size:
+            break
+    return assigned
@@ -0,0 +1,121 @@
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order
+from orders import counters, history, page_cache, stats
+from orders.notifications import enqueue_status_notifications
+from users.models import User
+
+MAX_ROWS = 5000
+BATCH_SIZE = 1000
+
+ORDER_TYPES = dict(Order.ORDER_TYPES)
+STATUSES = dict(Order.STATUS)
+CREATE_FIELDS = {'customer_id', 'order_type', 'status', 'description'}
+UPDATE_FIELDS = {'order_id', 'order_type', 'status', 'description'}
+
+
+def check_row(row, allowed, required):
+    if not isinstance(row, dict):
+        return {'non_field_errors': ['Expected an object.']}
+    errors = {}
+    for name in required - set(row):
+        errors[name] = ['This field is required.']
+    for name in set(row) - allowed:
+        errors[name] = ['Unknown field.']
+    if 'order_type' in row and row['order_type'] not in ORDER_TYPES:
+        errors['order_type'] = [f'"{row["order_type"]}" is not a valid choice.']
+    if 'status' in row and row['status'] not in STATUSES:
+        errors['status'] = [f'"{row["status"]}" is not a valid choice.']
+    if 'description' in row and row['description'] is not None and not isinstance(row['description'], str):
+        errors['description'] = ['Not a valid string.']
+    return errors
+
+
+def as_int(value):
+    # JSON true/false would pass int() as 1/0.
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def validate(create_rows, update_rows):
+    create_errors = {i: check_row(row, CREATE_FIELDS, {'customer_id'}) for i, row in enumerate(create_rows)}
+    update_errors = {i: check_row(row, UPDATE_FIELDS, {'order_id'}) for i, row in enumerate(update_rows)}
+
+    # Foreign keys of the whole batch are resolved with one query per table.
+    customer_ids = {as_int(row.get('customer_id')) for row in create_rows if isinstance(row, dict)}
+    customers = set(User.objects.filter(id__in=customer_ids - {None}, is_staff=False).values_list('id', flat=True))
+    for i, row in enumerate(create_rows):
+        if isinstance(row, dict) and 'customer_id' in row and as_int(row['customer_id']) not in customers:
+            create_errors[i]['customer_id'] = [f'Invalid pk "{row["customer_id"]}" - object does not exist.']
+
+    order_ids = [as_int(row.get('order_id')) for row in update_rows if isinstance(row, dict)]
+    orders = set(Order.objects.filter(order_id__in={pk for pk in order_ids if pk is not None})
+                 .values_list('order_id', flat=True))
+    seen = set()
+    for i, row in enumerate(update_rows):
+        if not isinstance(row, dict) or 'order_id' not in row:
+            continue
+        pk = as_int(row['order_id'])
+        if pk not in orders:
+            update_errors[i]['order_id'] = [f'Invalid pk "{row["order_id"]}" - object does not exist.']
+        elif pk in seen:
+            update_errors[i]['order_id'] = ['Order is listed more than once.']
+        seen.add(pk)
+
+    errors = {
+        'create': [{'index': i, 'errors': e} for i, e in create_errors.items() if e],
+        'update': [{'index': i, 'errors': e} for i, e in update_errors.items() if e],
+    }
+    return {section: rows for section, rows in errors.items() if rows}
+
+
+def locked_orders(update_rows):
+    # Read again under the lock: the changes to the stats and counters are computed from the rows being replaced.
+    return Order.objects.select_for_update(of=('self',)).select_related('customer_id__contact', 'orderworker')\
+        .in_bulk([as_int(row['order_id']) for row in update_rows])
+
+
+def apply(create_rows, update_rows):
+    now = timezone.now()
+    new_orders = [Order(customer_id_id=as_int(row['customer_id']), order_type=row.get('order_type', 'C'),
+                        status=row.get('status', 'N'), description=row.get('description'),
+                        created_date=now, updated_date=now)
+                  for row in create_rows]
+    with transaction.atomic():
+        orders = locked_orders(update_rows)
+        changed = []
+        status_changed = []
+        # bulk_create and bulk_update send no signals, the stats and user counters are adjusted for the whole batch.
+        stats_changes = [(None, stats.snapshot(order), None) for order in new_orders]
+        for row in update_rows:
+            order = orders.get(as_int(row['order_id']))
+            if order is None:
+                # Deleted since the validation.
+                continue
+            old_status = order.status
+            old_snapshot = stats.snapshot(order)
+            for name in UPDATE_FIELDS - {'order_id'}:
+                if name in row:
+                    setattr(order, name, row[name])
+            # bulk_update skips auto_now, the timestamp is set here.
+            order.updated_date = now
+            changed.append(order)
+            if order.status != old_status:
+                status_changed.append((order, old_status))
+            worker = getattr(order, 'orderworker', None)
+            stats_changes.append((old_snapshot, stats.snapshot(order), worker and worker.worker_id_id))
+        Order.objects.bulk_create(new_orders, batch_size=BATCH_SIZE)
+        Order.objects.bulk_update(changed, ['order_type', 'status', 'description', 'updated_date'],
+                                  batch_size=BATCH_SIZE)
+        enqueue_status_notifications([order for order, _ in status_changed])
+        history.record_status_changes(status_changed)
+        stats.record_changes(stats_changes)
+        counters.record_changes(stats_changes)
+        page_cache.invalidate([order.customer_id_id for order in new_orders + changed] +
+                              [worker_id for _, _, worker_id in stats_changes])
+    return new_orders, changed
@@ -0,0 +1,92 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+from orders.models import Order, OrderWorker, ArchivedOrder
+from users.models import User
+
+STATUS_FIELDS = {'N': 'new_orders_count', 'P': 'in_progress_orders_count', 'D': 'done_orders_count'}
+COUNTER_FIELDS = ['orders_count', *STATUS_FIELDS.values()]
+RECONCILE_BATCH_SIZE = 2000
+
+
+def user_deltas(changes):
+    # Same (old, new, worker_id) changes as orders.stats, the customer is part of the snapshot.
+    deltas = defaultdict(Counter)
+    for old, new, worker_id in changes:
+        for values, sign in ((old, -1), (new, 1)):
+            if values is None:
+                continue
+            status, _, _, customer_id = values
+            for user_id in (customer_id, worker_id):
+                if user_id:
+                    deltas[user_id]['orders_count'] += sign
+                    deltas[user_id][STATUS_FIELDS[status]] += sign
+    return deltas
+
+
+def assignment_deltas(status, old_worker_id, new_worker_id):
+    deltas = defaultdict(Counter)
+    for user_id, sign in ((old_worker_id, -1), (new_worker_id, 1)):
+        if user_id and status:
+            deltas[user_id]['orders_count'] += sign
+            deltas[user_id][STATUS_FIELDS[status]] += sign
+    return deltas
+
+
+def apply_deltas(deltas):
+    deltas = {user_id: counts for user_id, counts in deltas.items() if any(counts.values())}
+    if not deltas:
+        return
+    # One UPDATE ... SET field = field + CASE id WHEN ... END for the whole batch.
+    fields = {field for counts in deltas.values() for field, delta in counts.items() if delta}
+    User.objects.filter(id__in=deltas).update(**{
+        field: F(field) + Case(*[When(id=user_id, then=Value(counts[field]))
+                                 for user_id, counts in deltas.items() if counts[field]],
+                               default=Value(0), output_field=IntegerField())
+        for field in fields})
+
+
+def record_changes(changes):
+    apply_deltas(user_deltas(changes))
+
+
+def expected_counts():
+    counts = defaultdict(Counter)
+    rows = [
+        Order.objects.values_list('customer_id', 'status').annotate(count=Count('order_id')),
+        OrderWorker.objects.filter(worker_id__isnull=False).values_list('worker_id', 'order_id__status')
+        .annotate(count=Count('id')),
+        ArchivedOrder.objects.values_list('customer_id', 'status').annotate(count=Count('order_id')),
+        ArchivedOrder.objects.filter(worker_id__isnull=False).values_list('worker_id', 'status')
+        .annotate(count=Count('order_id')),
+    ]
+    for queryset in rows:
+        for user_id, status, count in queryset.order_by():
+            counts[user_id]['orders_count'] += count
+            counts[user_id][STATUS_FIELDS[status]] += count
+    return counts
+
+
+def reconcile(batch_size=RECONCILE_BATCH_SIZE, dry_run=False):
+    counts = expected_counts()
+    fixed = []
+    drifted = 0
+    with transaction.atomic():
+        for user in User.objects.only('id', *COUNTER_FIELDS).order_by('id').iterator(chunk_size=batch_size):
+            expected = counts.get(user.id, {})
+            if all(getattr(user, field) == expected.get(field, 0) for field in COUNTER_FIELDS):
+                continue
+            drifted += 1
+            if dry_run:
+                continue
+            for field in COUNTER_FIELDS:
+                setattr(user, field, expected.get(field, 0))
+            fixed.append(user)
+            if len(fixed) >= batch_size:
+                User.objects.bulk_update(fixed, COUNTER_FIELDS)
+                fixed = []
+        if fixed:
+            User.objects.bulk_update(fixed, COUNTER_FIELDS)
+    return drifted
@@ -0,0 +1,48 @@
+import csv
+import json
+
+FIELDS = ['order_id', 'customer_id', 'orderworker__worker_id', 'order_type', 'status', 'description',
+          'created_date', 'updated_date']
+HEADER = ['order_id', 'customer_id', 'worker_id', 'order_type', 'status', 'description',
+          'created_date', 'updated_date']
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    # csv.writer wants a file, this one hands every formatted line back instead of storing it.
+
+    def write(self, value):
+        return value
+
+
+def serialize(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    # iterator() reads the rows in chunks through a server-side cursor where the database has one.
+    rows = queryset.order_by('order_id').values_list(*FIELDS).iterator(chunk_size=chunk_size)
+    return ([serialize(value) for value in row] for row in rows)
+
+
+def as_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def as_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(HEADER, row)), ensure_ascii=False) + '\n'
+
+
+FORMATS = {
+    'csv': (as_csv, 'text/csv'),
+    'ndjson': (as_ndjson, 'application/x-ndjson'),
+}
+
+
+def export(queryset, fmt, chunk_size=CHUNK_SIZE):
+    writer, content_type = FORMATS[fmt]
+    return writer(export_rows(queryset, chunk_size))
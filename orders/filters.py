@@ -1,15 +1,55 @@
+from datetime import datetime, time, timedelta
+
 import django_filters
+from django.utils import timezone
+from django_filters.constants import EMPTY_VALUES
+
 from orders.models import Order
 
 
+def day_start(date):
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+class DayFilter(django_filters.DateFilter):
+    # Matches the whole day as [00:00, next day 00:00) so the database can use the index on the column.
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        start = day_start(value)
+        return self.get_method(qs)(**{f'{self.field_name}__gte': start,
+                                      f'{self.field_name}__lt': start + timedelta(days=1)})
+
+
+class DayRangeFilter(django_filters.DateFromToRangeFilter):
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        lookups = {}
+        if value.start is not None:
+            lookups[f'{self.field_name}__gte'] = day_start(value.start)
+        if value.stop is not None:
+            lookups[f'{self.field_name}__lt'] = day_start(value.stop) + timedelta(days=1)
+        return self.get_method(qs)(**lookups)
+
+
 class OrderFilter(django_filters.FilterSet):
 
     status = django_filters.MultipleChoiceFilter(choices=Order.STATUS)
     order_type = django_filters.ChoiceFilter(choices=Order.ORDER_TYPES)
-    created_date = django_filters.DateFilter(field_name='created_date', lookup_expr='icontains')
-    created_date__gt = django_filters.DateFilter(field_name='created_date', lookup_expr='gt')
-    created_date__lt = django_filters.DateFilter(field_name='created_date', lookup_expr='lt')
+    created_date = DayFilter(field_name='created_date')
+    created_date__gt = django_filters.DateFilter(field_name='created_date', method='filter_after')
+    created_date__lt = django_filters.DateFilter(field_name='created_date', method='filter_before')
+    created_date_range = DayRangeFilter(field_name='created_date', label='Created between')
 
     class Meta:
         model = Order
         fields = ['status', 'order_type', 'created_date']
+
+    def filter_after(self, queryset, name, value):
+        return queryset.filter(**{f'{name}__gt': day_start(value)})
+
+    def filter_before(self, queryset, name, value):
+        return queryset.filter(**{f'{name}__lt': day_start(value)})
@@ -0,0 +1,98 @@
+import math
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderStatusEvent, LeadTimeStats
+
+STATUS_LABELS = dict(Order.STATUS)
+PERCENTILES = (50, 90, 95)
+
+
+def status_event(order, old_status):
+    return OrderStatusEvent(order_id_id=order.order_id, old_status=old_status, status=order.status,
+                            changed_date=order.updated_date, order_created_date=order.created_date)
+
+
+def record_status_change(order, old_status):
+    event = status_event(order, old_status)
+    event.save()
+    return event
+
+
+def record_status_changes(changes):
+    # changes are (order, old_status) pairs, one INSERT for the batch.
+    return OrderStatusEvent.objects.bulk_create([status_event(order, old_status) for order, old_status in changes],
+                                                batch_size=1000)
+
+
+def timeline(order, now=None):
+    now = now or timezone.now()
+    events = list(OrderStatusEvent.objects.filter(order_id=order.order_id).order_by('changed_date', 'id'))
+    status = events[0].old_status if events else order.status
+    start = order.created_date
+    periods = []
+    for event in events:
+        periods.append({'status': STATUS_LABELS[status], 'start': start, 'end': event.changed_date,
+                        'duration': event.changed_date - start})
+        status, start = event.status, event.changed_date
+    periods.append({'status': STATUS_LABELS[status], 'start': start, 'end': None, 'duration': now - start})
+    return periods
+
+
+def percentile(values, p):
+    # Nearest-rank on sorted values.
+    if not values:
+        return None
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+def lead_times(since, until=None):
+    # Time from creation to DONE, read from the (status, changed_date) index without touching the orders.
+    events = OrderStatusEvent.objects.filter(status='D', changed_date__gte=since)
+    if until is not None:
+        events = events.filter(changed_date__lt=until)
+    return sorted(done - created for done, created in
+                  events.values_list('changed_date', 'order_created_date').iterator())
+
+
+def sql_lead_time_percentiles(since, percentiles):
+    # percentile_disc is the nearest rank as well, the events are not sent to Python.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT COUNT(*), PERCENTILE_DISC(%s::float8[]) WITHIN GROUP (ORDER BY changed_date - order_created_date) '
+            f'FROM {OrderStatusEvent._meta.db_table} WHERE status = %s AND changed_date >= %s',
+            [[p / 100 for p in percentiles], 'D', since])
+        count, values = cursor.fetchone()
+    return count, values or [None] * len(percentiles)
+
+
+def lead_time_percentiles(days=30, percentiles=PERCENTILES):
+    since = timezone.now() - timedelta(days=days)
+    if connection.vendor == 'postgresql':
+        count, values = sql_lead_time_percentiles(since, percentiles)
+    else:
+        lead = lead_times(since)
+        count, values = len(lead), [percentile(lead, p) for p in percentiles]
+    return {'count': count, 'percentiles': list(zip(percentiles, values))}
+
+
+def refresh_lead_times(days=30, percentiles=PERCENTILES):
+    result = lead_time_percentiles(days, percentiles)
+    now = timezone.now()
+    with transaction.atomic():
+        LeadTimeStats.objects.all().delete()
+        LeadTimeStats.objects.bulk_create([LeadTimeStats(percentile=p, lead_time=value, count=result['count'],
+                                                         days=days, computed_date=now)
+                                           for p, value in result['percentiles']])
+    return result
+
+
+def stored_lead_times():
+    # What the dashboard shows, a few rows whatever the number of orders. None until the first refresh.
+    rows = list(LeadTimeStats.objects.order_by('percentile'))
+    if not rows:
+        return None
+    return {'count': rows[0].count, 'days': rows[0].days, 'computed_date': rows[0].computed_date,
+            'percentiles': [(row.percentile, row.lead_time) for row in rows]}
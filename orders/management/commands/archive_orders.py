@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders import archive
+
+
+class Command(BaseCommand):
+    help = 'Move DONE orders that were not updated for a while into the archive table, batch by batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ORDER_ARCHIVE_DAYS,
+                            help='Archive DONE orders not updated for this many days.')
+        parser.add_argument('--batch-size', type=int, default=archive.BATCH_SIZE)
+        parser.add_argument('--limit', type=int, help='Stop after archiving this many orders.')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches.')
+
+    def handle(self, *args, **options):
+        archived = archive.archive(options['days'], options['batch_size'], options['limit'], options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} orders.'))
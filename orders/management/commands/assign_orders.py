@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from orders import assignment
+
+
+class Command(BaseCommand):
+    help = 'Assign workers to NEW orders that have none, balancing the open load of the workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=assignment.BATCH_SIZE)
+        parser.add_argument('--limit', type=int, help='Stop after assigning this many orders.')
+
+    def handle(self, *args, **options):
+        assigned = assignment.assign_backlog(options['batch_size'], options['limit'])
+        self.stdout.write(self.style.SUCCESS(f'Assigned {assigned} orders.'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.datastructures import MultiValueDict
+
+from orders import export
+from orders.filters import OrderFilter
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Stream orders matching OrderFilter parameters as CSV or NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(export.FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write, standard output by default.')
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE)
+        parser.add_argument('--status', action='append', default=[], choices=dict(Order.STATUS))
+        parser.add_argument('--order-type', choices=dict(Order.ORDER_TYPES))
+        parser.add_argument('--created-from', help='First creation day, YYYY-MM-DD.')
+        parser.add_argument('--created-to', help='Last creation day, YYYY-MM-DD.')
+
+    def handle(self, *args, **options):
+        data = MultiValueDict({'status': options['status']})
+        for name, option in [('order_type', 'order_type'), ('created_date_range_after', 'created_from'),
+                             ('created_date_range_before', 'created_to')]:
+            if options[option]:
+                data[name] = options[option]
+        filter = OrderFilter(data, queryset=Order.objects.all())
+        if not filter.is_valid():
+            raise CommandError(filter.errors.as_text())
+
+        chunks = export.export(filter.qs, options['format'], options['chunk_size'])
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            output.writelines(chunks)
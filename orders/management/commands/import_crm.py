@@ -0,0 +1,243 @@
+import csv
+import json
+import os
+import time
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+from orders import counters, page_cache, stats
+from orders.models import Order, OrderWorker, ArchivedOrder
+from users.models import User, Contact, normalize_username
+
+CONTACT_FIELDS = ['phone', 'telegram', 'city', 'street', 'house', 'structure', 'building', 'apartment']
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+# Both the stored codes and the labels are accepted, "DONE" and "d" become "D".
+ORDER_TYPES = {key.lower(): code for code, label in Order.ORDER_TYPES for key in (code, label)}
+STATUSES = {key.lower(): code for code, label in Order.STATUS for key in (code, label)}
+# JSON rows may hold numbers or lists, these columns are only read as text.
+USER_TEXT_FIELDS = ['email']
+ORDER_TEXT_FIELDS = ['customer_email', 'worker_email', 'created_date']
+
+
+def read_rows(path):
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if extension == '.csv':
+            yield from csv.DictReader(f)
+        elif extension in ('.jsonl', '.ndjson'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif extension == '.json':
+            yield from json.load(f)
+        else:
+            raise CommandError(f'Unsupported file type "{extension}", use .csv, .jsonl/.ndjson or .json.')
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def row_error(row, text_fields):
+    if not isinstance(row, dict):
+        return 'row is not an object'
+    for name in text_fields:
+        if row.get(name) not in (None, '') and not isinstance(row[name], str):
+            return f'{name} is not a string'
+    return None
+
+
+def as_bool(value):
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def as_choice(value, choices, default):
+    if not value:
+        return default
+    return choices.get(str(value).strip().lower())
+
+
+def as_order_id(value):
+    if value in (None, ''):
+        return None
+    try:
+        order_id = int(value)
+    except (TypeError, ValueError):
+        return False
+    return order_id if order_id > 0 and not isinstance(value, bool) else False
+
+
+def as_datetime(value):
+    if not value:
+        return timezone.now()
+    try:
+        parsed = parse_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            return None
+        parsed = timezone.datetime.combine(date, timezone.datetime.min.time())
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class Command(BaseCommand):
+    help = 'Bulk import users with contacts and orders from CSV, JSON Lines or JSON files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', help='Users file: email, first_name, last_name, is_staff, password '
+                                            'and contact columns (phone, telegram, city, street, house, ...).')
+        parser.add_argument('--orders', help='Orders file: customer_email, worker_email, order_type, status, '
+                                             'description, created_date and optionally order_id.')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--passwords', choices=['unusable', 'hashed'], default='unusable',
+                            help='"unusable" skips hashing (users reset their password by email), '
+                                 '"hashed" takes already hashed values from the password column.')
+
+    def handle(self, *args, **options):
+        if not options['users'] and not options['orders']:
+            raise CommandError('Nothing to import, pass --users and/or --orders.')
+        if options['users']:
+            self.run('users', self.import_users, options['users'], options)
+        if options['orders']:
+            self.run('orders', self.import_orders, options['orders'], options)
+            page_cache.invalidate_all()
+            # Explicit order_id values do not advance the sequence on PostgreSQL.
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [Order]):
+                    cursor.execute(sql)
+
+    def run(self, name, importer, path, options):
+        started = time.monotonic()
+        total = 0
+        self.skipped = Counter()
+        self.unknown_workers = set()
+        for chunk in chunked(read_rows(path), options['chunk_size']):
+            with transaction.atomic():
+                total += importer(chunk, options)
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'{name}: {total} rows, {total / max(elapsed, 1e-6):.0f} rows/s')
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {total} {name} in {elapsed:.1f}s ({total / max(elapsed, 1e-6):.0f} rows/s)'))
+        for reason, count in sorted(self.skipped.items()):
+            self.stderr.write(f'Skipped {count} {name}: {reason}.')
+        if self.unknown_workers:
+            self.stderr.write(f'Left unassigned, unknown worker_email: {", ".join(sorted(self.unknown_workers))}.')
+
+    def password(self, row, options):
+        if options['passwords'] == 'hashed':
+            try:
+                identify_hasher(row.get('password') or '')
+            except ValueError:
+                raise CommandError(f'Password of {row.get("email")} is not a known hash.')
+            return row['password']
+        # Unusable passwords are a random marker, nothing is hashed.
+        return make_password(None)
+
+    def import_users(self, rows, options):
+        users = {}
+        rows = [row for row in rows if self.check_user(row)]
+        for row in rows:
+            email = User.objects.normalize_email(row['email'])
+            users[email] = User(email=email, first_name=row.get('first_name') or '',
+                                last_name=row.get('last_name') or '', is_staff=as_bool(row.get('is_staff')),
+                                password=self.password(row, options))
+        User.objects.bulk_create(users.values(), ignore_conflicts=True)
+
+        ids = dict(User.objects.filter(email__in=users).values_list('email', 'id'))
+        contacts = [Contact(user_id=ids[User.objects.normalize_email(row['email'])],
+                            telegram_username=normalize_username(str(row.get('telegram') or '')),
+                            **{name: str(row.get(name) or '') for name in CONTACT_FIELDS})
+                    for row in rows if any(row.get(name) for name in CONTACT_FIELDS)]
+        Contact.objects.bulk_create(contacts, ignore_conflicts=True)
+        return len(rows)
+
+    def check_row(self, row, text_fields):
+        reason = row_error(row, text_fields)
+        if reason:
+            self.skipped[reason] += 1
+        return reason is None
+
+    def check_user(self, row):
+        if not self.check_row(row, USER_TEXT_FIELDS):
+            return False
+        if not (row.get('email') or '').strip():
+            self.skipped['no email'] += 1
+            return False
+        return True
+
+    def check_order(self, customer_id, order_id, order_type, status, created_date, existing):
+        # Returns why the row can not be imported, None for a good row.
+        if customer_id is None:
+            return 'unknown customer_email'
+        if order_id is False:
+            return 'invalid order_id'
+        if order_id in existing:
+            return 'order_id already imported'
+        if order_type is None:
+            return f'order_type not one of {", ".join(code for code, label in Order.ORDER_TYPES)}'
+        if status is None:
+            return f'status not one of {", ".join(code for code, label in Order.STATUS)}'
+        if created_date is None:
+            return 'invalid created_date'
+        return None
+
+    def import_orders(self, rows, options):
+        rows = [row for row in rows if self.check_row(row, ORDER_TEXT_FIELDS)]
+        emails = {User.objects.normalize_email(row[key]) for row in rows
+                  for key in ('customer_email', 'worker_email') if row.get(key)}
+        ids = dict(User.objects.filter(email__in=emails).values_list('email', 'id'))
+
+        order_ids = {as_order_id(row.get('order_id')) for row in rows} - {None, False}
+        # Order ids of an earlier run, hot or archived, a re-run skips them instead of failing on the key.
+        existing = set(Order.objects.filter(order_id__in=order_ids).values_list('order_id', flat=True))
+        existing.update(ArchivedOrder.objects.filter(order_id__in=order_ids).values_list('order_id', flat=True))
+
+        orders = []
+        workers = []
+        for row in rows:
+            customer_id = ids.get(User.objects.normalize_email(row.get('customer_email') or ''))
+            order_id = as_order_id(row.get('order_id'))
+            order_type = as_choice(row.get('order_type'), ORDER_TYPES, 'C')
+            status = as_choice(row.get('status'), STATUSES, 'N')
+            created_date = as_datetime(row.get('created_date'))
+            reason = self.check_order(customer_id, order_id, order_type, status, created_date, existing)
+            if reason:
+                self.skipped[reason] += 1
+                continue
+            if order_id:
+                existing.add(order_id)
+            orders.append(Order(order_id=order_id, customer_id_id=customer_id, order_type=order_type, status=status,
+                                description=row.get('description') or None, created_date=created_date))
+            worker_email = User.objects.normalize_email(row.get('worker_email') or '')
+            if worker_email and worker_email not in ids:
+                self.unknown_workers.add(worker_email)
+            workers.append(ids.get(worker_email))
+        Order.objects.bulk_create(orders)
+
+        # Assignments need the order keys: PostgreSQL returns them from the insert, or the file provides order_id.
+        assignments = [OrderWorker(order_id=order, worker_id_id=worker_id)
+                       for order, worker_id in zip(orders, workers) if worker_id and order.order_id]
+        OrderWorker.objects.bulk_create(assignments)
+        changes = [(None, stats.snapshot(order), worker_id if order.order_id else None)
+                   for order, worker_id in zip(orders, workers)]
+        stats.record_changes(changes)
+        counters.record_changes(changes)
+        unassigned = sum(1 for order, worker_id in zip(orders, workers) if worker_id and not order.order_id)
+        if unassigned:
+            self.stderr.write(f'{unassigned} worker assignments need an order_id column on this database.')
+        return len(orders)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from orders import history, stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the order statistics tables from the orders table.'
+
+    def handle(self, *args, **options):
+        stats.rebuild()
+        history.refresh_lead_times()
+        self.stdout.write(self.style.SUCCESS('Order statistics rebuilt.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from orders import counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the per-user order counters and fix the users that drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=counters.RECONCILE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many users drifted.')
+
+    def handle(self, *args, **options):
+        drifted = counters.reconcile(options['batch_size'], options['dry_run'])
+        action = 'would be fixed' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'{drifted} users {action}.'))
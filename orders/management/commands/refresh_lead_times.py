@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orders import history
+
+
+class Command(BaseCommand):
+    help = 'Store the lead time percentiles shown on the order statistics page.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+
+    def handle(self, *args, **options):
+        result = history.refresh_lead_times(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Lead times of {result["count"]} done orders stored.'))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders import notifications
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending Telegram notifications from the outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=notifications.MAX_ATTEMPTS)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox until interrupted.')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the outbox is empty.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = notifications.send_pending(options['batch_size'], options['max_attempts'])
+            if sent or failed:
+                self.stdout.write(f'Sent: {sent}, failed: {failed}')
+            if not options['loop']:
+                break
+            if sent + failed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+# Generated by Django 3.1.2 on 2026-10-18 19:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_auto_20210729_1633'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.TextField(verbose_name='chat_id')),
+                ('text', models.TextField()),
+                ('status', models.CharField(choices=[('P', 'PENDING'), ('S', 'SENT'), ('F', 'FAILED')], default='P', max_length=1)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('next_attempt_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_date', models.DateTimeField(blank=True, null=True)),
+                ('order_id', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='orders.order')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['status', 'next_attempt_date'], name='notification_pending_idx'),
+        ),
+    ]
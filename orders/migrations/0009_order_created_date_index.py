@@ -0,0 +1,17 @@
+# Generated by Django 3.1.2 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_notification'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_date'], name='order_created_date_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.2 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_order_created_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_date', 'order_id'], name='order_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer_id', 'updated_date', 'order_id'], name='order_customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'updated_date', 'order_id'], name='order_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_type', 'updated_date', 'order_id'], name='order_type_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(status__in=['N', 'P']), fields=['updated_date', 'order_id'], name='order_open_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderworker',
+            index=models.Index(fields=['worker_id', 'order_id'], name='orderworker_worker_order_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 3.1.2 on 2026-10-18 19:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def fill_stats(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderWorker = apps.get_model('orders', 'OrderWorker')
+    OrderStats = apps.get_model('orders', 'OrderStats')
+    DailyOrderStats = apps.get_model('orders', 'DailyOrderStats')
+    WorkerStats = apps.get_model('orders', 'WorkerStats')
+    OrderStats.objects.bulk_create(
+        OrderStats(**row)
+        for row in Order.objects.values('status', 'order_type').annotate(count=Count('order_id')).order_by())
+    DailyOrderStats.objects.bulk_create(
+        DailyOrderStats(**row)
+        for row in Order.objects.annotate(date=TruncDate('created_date')).values('date')
+        .annotate(count=Count('order_id')).order_by())
+    WorkerStats.objects.bulk_create(
+        WorkerStats(worker_id_id=row['worker_id'], open_count=row['open_count'])
+        for row in OrderWorker.objects.filter(order_id__status__in=['N', 'P'], worker_id__isnull=False)
+        .values('worker_id').annotate(open_count=Count('id')).order_by())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0010_order_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOrderStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OrderStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('D', 'DONE'), ('P', 'IN_PROGRESS'), ('N', 'NEW')], max_length=1)),
+                ('order_type', models.CharField(choices=[('R', 'Repair'), ('M', 'Maintenance'), ('C', 'Consultation')], max_length=1)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WorkerStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('open_count', models.IntegerField(default=0)),
+                ('worker_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='orderstats',
+            constraint=models.UniqueConstraint(fields=('status', 'order_type'), name='orderstats_status_type_uniq'),
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
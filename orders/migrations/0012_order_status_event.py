@@ -0,0 +1,52 @@
+# Generated by Django 3.1.2 on 2026-10-18 19:29
+
+from itertools import islice
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_events(apps, schema_editor):
+    # The path an order took is unknown, orders that left NEW get one event at their last update.
+    Order = apps.get_model('orders', 'Order')
+    OrderStatusEvent = apps.get_model('orders', 'OrderStatusEvent')
+    orders = Order.objects.exclude(status='N').values_list('order_id', 'status', 'updated_date', 'created_date')\
+        .iterator(chunk_size=2000)
+    while True:
+        events = [OrderStatusEvent(order_id_id=order_id, old_status='N', status=status, changed_date=updated_date,
+                                   order_created_date=created_date)
+                  for order_id, status, updated_date, created_date in islice(orders, 2000)]
+        if not events:
+            break
+        OrderStatusEvent.objects.bulk_create(events)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_order_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('old_status', models.CharField(choices=[('D', 'DONE'), ('P', 'IN_PROGRESS'), ('N', 'NEW')], max_length=1)),
+                ('status', models.CharField(choices=[('D', 'DONE'), ('P', 'IN_PROGRESS'), ('N', 'NEW')], max_length=1)),
+                ('changed_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('order_created_date', models.DateTimeField()),
+                ('order_id', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_events', to='orders.order')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='orderstatusevent',
+            index=models.Index(fields=['order_id', 'changed_date'], name='statusevent_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderstatusevent',
+            index=models.Index(fields=['status', 'changed_date'], name='statusevent_status_idx'),
+        ),
+        migrations.RunPython(fill_events, migrations.RunPython.noop),
+    ]
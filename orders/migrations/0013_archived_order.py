@@ -0,0 +1,43 @@
+# Generated by Django 3.1.2 on 2026-10-18 19:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0012_order_status_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('order_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('order_type', models.CharField(choices=[('R', 'Repair'), ('M', 'Maintenance'), ('C', 'Consultation')], max_length=1)),
+                ('status', models.CharField(choices=[('D', 'DONE'), ('P', 'IN_PROGRESS'), ('N', 'NEW')], max_length=1)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('created_date', models.DateTimeField()),
+                ('updated_date', models.DateTimeField()),
+                ('archived_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('customer_id', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to=settings.AUTH_USER_MODEL)),
+                ('worker_id', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_assignments', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['updated_date', 'order_id'], name='archived_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['customer_id', 'updated_date', 'order_id'], name='archived_customer_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['worker_id', 'updated_date', 'order_id'], name='archived_worker_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.1.2 on 2026-10-18 20:05
+
+from django.db import migrations, models
+from django.db.models import Case, IntegerField, Sum, Value, When
+
+TYPE_WEIGHTS = {'R': 3, 'M': 2, 'C': 1}
+
+
+def fill_loads(apps, schema_editor):
+    OrderWorker = apps.get_model('orders', 'OrderWorker')
+    WorkerStats = apps.get_model('orders', 'WorkerStats')
+    weighted = Case(*[When(order_id__order_type=order_type, then=Value(value))
+                      for order_type, value in TYPE_WEIGHTS.items()], default=Value(1), output_field=IntegerField())
+    loads = OrderWorker.objects.filter(order_id__status__in=['N', 'P'], worker_id__isnull=False)\
+        .values('worker_id').annotate(load=Sum(weighted)).order_by().values_list('worker_id', 'load')
+    # No assignment times were stored before, last_assigned_date starts empty for everybody.
+    for worker_id, load in loads:
+        WorkerStats.objects.filter(worker_id_id=worker_id).update(open_load=load)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0013_archived_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workerstats',
+            name='open_load',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='workerstats',
+            name='last_assigned_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_loads, migrations.RunPython.noop),
+    ]
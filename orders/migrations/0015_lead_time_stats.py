@@ -0,0 +1,24 @@
+# Generated by Django 3.1.2 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0014_worker_load'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeadTimeStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('percentile', models.IntegerField(unique=True)),
+                ('lead_time', models.DurationField(null=True)),
+                ('count', models.IntegerField(default=0)),
+                ('days', models.IntegerField()),
+                ('computed_date', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.1.2 on 2026-10-18 20:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0015_lead_time_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='customer_id',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='customer', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,10 +1,28 @@
 from django.db import models
+from django.db.models import Q
 from django.urls import reverse
 from django.utils import timezone
 from users.models import User
 
 
-class Order(models.Model):
+class LoadedValuesMixin:
+    # Keeps the values read from the database so the signals in orders.signals can see
+    # what a save changes without re-reading the row.
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        refreshed = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields
+                     if fields is None or field.name in fields or field.attname in fields}
+        self._loaded_values = {**getattr(self, '_loaded_values', {}), **refreshed}
+
+
+class Order(LoadedValuesMixin, models.Model):
 
     ORDER_TYPES = (
         ('R', 'Repair'),
@@ -19,13 +37,27 @@ class Order(models.Model):
     )
 
     order_id = models.BigAutoField(primary_key=True)
-    customer_id = models.ForeignKey(User, related_name='customer', on_delete=models.CASCADE)
+    # order_customer_updated_idx starts with customer_id and serves the lookups of the foreign key.
+    customer_id = models.ForeignKey(User, related_name='customer', on_delete=models.CASCADE, db_index=False)
     order_type = models.CharField(max_length=1, choices=ORDER_TYPES, default='C')
     status = models.CharField(max_length=1, choices=STATUS, default='N')
     description = models.TextField(null=True, blank=True)
     created_date = models.DateTimeField(default=timezone.now)
     updated_date = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_date'], name='order_created_date_idx'),
+            models.Index(fields=['updated_date', 'order_id'], name='order_updated_idx'),
+            models.Index(fields=['customer_id', 'updated_date', 'order_id'], name='order_customer_updated_idx'),
+            models.Index(fields=['status', 'updated_date', 'order_id'], name='order_status_updated_idx'),
+            models.Index(fields=['order_type', 'updated_date', 'order_id'], name='order_type_updated_idx'),
+            models.Index(fields=['updated_date', 'order_id'], condition=Q(status__in=['N', 'P']),
+                         name='order_open_updated_idx'),
+        ]
+
+    is_archived = False
+
     def get_absolute_url(self):
         return reverse('order-detail', args=[str(self.order_id)])
 
@@ -34,9 +66,141 @@ class Order(models.Model):
                f'({self.get_status_display()}, {self.updated_date.strftime("%d %b, %Y - %Hh%Mm")})'
 
 
-class OrderWorker(models.Model):
+class OrderWorker(LoadedValuesMixin, models.Model):
     order_id = models.OneToOneField(Order, on_delete=models.CASCADE)
     worker_id = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['worker_id', 'order_id'], name='orderworker_worker_order_idx'),
+        ]
+
     def __str__(self):
         return f'Order #{self.order_id_id}, {self.worker_id}'
+
+
+class Notification(models.Model):
+
+    STATUS = (
+        ('P', 'PENDING'),
+        ('S', 'SENT'),
+        ('F', 'FAILED'),
+    )
+
+    order_id = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True)
+    chat_id = models.TextField(verbose_name='chat_id')
+    text = models.TextField()
+    status = models.CharField(max_length=1, choices=STATUS, default='P')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    next_attempt_date = models.DateTimeField(default=timezone.now)
+    created_date = models.DateTimeField(default=timezone.now)
+    sent_date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_date'], name='notification_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'Notification #{self.id} to {self.chat_id} ({self.get_status_display()})'
+
+
+class ArchivedOrder(models.Model):
+    # DONE orders moved out of orders_order by orders.archive, keeping their order_id.
+    order_id = models.BigIntegerField(primary_key=True)
+    customer_id = models.ForeignKey(User, related_name='archived_orders', on_delete=models.CASCADE, db_index=False)
+    order_type = models.CharField(max_length=1, choices=Order.ORDER_TYPES)
+    status = models.CharField(max_length=1, choices=Order.STATUS)
+    description = models.TextField(null=True, blank=True)
+    created_date = models.DateTimeField()
+    updated_date = models.DateTimeField()
+    worker_id = models.ForeignKey(User, related_name='archived_assignments', on_delete=models.SET_NULL, null=True,
+                                  db_index=False)
+    archived_date = models.DateTimeField(default=timezone.now)
+
+    is_archived = True
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_date', 'order_id'], name='archived_updated_idx'),
+            models.Index(fields=['customer_id', 'updated_date', 'order_id'], name='archived_customer_updated_idx'),
+            models.Index(fields=['worker_id', 'updated_date', 'order_id'], name='archived_worker_updated_idx'),
+        ]
+
+    @property
+    def orderworker(self):
+        # Templates read order.orderworker.worker_id, the archived row carries the worker itself.
+        return self
+
+    def get_absolute_url(self):
+        return reverse('order-detail', args=[str(self.order_id)])
+
+    def __str__(self):
+        return f'Order #{self.order_id} ' \
+               f'({self.get_status_display()}, {self.updated_date.strftime("%d %b, %Y - %Hh%Mm")}, archived)'
+
+
+class OrderStatusEvent(models.Model):
+    # Append-only: rows are never updated and outlive their order, so there is no database constraint.
+    id = models.BigAutoField(primary_key=True)
+    order_id = models.ForeignKey(Order, related_name='status_events', on_delete=models.DO_NOTHING,
+                                 db_constraint=False, db_index=False)
+    old_status = models.CharField(max_length=1, choices=Order.STATUS)
+    status = models.CharField(max_length=1, choices=Order.STATUS)
+    changed_date = models.DateTimeField(default=timezone.now)
+    order_created_date = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order_id', 'changed_date'], name='statusevent_order_idx'),
+            models.Index(fields=['status', 'changed_date'], name='statusevent_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'Order #{self.order_id_id}: {self.get_old_status_display()} -> {self.get_status_display()}'
+
+
+class OrderStats(models.Model):
+    status = models.CharField(max_length=1, choices=Order.STATUS)
+    order_type = models.CharField(max_length=1, choices=Order.ORDER_TYPES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['status', 'order_type'], name='orderstats_status_type_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_status_display()} {self.get_order_type_display()}: {self.count}'
+
+
+class DailyOrderStats(models.Model):
+    date = models.DateField(unique=True)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.date}: {self.count}'
+
+
+class LeadTimeStats(models.Model):
+    # Lead time percentiles of the last `days` days, stored by `manage.py refresh_lead_times`.
+    percentile = models.IntegerField(unique=True)
+    lead_time = models.DurationField(null=True)
+    count = models.IntegerField(default=0)
+    days = models.IntegerField()
+    computed_date = models.DateTimeField()
+
+    def __str__(self):
+        return f'p{self.percentile}: {self.lead_time}'
+
+
+class WorkerStats(models.Model):
+    worker_id = models.OneToOneField(User, on_delete=models.CASCADE)
+    open_count = models.IntegerField(default=0)
+    # Open orders weighted by type (orders.stats.TYPE_WEIGHTS), read by orders.assignment.
+    open_load = models.IntegerField(default=0)
+    last_assigned_date = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.worker_id}: {self.open_count}'
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from crm import telegram_bot
+from orders.models import Notification
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 30
+BACKOFF_MAX = 60 * 60
+# Seconds a claimed notification is left to its worker, after a crash it is picked up again once this runs out.
+CLAIM_TIMEOUT = 5 * 60
+
+
+def status_message(order):
+    return f'Order #{order.order_id} {order.get_order_type_display()}\n' \
+           f'Status: {order.get_status_display()} ' \
+           f'{order.updated_date.strftime("%d %b, %Y - %Hh%Mm")}'
+
+
+def chat_id_of(customer):
+    # A subscriber without contacts or without a linked chat gets nothing, the staff save goes on.
+    if not customer.is_sub:
+        return None
+    try:
+        return customer.contact.chat_bot_id or None
+    except ObjectDoesNotExist:
+        return None
+
+
+def enqueue_status_notification(order):
+    chat_id = chat_id_of(order.customer_id)
+    if chat_id is None:
+        return None
+    return Notification.objects.create(order_id=order, chat_id=chat_id, text=status_message(order))
+
+
+def enqueue_status_notifications(orders):
+    chat_ids = [(order, chat_id_of(order.customer_id)) for order in orders]
+    return Notification.objects.bulk_create(
+        [Notification(order_id=order, chat_id=chat_id, text=status_message(order))
+         for order, chat_id in chat_ids if chat_id is not None])
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+def claim_pending(batch_size):
+    # The rows are claimed in a short transaction and sent after it, nothing is locked while Telegram answers.
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = Notification.objects.filter(status='P', next_attempt_date__lte=now).order_by('next_attempt_date')
+        # Several workers may drain the outbox at once, each one takes its own rows.
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        batch = list(queryset[:batch_size])
+        Notification.objects.filter(pk__in=[notification.pk for notification in batch])\
+            .update(attempts=F('attempts') + 1, next_attempt_date=now + timedelta(seconds=CLAIM_TIMEOUT))
+    for notification in batch:
+        notification.attempts += 1
+    return batch
+
+
+def delivery_error(response):
+    if response.get('ok'):
+        return None
+    return response.get('description', 'Unknown error')
+
+
+def record_result(notification, error, max_attempts):
+    now = timezone.now()
+    if error is None:
+        fields = {'status': 'S', 'sent_date': now, 'last_error': ''}
+    elif notification.attempts >= max_attempts:
+        fields = {'status': 'F', 'last_error': error}
+    else:
+        fields = {'last_error': error, 'next_attempt_date': now + backoff(notification.attempts)}
+    Notification.objects.filter(pk=notification.pk).update(**fields)
+
+
+def send_pending(batch_size=100, max_attempts=MAX_ATTEMPTS):
+    sent = failed = 0
+    batch = claim_pending(batch_size)
+    responses = telegram_bot.send_many([(n.chat_id, n.text) for n in batch])
+    for notification, response in zip(batch, responses):
+        error = delivery_error(response)
+        record_result(notification, error, max_attempts)
+        if error is None:
+            sent += 1
+        else:
+            failed += 1
+    return sent, failed
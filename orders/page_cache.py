@@ -0,0 +1,52 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+PREFIX = 'orders:list'
+ALL = 'all'
+
+
+def version_key(user_id):
+    return f'{PREFIX}:version:{user_id}'
+
+
+def versions(*user_ids):
+    # A missing version gets a random value, so pages stored before an eviction are never matched again.
+    keys = [version_key(ALL)] + [version_key(user_id) for user_id in user_ids]
+    found = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+    for key, value in missing.items():
+        cache.add(key, value, None)
+    if missing:
+        found.update(cache.get_many(list(missing)))
+    return [found.get(key) or missing[key] for key in keys]
+
+
+def page_key(viewer_id, user_id, full_path):
+    # The page depends on who looks at it (menu, staff-only columns) and on whose orders are listed.
+    digest = hashlib.md5(full_path.encode()).hexdigest()
+    return f'{PREFIX}:page:{viewer_id}:{user_id}:{":".join(versions(viewer_id, user_id))}:{digest}'
+
+
+def get_page(key):
+    return cache.get(key)
+
+
+def set_page(key, content):
+    cache.set(key, content, settings.ORDER_LIST_CACHE_TIMEOUT)
+
+
+def invalidate(user_ids):
+    keys = [version_key(user_id) for user_id in {user_id for user_id in user_ids if user_id}]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # A page read from the old rows while the transaction was open may have been stored under a new version.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_all():
+    invalidate([ALL])
@@ -0,0 +1,27 @@
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework import serializers
+
+from crm.api import SparseFieldsetMixin
+from orders.models import Order, OrderWorker
+
+
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    worker_id = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = ['order_id', 'customer_id', 'worker_id', 'order_type', 'status', 'description',
+                  'created_date', 'updated_date']
+
+    def get_worker_id(self, order):
+        try:
+            return order.orderworker.worker_id_id
+        except ObjectDoesNotExist:
+            return None
+
+
+class OrderWorkerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = OrderWorker
+        fields = ['id', 'order_id', 'worker_id']
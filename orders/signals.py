@@ -0,0 +1,125 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from orders import counters, history, page_cache, stats
+from orders.models import Order, OrderWorker
+from users.models import User
+
+
+_state = threading.local()
+
+
+@contextmanager
+def muted():
+    # For moves that do not change what the orders are, like archiving: the handlers below do nothing.
+    previous = getattr(_state, 'muted', False)
+    _state.muted = True
+    try:
+        yield
+    finally:
+        _state.muted = previous
+
+
+def unless_muted(handler):
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not getattr(_state, 'muted', False):
+            return handler(*args, **kwargs)
+    return wrapper
+
+
+def worker_of(order_id):
+    return OrderWorker.objects.filter(order_id=order_id).values_list('worker_id', flat=True).first()
+
+
+def values_of(order_id):
+    return Order.objects.filter(order_id=order_id).values_list('status', 'order_type', 'customer_id').first() \
+        or (None, None, None)
+
+
+def record_changes(changes):
+    stats.record_changes(changes)
+    counters.record_changes(changes)
+
+
+@receiver(pre_save, sender=Order)
+@unless_muted
+def order_pre_save(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None or stats.loaded_snapshot(instance) is not None:
+        return
+    values = Order.objects.filter(pk=instance.pk).values(*stats.SNAPSHOT_FIELDS).first()
+    if values is not None:
+        instance._loaded_values = values
+
+
+@receiver(post_save, sender=Order)
+@unless_muted
+def order_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else stats.loaded_snapshot(instance)
+    new = stats.snapshot(instance)
+    worker_id = None if created else worker_of(instance.pk)
+    if old != new:
+        status_changed = old is not None and old[0] != new[0]
+        # The worker's counts move with the status, the load also with the order type.
+        worker_changed = status_changed or old is not None and old[1] != new[1]
+        record_changes([(old, new, worker_id if worker_changed else None)])
+        if status_changed:
+            history.record_status_change(instance, old[0])
+    page_cache.invalidate([instance.customer_id_id, old and old[3], worker_id])
+    instance._loaded_values = dict(zip(stats.SNAPSHOT_FIELDS, new))
+
+
+@receiver(post_delete, sender=Order)
+@unless_muted
+def order_deleted(sender, instance, **kwargs):
+    # The assignment is removed by the cascade before the order, the worker's counts are handled there.
+    record_changes([(stats.loaded_snapshot(instance) or stats.snapshot(instance), None, None)])
+    page_cache.invalidate([instance.customer_id_id])
+
+
+@receiver(pre_save, sender=OrderWorker)
+@unless_muted
+def order_worker_pre_save(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None or 'worker_id_id' in getattr(instance, '_loaded_values', {}):
+        return
+    for worker_id in OrderWorker.objects.filter(pk=instance.pk).values_list('worker_id', flat=True):
+        instance._loaded_values = {'worker_id_id': worker_id}
+
+
+@receiver(post_save, sender=OrderWorker)
+@unless_muted
+def order_worker_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_worker_id = None if created else getattr(instance, '_loaded_values', {}).get('worker_id_id')
+    if old_worker_id != instance.worker_id_id:
+        status, order_type, customer_id = values_of(instance.order_id_id)
+        stats.apply_deltas({}, {}, *stats.assignment_deltas(status, order_type, old_worker_id, instance.worker_id_id))
+        stats.mark_assigned([instance.worker_id_id])
+        counters.apply_deltas(counters.assignment_deltas(status, old_worker_id, instance.worker_id_id))
+        page_cache.invalidate([customer_id, old_worker_id, instance.worker_id_id])
+    instance._loaded_values = {'worker_id_id': instance.worker_id_id}
+
+
+@receiver(post_delete, sender=OrderWorker)
+@unless_muted
+def order_worker_deleted(sender, instance, **kwargs):
+    if not instance.worker_id_id:
+        return
+    status, order_type, customer_id = values_of(instance.order_id_id)
+    stats.apply_deltas({}, {}, *stats.assignment_deltas(status, order_type, instance.worker_id_id, None))
+    counters.apply_deltas(counters.assignment_deltas(status, instance.worker_id_id, None))
+    page_cache.invalidate([customer_id, instance.worker_id_id])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, raw=False, **kwargs):
+    # Names and counters of the user are shown on their order list.
+    if not raw:
+        page_cache.invalidate([instance.id])
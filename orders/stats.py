@@ -0,0 +1,153 @@
+from collections import Counter
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import Order, OrderWorker, ArchivedOrder, OrderStats, DailyOrderStats, WorkerStats
+
+OPEN_STATUSES = ('N', 'P')
+SNAPSHOT_FIELDS = ('status', 'order_type', 'created_date', 'customer_id_id')
+# A repair keeps a worker busier than a consultation, the load of a worker is the weighted sum of open orders.
+TYPE_WEIGHTS = {'R': 3, 'M': 2, 'C': 1}
+
+
+def weight(order_type):
+    return TYPE_WEIGHTS.get(order_type, 1)
+
+
+def snapshot(order):
+    return tuple(getattr(order, name) for name in SNAPSHOT_FIELDS)
+
+
+def loaded_snapshot(instance):
+    values = getattr(instance, '_loaded_values', {})
+    if all(name in values for name in SNAPSHOT_FIELDS):
+        return tuple(values[name] for name in SNAPSHOT_FIELDS)
+    return None
+
+
+def order_deltas(changes):
+    # changes are (old, new, worker_id) with old/new snapshots, None for a created or deleted order.
+    totals = Counter()
+    intake = Counter()
+    workers = Counter()
+    loads = Counter()
+    for old, new, worker_id in changes:
+        for values, sign in ((old, -1), (new, 1)):
+            if values is None:
+                continue
+            status, order_type, created_date, _ = values
+            totals[(status, order_type)] += sign
+            intake[(timezone.localtime(created_date).date(),)] += sign
+            if worker_id and status in OPEN_STATUSES:
+                workers[(worker_id,)] += sign
+                loads[(worker_id,)] += sign * weight(order_type)
+    return totals, intake, workers, loads
+
+
+def assignment_deltas(status, order_type, old_worker_id, new_worker_id):
+    # The open count and load move from the old worker to the new one.
+    workers = Counter()
+    loads = Counter()
+    if status in OPEN_STATUSES:
+        for worker_id, sign in ((old_worker_id, -1), (new_worker_id, 1)):
+            if worker_id:
+                workers[(worker_id,)] += sign
+                loads[(worker_id,)] += sign * weight(order_type)
+    return workers, loads
+
+
+def bump(model, key_fields, field, deltas):
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    # Missing rows are created first, then one UPDATE ... SET count = count + CASE ... END applies the batch.
+    model.objects.bulk_create([model(**dict(zip(key_fields, key))) for key in deltas], ignore_conflicts=True)
+    conditions = [(Q(**dict(zip(key_fields, key))), delta) for key, delta in deltas.items()]
+    increment = Case(*[When(condition, then=Value(delta)) for condition, delta in conditions],
+                     default=Value(0), output_field=IntegerField())
+    model.objects.filter(reduce(or_, [condition for condition, _ in conditions]))\
+        .update(**{field: F(field) + increment})
+
+
+def apply_deltas(totals, intake, workers, loads):
+    bump(OrderStats, ('status', 'order_type'), 'count', totals)
+    bump(DailyOrderStats, ('date',), 'count', intake)
+    bump(WorkerStats, ('worker_id_id',), 'open_count', workers)
+    bump(WorkerStats, ('worker_id_id',), 'open_load', loads)
+
+
+def mark_assigned(worker_ids):
+    # The round robin of orders.assignment goes by the time a worker last got an order.
+    worker_ids = {worker_id for worker_id in worker_ids if worker_id}
+    if not worker_ids:
+        return
+    WorkerStats.objects.bulk_create([WorkerStats(worker_id_id=worker_id) for worker_id in worker_ids],
+                                    ignore_conflicts=True)
+    WorkerStats.objects.filter(worker_id_id__in=worker_ids).update(last_assigned_date=timezone.now())
+
+
+def open_loads():
+    weighted = Case(*[When(order_id__order_type=order_type, then=Value(value))
+                      for order_type, value in TYPE_WEIGHTS.items()], default=Value(1), output_field=IntegerField())
+    return dict(OrderWorker.objects.filter(order_id__status__in=OPEN_STATUSES, worker_id__isnull=False)
+                .values('worker_id').annotate(load=Sum(weighted)).order_by().values_list('worker_id', 'load'))
+
+
+def record_changes(changes):
+    apply_deltas(*order_deltas(changes))
+
+
+def rebuild():
+    # Archived orders keep counting, they are only stored elsewhere.
+    totals = Counter()
+    intake = Counter()
+    for model in (Order, ArchivedOrder):
+        for row in model.objects.values('status', 'order_type').annotate(count=Count('order_id')).order_by():
+            totals[(row['status'], row['order_type'])] += row['count']
+        for row in model.objects.annotate(date=TruncDate('created_date')).values('date')\
+                .annotate(count=Count('order_id')).order_by():
+            intake[row['date']] += row['count']
+    workers = dict(OrderWorker.objects.filter(order_id__status__in=OPEN_STATUSES, worker_id__isnull=False)
+                   .values('worker_id').annotate(open_count=Count('id')).order_by()
+                   .values_list('worker_id', 'open_count'))
+    loads = open_loads()
+    with transaction.atomic():
+        # The assignment times can not be derived from the orders, they are kept.
+        assigned = dict(WorkerStats.objects.filter(last_assigned_date__isnull=False)
+                        .values_list('worker_id_id', 'last_assigned_date'))
+        OrderStats.objects.all().delete()
+        DailyOrderStats.objects.all().delete()
+        WorkerStats.objects.all().delete()
+        OrderStats.objects.bulk_create([OrderStats(status=status, order_type=order_type, count=count)
+                                        for (status, order_type), count in totals.items()])
+        DailyOrderStats.objects.bulk_create([DailyOrderStats(date=date, count=count) for date, count in intake.items()])
+        WorkerStats.objects.bulk_create([WorkerStats(worker_id_id=worker_id, open_count=workers.get(worker_id, 0),
+                                                     open_load=loads.get(worker_id, 0),
+                                                     last_assigned_date=assigned.get(worker_id))
+                                         for worker_id in set(workers) | set(assigned)])
+
+
+def summary(days=30):
+    counts = {(row.status, row.order_type): row.count for row in OrderStats.objects.all()}
+    rows = [{'status': label,
+             'counts': [counts.get((status, order_type), 0) for order_type, _ in Order.ORDER_TYPES],
+             'total': sum(counts.get((status, order_type), 0) for order_type, _ in Order.ORDER_TYPES)}
+            for status, label in Order.STATUS]
+    type_totals = [sum(counts.get((status, order_type), 0) for status, _ in Order.STATUS)
+                   for order_type, _ in Order.ORDER_TYPES]
+
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+    per_day = dict(DailyOrderStats.objects.filter(date__gte=since).values_list('date', 'count'))
+    intake = [{'date': since + timedelta(days=i), 'count': per_day.get(since + timedelta(days=i), 0)}
+              for i in range(days)]
+
+    workers = WorkerStats.objects.filter(open_count__gt=0).select_related('worker_id').order_by('-open_count')
+    return {'order_types': [label for _, label in Order.ORDER_TYPES], 'status_rows': rows,
+            'type_totals': type_totals, 'total': sum(type_totals), 'intake': intake, 'workers': workers}
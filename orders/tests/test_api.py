@@ -0,0 +1,136 @@
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from orders import bulk
+from orders.models import Order, OrderWorker, Notification
+from users.models import User, Contact
+
+
+class OrderApiTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user1 = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_user2 = User.objects.create_user(email='testuser2@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        for i in range(5):
+            order = Order.objects.create(customer_id=cls.test_user1, description=str(i))
+            OrderWorker.objects.create(order_id=order, worker_id=cls.test_staff_user)
+        Order.objects.create(customer_id=cls.test_user2, status='D')
+
+    def get(self, user, url, **params):
+        token = Token.objects.get_or_create(user=user)[0]
+        return self.client.get(url, params, HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+    def test_customer_sees_own_orders(self):
+        resp = self.get(self.test_user2, '/api/orders/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([order['customer_id'] for order in resp.json()['results']], [self.test_user2.id])
+
+    def test_staff_sees_all_orders(self):
+        resp = self.get(self.test_staff_user, '/api/orders/')
+        results = resp.json()['results']
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[0]['worker_id'], self.test_staff_user.id)
+        self.assertIsNone(results[-1]['worker_id'])
+
+    def test_cursor_pagination(self):
+        resp = self.get(self.test_staff_user, '/api/orders/', page_size=4)
+        data = resp.json()
+        self.assertEqual(len(data['results']), 4)
+        resp = self.client.get(data['next'], HTTP_AUTHORIZATION=resp.wsgi_request.META['HTTP_AUTHORIZATION'])
+        self.assertEqual(len(resp.json()['results']), 2)
+        self.assertIsNone(resp.json()['next'])
+
+    def test_sparse_fields(self):
+        resp = self.get(self.test_staff_user, '/api/orders/', fields='order_id,status')
+        self.assertEqual(set(resp.json()['results'][0]), {'order_id', 'status'})
+
+    def test_filter(self):
+        resp = self.get(self.test_staff_user, '/api/orders/', status='D')
+        self.assertEqual([order['customer_id'] for order in resp.json()['results']], [self.test_user2.id])
+
+    def test_list_queries_do_not_depend_on_page_size(self):
+        self.get(self.test_staff_user, '/api/orders/')
+        with CaptureQueriesContext(connection) as small:
+            self.get(self.test_staff_user, '/api/orders/', page_size=1)
+        with CaptureQueriesContext(connection) as large:
+            self.get(self.test_staff_user, '/api/orders/', page_size=6)
+        self.assertEqual(len(small), len(large))
+
+    def test_order_workers(self):
+        resp = self.get(self.test_user2, '/api/order-workers/')
+        self.assertEqual(resp.json()['results'], [])
+        resp = self.get(self.test_user1, '/api/order-workers/')
+        self.assertEqual(len(resp.json()['results']), 5)
+
+
+class BulkOrderApiTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345', is_sub=True)
+        Contact.objects.create(user=cls.test_user, city='City', house='1', phone='+9999999999', chat_bot_id='42')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        cls.test_order = Order.objects.create(customer_id=cls.test_user)
+
+    def post(self, user, data):
+        token = Token.objects.get_or_create(user=user)[0]
+        return self.client.post('/api/orders/bulk/', json.dumps(data), content_type='application/json',
+                                HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_staff_only(self):
+        resp = self.post(self.test_user, {'create': [{'customer_id': self.test_user.id}]})
+        self.assertEqual(resp.status_code, 403)
+
+    def test_bulk_create_and_update(self):
+        rows = [{'customer_id': self.test_user.id, 'order_type': 'RMC'[i % 3], 'description': str(i)}
+                for i in range(100)]
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.post(self.test_staff_user, {'create': rows,
+                                                    'update': [{'order_id': self.test_order.order_id, 'status': 'P'}]})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()['created']), 100)
+        self.assertEqual(resp.json()['updated'], [self.test_order.order_id])
+        self.assertLess(len(queries), 20)
+        self.assertEqual(Order.objects.filter(customer_id=self.test_user).count(), 101)
+        self.assertEqual(Order.objects.filter(order_type='R', status='N').count(), 34)
+        self.test_order.refresh_from_db()
+        self.assertEqual(self.test_order.status, 'P')
+        self.assertEqual(Notification.objects.get().chat_id, '42')
+
+    def test_per_row_errors(self):
+        resp = self.post(self.test_staff_user, {
+            'create': [{'customer_id': self.test_user.id},
+                       {'customer_id': self.test_staff_user.id, 'order_type': 'X'},
+                       {'order_type': 'R', 'color': 'red'}],
+            'update': [{'order_id': self.test_order.order_id, 'status': 'D'}, {'order_id': 0}],
+        })
+        self.assertEqual(resp.status_code, 400)
+        errors = resp.json()['errors']
+        self.assertEqual([row['index'] for row in errors['create']], [1, 2])
+        self.assertEqual(set(errors['create'][0]['errors']), {'customer_id', 'order_type'})
+        self.assertEqual(set(errors['create'][1]['errors']), {'customer_id', 'color'})
+        self.assertEqual(errors['update'], [{'index': 1, 'errors': {'order_id': ['Invalid pk "0" - object does not exist.']}}])
+        self.assertEqual(Order.objects.count(), 1)
+        self.test_order.refresh_from_db()
+        self.assertEqual(self.test_order.status, 'N')
+
+    def test_bool_ids_are_rejected(self):
+        resp = self.post(self.test_staff_user, {'create': [{'customer_id': True}], 'update': [{'order_id': True}]})
+        self.assertEqual(resp.status_code, 400)
+        errors = resp.json()['errors']
+        self.assertEqual(set(errors['create'][0]['errors']), {'customer_id'})
+        self.assertEqual(set(errors['update'][0]['errors']), {'order_id'})
+
+    def test_too_many_rows(self):
+        resp = self.post(self.test_staff_user, {'create': [{'customer_id': self.test_user.id}] * (bulk.MAX_ROWS + 1)})
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(Order.objects.filter(order_id__gt=self.test_order.order_id).exists())
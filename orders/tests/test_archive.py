@@ -0,0 +1,131 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from orders import archive, counters
+from orders.models import Order, OrderWorker, ArchivedOrder, Notification, OrderStatusEvent, OrderStats
+from users.models import User
+
+
+def make_old(orders, days=400):
+    Order.objects.filter(order_id__in=[order.order_id for order in orders])\
+        .update(updated_date=timezone.now() - timedelta(days=days))
+
+
+class ArchiveOrdersTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+
+    def create(self, status='D', worker=None):
+        order = Order.objects.create(customer_id=self.test_user)
+        if worker:
+            OrderWorker.objects.create(order_id=order, worker_id=worker)
+        if status != 'N':
+            order.status = status
+            order.save()
+        return order
+
+    def test_archive_old_done_orders(self):
+        old = [self.create(worker=self.test_staff_user) for _ in range(5)]
+        recent = self.create()
+        open_order = self.create(status='P')
+        make_old(old + [open_order])
+        Notification.objects.create(order_id=old[0], chat_id='1', text='done')
+        stats_before = list(OrderStats.objects.values_list('status', 'order_type', 'count'))
+
+        out = StringIO()
+        call_command('archive_orders', '--batch-size', '2', stdout=out)
+        self.assertIn('Archived 5 orders', out.getvalue())
+
+        self.assertEqual(set(Order.objects.values_list('order_id', flat=True)), {recent.order_id, open_order.order_id})
+        archived = ArchivedOrder.objects.get(order_id=old[0].order_id)
+        self.assertEqual((archived.customer_id, archived.worker_id, archived.status),
+                         (self.test_user, self.test_staff_user, 'D'))
+        self.assertFalse(OrderWorker.objects.filter(order_id__in=[order.order_id for order in old]).exists())
+        self.assertIsNone(Notification.objects.get().order_id)
+        self.assertEqual(OrderStatusEvent.objects.filter(order_id=old[0].order_id).count(), 1)
+
+        # Archiving moves rows, the statistics and counters still count them.
+        self.assertEqual(list(OrderStats.objects.values_list('status', 'order_type', 'count')), stats_before)
+        self.test_user.refresh_from_db()
+        self.assertEqual((self.test_user.orders_count, self.test_user.done_orders_count), (7, 6))
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_resume_after_partial_run(self):
+        orders = [self.create() for _ in range(3)]
+        make_old(orders)
+        order = Order.objects.get(pk=orders[0].pk)
+        ArchivedOrder.objects.create(order_id=order.order_id, customer_id=self.test_user, order_type='C', status='D',
+                                     created_date=order.created_date, updated_date=order.updated_date)
+        self.assertEqual(archive.archive(limit=1), 1)
+        self.assertEqual(archive.archive(), 2)
+        self.assertEqual(ArchivedOrder.objects.count(), 3)
+        self.assertFalse(Order.objects.exists())
+
+
+class ArchivedOrderViewsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_user2 = User.objects.create_user(email='testuser2@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        now = timezone.now()
+        cls.archived = [
+            ArchivedOrder.objects.create(order_id=1000 + i, customer_id=cls.test_user, order_type='C', status='D',
+                                         created_date=now - timedelta(days=500), worker_id=cls.test_staff_user,
+                                         updated_date=now - timedelta(days=400 - i))
+            for i in range(8)]
+        cls.hot = [Order.objects.create(customer_id=cls.test_user) for _ in range(5)]
+
+    def test_archived_hidden_by_default(self):
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('user-orders', args=[self.test_user.id]))
+        self.assertEqual(len(resp.context['order_list']), 5)
+
+    def test_include_archived(self):
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('user-orders', args=[self.test_user.id]), {'archived': '1'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context['paginator'].count, 13)
+        self.assertEqual([order.order_id for order in resp.context['order_list']],
+                         [order.order_id for order in self.archived] + [self.hot[0].order_id, self.hot[1].order_id])
+        self.assertContains(resp, self.test_staff_user.email)
+
+        resp = self.client.get(reverse('user-orders', args=[self.test_user.id]), {'archived': '1', 'page': 2})
+        self.assertEqual([order.order_id for order in resp.context['order_list']],
+                         [order.order_id for order in self.hot[2:]])
+
+    def test_worker_and_filters(self):
+        self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('user-orders', args=[self.test_staff_user.id]), {'archived': '1'})
+        self.assertEqual(resp.context['paginator'].count, 8)
+        resp = self.client.get(reverse('orders'), {'archived': '1', 'status': 'N'})
+        self.assertEqual(resp.context['paginator'].count, 5)
+
+    def test_other_customer(self):
+        self.client.login(email='testuser2@test.org', password='12345')
+        resp = self.client.get(reverse('orders'), {'archived': '1'})
+        self.assertEqual(resp.context['paginator'].count, 0)
+        resp = self.client.get(reverse('order-detail', args=[self.archived[0].order_id]))
+        self.assertEqual(resp.status_code, 403)
+
+    def test_detail_falls_back_to_archive(self):
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('order-detail', args=[self.archived[0].order_id]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context['order'], self.archived[0])
+        self.assertContains(resp, 'Archived order')
+        self.assertNotContains(resp, reverse('order-update', args=[self.archived[0].order_id]))
+
+    def test_detail_unknown_order(self):
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('order-detail', args=[99999]))
+        self.assertEqual(resp.status_code, 404)
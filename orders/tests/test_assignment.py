@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from orders import assignment, stats
+from orders.models import Order, OrderWorker, WorkerStats
+from users.models import User
+
+
+class SchedulerTest(TestCase):
+
+    def test_least_loaded_then_round_robin(self):
+        scheduler = assignment.Scheduler({1: 3, 2: 0, 3: 0}, {1: 10, 2: 20, 3: 5})
+        self.assertEqual(scheduler.pick('C'), 3)
+        self.assertEqual(scheduler.pick('C'), 2)
+        self.assertEqual(scheduler.pick('R'), 3)
+        self.assertEqual(scheduler.pick('C'), 2)
+        self.assertEqual(scheduler.pick('C'), 2)
+        self.assertEqual(scheduler.pick('C'), 1)
+
+    def test_no_workers(self):
+        self.assertIsNone(assignment.Scheduler({}, {}).pick('C'))
+
+
+class AssignmentTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user1 = User.objects.create_superuser(email='staff1@test.org', password='12345')
+        cls.test_staff_user2 = User.objects.create_superuser(email='staff2@test.org', password='12345')
+        User.objects.create_superuser(email='inactive@test.org', password='12345', is_active=False)
+        busy = Order.objects.create(customer_id=cls.test_user, order_type='R')
+        OrderWorker.objects.create(order_id=busy, worker_id=cls.test_staff_user1)
+
+    def test_assign_backlog(self):
+        orders = [Order.objects.create(customer_id=self.test_user) for _ in range(7)]
+        OrderWorker.objects.create(order_id=orders[0])
+        Order.objects.create(customer_id=self.test_user, status='D')
+
+        out = StringIO()
+        call_command('assign_orders', '--batch-size', '2', stdout=out)
+        self.assertIn('Assigned 7 orders', out.getvalue())
+        self.assertFalse(assignment.unassigned_orders().exists())
+
+        # Worker 1 already carries a repair (weight 3), so worker 2 takes the first orders.
+        workers = dict(OrderWorker.objects.filter(order_id__in=orders).values_list('order_id', 'worker_id'))
+        self.assertEqual([workers[order.order_id] for order in orders[:3]], [self.test_staff_user2.id] * 3)
+        self.assertEqual(list(workers.values()).count(self.test_staff_user1.id), 2)
+        self.assertEqual(stats.open_loads(), {self.test_staff_user1.id: 5, self.test_staff_user2.id: 5})
+
+        self.test_staff_user2.refresh_from_db()
+        self.assertEqual(self.test_staff_user2.new_orders_count, 5)
+        self.assertEqual(WorkerStats.objects.get(worker_id=self.test_staff_user2).open_count, 5)
+        self.assertEqual(dict(WorkerStats.objects.values_list('worker_id', 'open_load')), stats.open_loads())
+
+    def test_load_reads_worker_stats_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            assignment.Scheduler.load()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('orders_orderworker', queries[0]['sql'])
+
+    def test_loads_follow_type_and_status_changes(self):
+        order = Order.objects.get(orderworker__worker_id=self.test_staff_user1)
+        order.order_type = 'C'
+        order.save()
+        self.assertEqual(WorkerStats.objects.get(worker_id=self.test_staff_user1).open_load, 1)
+        order.status = 'D'
+        order.save()
+        self.assertEqual(WorkerStats.objects.get(worker_id=self.test_staff_user1).open_load, 0)
+        stats.rebuild()
+        self.assertEqual(WorkerStats.objects.get(worker_id=self.test_staff_user1).open_load, 0)
+
+    def test_round_robin_by_assignment_time(self):
+        # Reassigning an old order counts as the latest assignment, whatever its order_id.
+        old = Order.objects.create(customer_id=self.test_user, order_type='C')
+        Order.objects.create(customer_id=self.test_user, order_type='C')
+        busy = OrderWorker.objects.get(worker_id=self.test_staff_user1)
+        busy.order_id.status = 'D'
+        busy.order_id.save()
+        OrderWorker.objects.create(order_id=old, worker_id=self.test_staff_user2)
+        OrderWorker.objects.filter(order_id=old).delete()
+        scheduler = assignment.Scheduler.load()
+        self.assertEqual(scheduler.pick('C'), self.test_staff_user1.id)
+        self.assertIsNotNone(WorkerStats.objects.get(worker_id=self.test_staff_user2).last_assigned_date)
+
+    def test_limit(self):
+        for _ in range(5):
+            Order.objects.create(customer_id=self.test_user)
+        self.assertEqual(assignment.assign_backlog(batch_size=2, limit=3), 3)
+        self.assertEqual(assignment.unassigned_orders().count(), 2)
+
+    @override_settings(ORDER_AUTO_ASSIGN=True)
+    def test_auto_assign_on_create(self):
+        self.client.login(email='testuser@test.org', password='12345')
+        self.client.post(reverse('order-create'), {'order_type': 'C'})
+        order = Order.objects.latest('order_id')
+        self.assertEqual(order.orderworker.worker_id, self.test_staff_user2)
+
+    def test_staff_update_suggests_worker(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        self.client.login(email='staff1@test.org', password='12345')
+        resp = self.client.get(reverse('order-staff-update', args=[order.order_id]))
+        self.assertEqual(resp.context['order_worker_form']['worker_id'].value(), self.test_staff_user2.id)
@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from orders.models import Order, OrderWorker
+from users.models import User
+
+
+class ConditionalGetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_customer = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_user2 = User.objects.create_user(email='testuser2@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        cls.test_order = Order.objects.create(customer_id=cls.test_customer)
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(email='testuser@test.org', password='12345')
+
+    def detail(self):
+        return reverse('order-detail', args=[self.test_order.order_id])
+
+    def revalidate(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url, **headers)
+        return resp, queries
+
+    def test_order_detail_not_modified(self):
+        resp = self.client.get(self.detail())
+        self.assertEqual(resp['Cache-Control'], 'private, no-cache')
+        resp, queries = self.revalidate(self.detail(), HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b'')
+        # Session, user and the ETag query.
+        self.assertEqual(len(queries), 3)
+
+    def test_order_detail_has_no_last_modified(self):
+        resp = self.client.get(self.detail())
+        self.assertFalse(resp.has_header('Last-Modified'))
+        OrderWorker.objects.create(order_id=self.test_order, worker_id=self.test_staff_user)
+        resp = self.client.get(self.detail(),
+                               HTTP_IF_MODIFIED_SINCE=http_date(self.test_order.updated_date.timestamp()))
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, 'staff@test.org')
+
+    def test_order_detail_changes(self):
+        etag = self.client.get(self.detail())['ETag']
+        order = Order.objects.get(pk=self.test_order.pk)
+        order.status = 'P'
+        order.save()
+        resp = self.client.get(self.detail(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        etag = resp['ETag']
+        # A new worker does not touch the order row.
+        OrderWorker.objects.create(order_id=self.test_order, worker_id=self.test_staff_user)
+        resp = self.client.get(self.detail(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_etag_is_per_viewer(self):
+        etag = self.client.get(self.detail())['ETag']
+        self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(self.detail(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_forbidden_order_is_not_revalidated(self):
+        self.client.login(email='testuser2@test.org', password='12345')
+        resp = self.client.get(self.detail(), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(resp.has_header('Last-Modified'))
+
+    def test_user_orders_not_modified(self):
+        url = reverse('user-orders', args=[self.test_customer.id])
+        etag = self.client.get(url)['ETag']
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        Order.objects.create(customer_id=self.test_customer)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+    @override_settings(ORDER_LIST_CACHE_TIMEOUT=300)
+    def test_cached_list_revalidates_without_queries(self):
+        url = reverse('user-orders', args=[self.test_customer.id])
+        etag = self.client.get(url)['ETag']
+        resp, queries = self.revalidate(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertFalse([query for query in queries if 'orders_order' in query['sql']])
+
+    def test_list_etag_follows_filters_and_assignments(self):
+        url = reverse('orders')
+        etag = self.client.get(url)['ETag']
+        resp = self.client.get(url + '?status=D', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        OrderWorker.objects.create(order_id=self.test_order, worker_id=self.test_staff_user)
+        cache.clear()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_staff_list_has_no_validators(self):
+        self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('orders'))
+        self.assertFalse(resp.has_header('ETag'))
@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from orders import bulk, counters
+from orders.models import Order, OrderWorker
+from users.models import User
+
+
+class UserOrderCountersTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        cls.test_staff_user2 = User.objects.create_superuser(email='staff2@test.org', password='12345')
+
+    def counts(self, user):
+        user.refresh_from_db()
+        return [getattr(user, field) for field in counters.COUNTER_FIELDS]
+
+    def test_order_lifecycle(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        Order.objects.create(customer_id=self.test_user, status='D')
+        self.assertEqual(self.counts(self.test_user), [2, 1, 0, 1])
+
+        worker = OrderWorker.objects.create(order_id=order, worker_id=self.test_staff_user)
+        self.assertEqual(self.counts(self.test_staff_user), [1, 1, 0, 0])
+
+        order.status = 'P'
+        order.save()
+        self.assertEqual(self.counts(self.test_user), [2, 0, 1, 1])
+        self.assertEqual(self.counts(self.test_staff_user), [1, 0, 1, 0])
+
+        worker.worker_id = self.test_staff_user2
+        worker.save()
+        self.assertEqual(self.counts(self.test_staff_user), [0, 0, 0, 0])
+        self.assertEqual(self.counts(self.test_staff_user2), [1, 0, 1, 0])
+
+        order.delete()
+        self.assertEqual(self.counts(self.test_user), [1, 0, 0, 1])
+        self.assertEqual(self.counts(self.test_staff_user2), [0, 0, 0, 0])
+
+    def test_staff_update(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        self.client.login(email='staff@test.org', password='12345')
+        self.client.post(reverse('order-staff-update', args=[order.order_id]),
+                         {'order_type': 'R', 'status': 'D', 'worker_id': self.test_staff_user.id})
+        self.assertEqual(self.counts(self.test_user), [1, 0, 0, 1])
+        self.assertEqual(self.counts(self.test_staff_user), [1, 0, 0, 1])
+
+    def test_bulk_apply(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        OrderWorker.objects.create(order_id=order, worker_id=self.test_staff_user)
+        create_rows = [{'customer_id': self.test_user.id}] * 3
+        update_rows = [{'order_id': order.order_id, 'status': 'P'}]
+        errors = bulk.validate(create_rows, update_rows)
+        bulk.apply(create_rows, update_rows)
+        self.assertEqual(self.counts(self.test_user), [4, 3, 1, 0])
+        self.assertEqual(self.counts(self.test_staff_user), [1, 0, 1, 0])
+
+    def test_reconcile(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        OrderWorker.objects.create(order_id=order, worker_id=self.test_staff_user)
+        Order.objects.filter(pk=order.pk).update(status='D')
+        User.objects.filter(pk=self.test_staff_user2.pk).update(orders_count=5)
+
+        out = StringIO()
+        call_command('reconcile_order_counters', '--dry-run', stdout=out)
+        self.assertIn('3 users would be fixed', out.getvalue())
+        self.assertEqual(self.counts(self.test_staff_user2), [5, 0, 0, 0])
+
+        out = StringIO()
+        call_command('reconcile_order_counters', '--batch-size', '1', stdout=out)
+        self.assertIn('3 users fixed', out.getvalue())
+        self.assertEqual(self.counts(self.test_user), [1, 0, 0, 1])
+        self.assertEqual(self.counts(self.test_staff_user), [1, 0, 0, 1])
+        self.assertEqual(self.counts(self.test_staff_user2), [0, 0, 0, 0])
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_user_order_list_shows_counters(self):
+        Order.objects.create(customer_id=self.test_user)
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('user-orders', args=[self.test_user.id]))
+        self.assertContains(resp, 'Total: 1, new: 1')
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from orders.models import Order, OrderWorker
+from users.models import User
+
+
+class OrderExportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        for i in range(7):
+            order = Order.objects.create(customer_id=cls.test_user, status='NPD'[i % 3], description=f'Order, "{i}"')
+            OrderWorker.objects.create(order_id=order, worker_id=cls.test_staff_user)
+
+    def read(self, resp):
+        return b''.join(resp.streaming_content).decode()
+
+    def test_not_staff(self):
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('orders-export', args=['csv']))
+        self.assertEqual(resp.status_code, 403)
+
+    def test_csv(self):
+        self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('orders-export', args=['csv']))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.read(resp))))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[0]['description'], 'Order, "0"')
+        self.assertEqual(rows[0]['worker_id'], str(self.test_staff_user.id))
+
+    def test_ndjson_with_filter(self):
+        self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('orders-export', args=['ndjson']), {'status': 'D'})
+        rows = [json.loads(line) for line in self.read(resp).splitlines()]
+        self.assertEqual([row['status'] for row in rows], ['D', 'D'])
+
+    def test_invalid_filter(self):
+        self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('orders-export', args=['csv']), {'status': 'X'})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_command_to_stdout(self):
+        out = io.StringIO()
+        call_command('export_orders', '--format', 'ndjson', '--status', 'N', '--status', 'P', '--chunk-size', '2',
+                     stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 5)
+
+    def test_command_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'orders.csv')
+            call_command('export_orders', '--output', path)
+            with open(path, newline='') as f:
+                self.assertEqual(len(list(csv.DictReader(f))), 7)
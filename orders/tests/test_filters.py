@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.filters import OrderFilter
+from orders.models import Order
+from users.models import User
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class OrderFilterTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        for date in [aware(2021, 7, 24, 23, 59), aware(2021, 7, 25), aware(2021, 7, 25, 23, 59, 59),
+                     aware(2021, 7, 26), aware(2021, 7, 28, 12)]:
+            Order.objects.create(customer_id=cls.test_user, created_date=date, description=date.isoformat())
+
+    def filter(self, data):
+        return OrderFilter(data, queryset=Order.objects.order_by('created_date')).qs
+
+    def dates(self, data):
+        return [order.created_date for order in self.filter(data)]
+
+    def test_created_date_matches_whole_day(self):
+        self.assertEqual(self.dates({'created_date': '2021-07-25'}),
+                         [aware(2021, 7, 25), aware(2021, 7, 25, 23, 59, 59)])
+
+    def test_created_date_is_range_predicate(self):
+        sql = str(self.filter({'created_date': '2021-07-25'}).query)
+        self.assertNotIn('LIKE', sql.upper())
+        self.assertIn('>=', sql)
+
+    def test_created_date_range(self):
+        self.assertEqual(self.dates({'created_date_range_after': '2021-07-25', 'created_date_range_before': '2021-07-26'}),
+                         [aware(2021, 7, 25), aware(2021, 7, 25, 23, 59, 59), aware(2021, 7, 26)])
+        self.assertEqual(self.dates({'created_date_range_after': '2021-07-26'}),
+                         [aware(2021, 7, 26), aware(2021, 7, 28, 12)])
+        self.assertEqual(self.dates({'created_date_range_before': '2021-07-24'}), [aware(2021, 7, 24, 23, 59)])
+
+    def test_created_date_gt_lt(self):
+        self.assertEqual(self.dates({'created_date__gt': '2021-07-26'}), [aware(2021, 7, 28, 12)])
+        self.assertEqual(self.dates({'created_date__lt': '2021-07-25'}), [aware(2021, 7, 24, 23, 59)])
+
+    def test_created_date_uses_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plan text is checked on SQLite only.')
+        plan = OrderFilter({'created_date_range_after': '2021-07-01', 'created_date_range_before': '2021-07-31'},
+                           queryset=Order.objects.all()).qs.explain()
+        self.assertIn('order_created_date_idx', plan)
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from orders import bulk, history
+from orders.models import Order, OrderWorker, OrderStatusEvent
+from users.models import User
+
+
+class OrderStatusHistoryTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+
+    def test_status_changes_are_logged(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        self.assertFalse(OrderStatusEvent.objects.exists())
+        order.description = 'Only the description'
+        order.save()
+        self.assertFalse(OrderStatusEvent.objects.exists())
+
+        self.client.login(email='staff@test.org', password='12345')
+        self.client.post(reverse('order-staff-update', args=[order.order_id]),
+                         {'order_type': 'C', 'status': 'P', 'worker_id': self.test_staff_user.id})
+        order.refresh_from_db()
+        order.status = 'D'
+        order.save()
+
+        events = list(OrderStatusEvent.objects.order_by('id').values_list('old_status', 'status'))
+        self.assertEqual(events, [('N', 'P'), ('P', 'D')])
+        self.assertEqual(OrderStatusEvent.objects.last().changed_date, order.updated_date)
+
+    def test_history_outlives_order(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        order.status = 'D'
+        order.save()
+        order.delete()
+        self.assertEqual(OrderStatusEvent.objects.count(), 1)
+
+    def test_bulk_changes_are_logged(self):
+        orders = [Order.objects.create(customer_id=self.test_user) for _ in range(3)]
+        update_rows = [{'order_id': order.order_id, 'status': 'P'} for order in orders[:2]]
+        update_rows.append({'order_id': orders[2].order_id, 'description': 'x'})
+        errors = bulk.validate([], update_rows)
+        bulk.apply([], update_rows)
+        self.assertEqual(sorted(OrderStatusEvent.objects.values_list('order_id', flat=True)),
+                         [orders[0].order_id, orders[1].order_id])
+
+    def test_timeline(self):
+        created = timezone.now() - timedelta(hours=5)
+        order = Order.objects.create(customer_id=self.test_user, created_date=created)
+        for old_status, status, hours in (('N', 'P', 1), ('P', 'D', 4)):
+            OrderStatusEvent.objects.create(order_id=order, old_status=old_status, status=status,
+                                            changed_date=created + timedelta(hours=hours), order_created_date=created)
+        periods = history.timeline(order, now=created + timedelta(hours=6))
+        self.assertEqual([(period['status'], period['duration']) for period in periods],
+                         [('NEW', timedelta(hours=1)), ('IN_PROGRESS', timedelta(hours=3)), ('DONE', timedelta(hours=2))])
+
+    def test_detail_shows_timeline(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('order-detail', args=[order.order_id]))
+        self.assertEqual([period['status'] for period in resp.context['status_timeline']], ['NEW'])
+
+    def test_lead_time_percentiles(self):
+        now = timezone.now()
+        OrderStatusEvent.objects.bulk_create([
+            OrderStatusEvent(order_id_id=i, old_status='P', status='D', changed_date=now - timedelta(days=1),
+                             order_created_date=now - timedelta(days=1, hours=i))
+            for i in range(1, 11)])
+        OrderStatusEvent.objects.create(order_id_id=99, old_status='P', status='D', changed_date=now - timedelta(days=40),
+                                        order_created_date=now - timedelta(days=50))
+        result = history.lead_time_percentiles(days=30)
+        self.assertEqual(result['count'], 10)
+        self.assertEqual(dict(result['percentiles']),
+                         {50: timedelta(hours=5), 90: timedelta(hours=9), 95: timedelta(hours=10)})
+
+    def test_refresh_lead_times(self):
+        self.assertIsNone(history.stored_lead_times())
+        now = timezone.now()
+        OrderStatusEvent.objects.create(order_id_id=1, old_status='P', status='D', changed_date=now,
+                                        order_created_date=now - timedelta(hours=2))
+        history.refresh_lead_times(days=7)
+        stored = history.stored_lead_times()
+        self.assertEqual((stored['count'], stored['days']), (1, 7))
+        self.assertEqual(dict(stored['percentiles']), {p: timedelta(hours=2) for p in history.PERCENTILES})
+
+    def test_lead_time_uses_status_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plan text is checked on SQLite only.')
+        plan = OrderStatusEvent.objects.filter(status='D', changed_date__gte=timezone.now()).explain()
+        self.assertIn('statusevent_status_idx', plan)
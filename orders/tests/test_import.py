@@ -0,0 +1,134 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from orders.models import Order, OrderWorker
+from users.models import User, Contact
+
+
+class ImportCrmTest(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def call(self, **options):
+        out = StringIO()
+        self.err = StringIO()
+        call_command('import_crm', stdout=out, stderr=self.err, **options)
+        return out.getvalue()
+
+    def test_import_users_and_orders(self):
+        users = self.write('users.csv', 'email,first_name,last_name,is_staff,phone,city,house,telegram\n'
+                                        'customer@test.org,Ivan,Ivanov,,+79990000001,City,1,@ivan\n'
+                                        'worker@test.org,Petr,Petrov,1,,,,\n')
+        orders = self.write('orders.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'order_id': 100, 'customer_email': 'customer@test.org', 'worker_email': 'worker@test.org',
+             'order_type': 'R', 'status': 'P', 'description': 'Fix', 'created_date': '2020-10-01'},
+            {'customer_email': 'customer@test.org'},
+            {'customer_email': 'unknown@test.org'},
+        ]))
+        out = self.call(users=users, orders=orders, chunk_size=1)
+        self.assertIn('Imported 2 users', out)
+        self.assertIn('Imported 2 orders', out)
+        self.assertIn('rows/s', out)
+
+        customer = User.objects.get(email='customer@test.org')
+        self.assertFalse(customer.has_usable_password())
+        self.assertTrue(User.objects.get(email='worker@test.org').is_staff)
+        self.assertEqual(Contact.objects.get(user=customer).phone, '+79990000001')
+        self.assertFalse(Contact.objects.filter(user__email='worker@test.org').exists())
+
+        order = Order.objects.get(order_id=100)
+        self.assertEqual((order.order_type, order.status, order.created_date.day), ('R', 'P', 1))
+        self.assertEqual(OrderWorker.objects.get(order_id=order).worker_id.email, 'worker@test.org')
+        self.assertEqual(Order.objects.filter(customer_id=customer).count(), 2)
+
+    def test_import_is_idempotent_for_users(self):
+        users = self.write('users.json', json.dumps([{'email': 'customer@test.org', 'city': 'City'}]))
+        self.call(users=users)
+        self.call(users=users)
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_hashed_passwords(self):
+        User.objects.create_user(email='source@test.org', password='12345')
+        password = User.objects.get(email='source@test.org').password
+        users = self.write('users.jsonl', json.dumps({'email': 'customer@test.org', 'password': password}))
+        self.call(users=users, passwords='hashed')
+        self.assertTrue(User.objects.get(email='customer@test.org').check_password('12345'))
+
+        users = self.write('plain.jsonl', json.dumps({'email': 'plain@test.org', 'password': '12345'}))
+        with self.assertRaises(CommandError):
+            self.call(users=users, passwords='hashed')
+        self.assertFalse(User.objects.filter(email='plain@test.org').exists())
+
+    def test_unsupported_file(self):
+        with self.assertRaises(CommandError):
+            self.call(users=self.write('users.xml', ''))
+
+    def test_bad_rows_are_skipped(self):
+        users = self.write('users.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'email': 'customer@test.org'}, {'first_name': 'No email'},
+        ]))
+        orders = self.write('orders.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'order_id': 100, 'customer_email': 'customer@test.org', 'status': 'DONE', 'order_type': 'repair'},
+            {'customer_email': 'customer@test.org', 'status': 'CLOSED'},
+            {'customer_email': 'customer@test.org', 'order_type': 'X'},
+            {'customer_email': 'customer@test.org', 'created_date': 'yesterday'},
+            {'customer_email': 'customer@test.org', 'order_id': 'abc'},
+            {'customer_email': 'customer@test.org', 'worker_email': 'nobody@test.org'},
+        ]))
+        self.assertIn('Imported 1 users', self.call(users=users))
+        self.assertIn('Skipped 1 users: no email.', self.err.getvalue())
+        self.assertIn('Imported 2 orders', self.call(orders=orders))
+        err = self.err.getvalue()
+        self.assertIn('Skipped 1 orders: status not one of D, P, N.', err)
+        self.assertIn('Skipped 1 orders: order_type not one of R, M, C.', err)
+        self.assertIn('Skipped 1 orders: invalid created_date.', err)
+        self.assertIn('Skipped 1 orders: invalid order_id.', err)
+        self.assertIn('nobody@test.org', err)
+        order = Order.objects.get(order_id=100)
+        self.assertEqual((order.status, order.order_type), ('D', 'R'))
+
+        # A second run of the same file skips the rows with order_id.
+        self.assertIn('Imported 1 orders', self.call(orders=self.write('again.jsonl', json.dumps(
+            {'order_id': 100, 'customer_email': 'customer@test.org'}) + '\n' + json.dumps(
+            {'customer_email': 'customer@test.org'}))))
+        self.assertIn('Skipped 1 orders: order_id already imported.', self.err.getvalue())
+
+    def test_rows_with_wrong_types_are_skipped(self):
+        users = self.write('users.json', json.dumps([
+            {'email': 'customer@test.org', 'phone': 79990000001, 'telegram': 12345}, {'email': 42}, ['x@test.org'],
+        ]))
+        self.assertIn('Imported 1 users', self.call(users=users))
+        err = self.err.getvalue()
+        self.assertIn('Skipped 1 users: email is not a string.', err)
+        self.assertIn('Skipped 1 users: row is not an object.', err)
+        self.assertEqual(User.objects.get(email='customer@test.org').contact.phone, '79990000001')
+
+        orders = self.write('orders.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'customer_email': 'customer@test.org', 'created_date': 20240101},
+            {'customer_email': 7},
+            {'customer_email': 'customer@test.org', 'worker_email': ['worker@test.org']},
+            ['customer@test.org'],
+            {'customer_email': 'customer@test.org'},
+        ]))
+        self.assertIn('Imported 1 orders', self.call(orders=orders))
+        err = self.err.getvalue()
+        self.assertIn('Skipped 1 orders: created_date is not a string.', err)
+        self.assertIn('Skipped 1 orders: customer_email is not a string.', err)
+        self.assertIn('Skipped 1 orders: worker_email is not a string.', err)
+        self.assertIn('Skipped 1 orders: row is not an object.', err)
@@ -0,0 +1,57 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from orders.models import Order, OrderWorker
+from users.models import User
+
+
+class OrderIndexesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_worker = User.objects.create_superuser(email='worker@test.org', password='12345')
+        for i in range(20):
+            order = Order.objects.create(customer_id=cls.test_user, status='NPD'[i % 3], order_type='RMC'[i % 3])
+            OrderWorker.objects.create(order_id=order, worker_id=cls.test_worker)
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # The test tables are tiny, make the planner show which index it would take on a real table.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, *names):
+        plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in names), plan)
+
+    def test_customer_orders(self):
+        self.assertUsesIndex(Order.objects.filter(customer_id=self.test_user).order_by('updated_date', 'order_id')[:10],
+                             'order_customer_updated_idx')
+
+    def test_customer_lookup(self):
+        # The foreign key has no index of its own, deleting a user looks up the orders through this one.
+        self.assertUsesIndex(Order.objects.filter(customer_id=self.test_user), 'order_customer_updated_idx')
+
+    def test_all_orders(self):
+        self.assertUsesIndex(Order.objects.order_by('updated_date', 'order_id')[:10], 'order_updated_idx')
+
+    def test_status_filter(self):
+        self.assertUsesIndex(Order.objects.filter(status__in=['D']).order_by('updated_date', 'order_id')[:10],
+                             'order_status_updated_idx')
+
+    # SQLite takes a partial index only when the query repeats its condition as literals, Django binds parameters.
+    @skipUnless(connection.vendor == 'postgresql', 'the partial index is used on PostgreSQL only')
+    def test_open_orders(self):
+        self.assertUsesIndex(Order.objects.filter(status__in=['N', 'P']).order_by('updated_date', 'order_id')[:10],
+                             'order_open_updated_idx')
+
+    def test_order_type_filter(self):
+        self.assertUsesIndex(Order.objects.filter(order_type='R').order_by('updated_date', 'order_id')[:10],
+                             'order_type_updated_idx')
+
+    def test_worker_orders(self):
+        self.assertUsesIndex(Order.objects.filter(orderworker__worker_id=self.test_worker)
+                             .order_by('updated_date', 'order_id')[:10], 'orderworker_worker_order_idx')
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from unittest import mock
+
+import requests
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from orders import notifications
+from orders.models import Order, OrderWorker, Notification
+from users.models import User, Contact
+
+
+class OrderUpdateByStaffNotificationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345', is_sub=True)
+        cls.test_contact = Contact.objects.create(user=cls.test_user, city='City', house='1', phone='+9999999999',
+                                                  telegram='@testuser', chat_bot_id='42')
+        cls.test_staff_user = User.objects.create_superuser(email='staf@test.org', password='12345')
+        cls.test_order = Order.objects.create(customer_id=cls.test_user)
+        OrderWorker.objects.create(order_id=cls.test_order, worker_id=cls.test_staff_user)
+
+    @mock.patch('crm.telegram_bot.TelegramClient.send_message')
+    def test_update_enqueues_notification_without_sending(self, send_message):
+        self.client.login(email='staf@test.org', password='12345')
+        resp = self.client.post(reverse('order-staff-update', args=[self.test_order.order_id]),
+                                {'order_type': 'R', 'status': 'P', 'worker_id': self.test_staff_user.id})
+        self.assertRedirects(resp, reverse('order-detail', args=[self.test_order.order_id]))
+        send_message.assert_not_called()
+        notification = Notification.objects.get()
+        self.assertEqual(notification.chat_id, '42')
+        self.assertEqual(notification.status, 'P')
+        self.assertIn('IN_PROGRESS', notification.text)
+
+    def test_not_subscribed_customer_gets_no_notification(self):
+        self.test_user.is_sub = False
+        self.test_user.save(update_fields=['is_sub'])
+        self.client.login(email='staf@test.org', password='12345')
+        self.client.post(reverse('order-staff-update', args=[self.test_order.order_id]),
+                         {'order_type': 'R', 'status': 'P', 'worker_id': self.test_staff_user.id})
+        self.assertFalse(Notification.objects.exists())
+
+    def test_subscriber_without_chat_gets_no_notification(self):
+        Contact.objects.filter(pk=self.test_contact.pk).update(chat_bot_id=None)
+        self.client.login(email='staf@test.org', password='12345')
+        resp = self.client.post(reverse('order-staff-update', args=[self.test_order.order_id]),
+                                {'order_type': 'R', 'status': 'P', 'worker_id': self.test_staff_user.id})
+        self.assertEqual(resp.status_code, 302)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_subscriber_without_contact_gets_no_notification(self):
+        customer = User.objects.create_user(email='nocontact@test.org', password='12345', is_sub=True)
+        orders = [Order.objects.create(customer_id=customer),
+                  Order.objects.create(customer_id=User.objects.get(pk=self.test_user.pk))]
+        self.assertIsNone(notifications.enqueue_status_notification(orders[0]))
+        self.assertEqual(len(notifications.enqueue_status_notifications(orders)), 1)
+
+
+class SendPendingTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_order = Order.objects.create(customer_id=cls.test_user)
+
+    def setUp(self):
+        self.notification = Notification.objects.create(order_id=self.test_order, chat_id='42', text='text')
+
+    @mock.patch('crm.telegram_bot.TelegramClient.send_message', return_value={'ok': True})
+    def test_sent_notification(self, send_message):
+        self.assertEqual(notifications.send_pending(), (1, 0))
+        send_message.assert_called_once_with('42', 'text')
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, 'S')
+        self.assertIsNotNone(self.notification.sent_date)
+
+    @mock.patch('crm.telegram_bot.TelegramClient.send_message', return_value={'ok': False, 'description': 'Too Many Requests'})
+    def test_failed_notification_is_retried_with_backoff(self, send_message):
+        self.assertEqual(notifications.send_pending(), (0, 1))
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, 'P')
+        self.assertEqual(self.notification.attempts, 1)
+        self.assertEqual(self.notification.last_error, 'Too Many Requests')
+        self.assertGreater(self.notification.next_attempt_date, timezone.now() + timedelta(seconds=20))
+        self.assertEqual(notifications.send_pending(), (0, 0))
+
+    @mock.patch('crm.telegram_bot.TelegramClient.send_message', side_effect=requests.ConnectionError('timeout'))
+    def test_notification_fails_after_max_attempts(self, send_message):
+        Notification.objects.filter(pk=self.notification.pk).update(attempts=notifications.MAX_ATTEMPTS - 1)
+        notifications.send_pending()
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, 'F')
+        self.assertEqual(self.notification.last_error, 'timeout')
+
+    def test_claimed_notification_is_not_sent_twice(self):
+        batch = notifications.claim_pending(100)
+        self.assertEqual([n.pk for n in batch], [self.notification.pk])
+        self.assertEqual(notifications.claim_pending(100), [])
+        # The worker died before recording the result, the notification comes back after the claim runs out.
+        Notification.objects.filter(pk=self.notification.pk).update(next_attempt_date=timezone.now())
+        self.assertEqual(notifications.claim_pending(100)[0].attempts, 2)
+
+    def test_backoff_is_capped(self):
+        self.assertEqual(notifications.backoff(1), timedelta(seconds=notifications.BACKOFF_BASE))
+        self.assertEqual(notifications.backoff(100), timedelta(seconds=notifications.BACKOFF_MAX))
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from orders import archive, assignment, page_cache
+from orders.models import Order, OrderWorker
+from users.models import User
+
+
+@override_settings(ORDER_LIST_CACHE_TIMEOUT=300)
+class OrderListPageCacheTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_customer = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        cls.test_order = Order.objects.create(customer_id=cls.test_customer, description='first')
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(email='testuser@test.org', password='12345')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return resp, [query['sql'] for query in queries if 'orders_order' in query['sql']]
+
+    def user_orders(self, pk=None):
+        return reverse('user-orders', args=[pk or self.test_customer.id])
+
+    def test_repeated_view_skips_order_queries(self):
+        first, queries = self.get(self.user_orders())
+        self.assertTrue(queries)
+        second, queries = self.get(self.user_orders())
+        self.assertEqual(queries, [])
+        self.assertEqual(first.content, second.content)
+
+    def test_status_change_drops_page(self):
+        self.get(self.user_orders())
+        self.test_order.status = 'P'
+        self.test_order.save()
+        resp, queries = self.get(self.user_orders())
+        self.assertTrue(queries)
+        self.assertContains(resp, 'IN_PROGRESS')
+
+    def test_assignment_drops_customer_and_worker_pages(self):
+        self.client.login(email='staff@test.org', password='12345')
+        self.get(self.user_orders())
+        self.get(self.user_orders(self.test_staff_user.id))
+        OrderWorker.objects.create(order_id=self.test_order, worker_id=self.test_staff_user)
+        resp, queries = self.get(self.user_orders())
+        self.assertTrue(queries)
+        self.assertContains(resp, 'staff@test.org')
+        resp, queries = self.get(self.user_orders(self.test_staff_user.id))
+        self.assertTrue(queries)
+        self.assertContains(resp, f'Order #{self.test_order.order_id}')
+
+    def test_bulk_assignment_drops_page(self):
+        self.get(self.user_orders())
+        assignment.assign_backlog()
+        resp, queries = self.get(self.user_orders())
+        self.assertTrue(queries)
+        self.assertContains(resp, 'staff@test.org')
+
+    def test_archive_drops_page(self):
+        Order.objects.filter(pk=self.test_order.pk).update(status='D', updated_date=timezone.now() - timedelta(days=400))
+        self.get(self.user_orders())
+        archive.archive(days=365)
+        resp, queries = self.get(self.user_orders())
+        self.assertContains(resp, 'There are no orders.')
+
+    def test_pages_are_kept_per_viewer_and_query(self):
+        self.get(self.user_orders())
+        resp, queries = self.get(self.user_orders() + '?status=D')
+        self.assertTrue(queries)
+        self.client.login(email='staff@test.org', password='12345')
+        resp, queries = self.get(self.user_orders())
+        self.assertTrue(queries)
+        # Staff see the customer column.
+        self.assertContains(resp, 'Customer: ')
+
+    def test_customer_order_list_is_cached(self):
+        self.get(reverse('orders'))
+        resp, queries = self.get(reverse('orders'))
+        self.assertEqual(queries, [])
+        Order.objects.create(customer_id=self.test_customer, description='second')
+        resp, queries = self.get(reverse('orders'))
+        self.assertTrue(queries)
+
+    def test_staff_order_list_is_not_cached(self):
+        self.client.login(email='staff@test.org', password='12345')
+        self.get(reverse('orders'))
+        resp, queries = self.get(reverse('orders'))
+        self.assertTrue(queries)
+
+    @override_settings(ORDER_LIST_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        self.get(self.user_orders())
+        resp, queries = self.get(self.user_orders())
+        self.assertTrue(queries)
+        self.assertEqual(cache.get_many([page_cache.version_key(self.test_customer.id)]), {})
+
+    def test_evicted_version_does_not_match_old_pages(self):
+        key = page_cache.page_key(1, 2, '/')
+        cache.delete(page_cache.version_key(2))
+        self.assertNotEqual(page_cache.page_key(1, 2, '/'), key)
+        self.assertEqual(page_cache.page_key(1, 2, '/'), page_cache.page_key(1, 2, '/'))
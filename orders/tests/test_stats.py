@@ -0,0 +1,160 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from orders import bulk, signals, stats
+from orders.models import Order, OrderWorker, OrderStats, DailyOrderStats, WorkerStats
+from users.models import User
+
+
+def stored():
+    return ({(row.status, row.order_type): row.count for row in OrderStats.objects.exclude(count=0)},
+            {row.date: row.count for row in DailyOrderStats.objects.exclude(count=0)},
+            {row.worker_id_id: row.open_count for row in WorkerStats.objects.exclude(open_count=0)})
+
+
+def live():
+    totals = {}
+    intake = {}
+    workers = {}
+    for order in Order.objects.select_related('orderworker'):
+        key = (order.status, order.order_type)
+        totals[key] = totals.get(key, 0) + 1
+        date = timezone.localtime(order.created_date).date()
+        intake[date] = intake.get(date, 0) + 1
+        worker = getattr(order, 'orderworker', None)
+        if worker and worker.worker_id_id and order.status in stats.OPEN_STATUSES:
+            workers[worker.worker_id_id] = workers.get(worker.worker_id_id, 0) + 1
+    return totals, intake, workers
+
+
+class OrderStatsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        cls.test_staff_user2 = User.objects.create_superuser(email='staff2@test.org', password='12345')
+
+    def test_signals_follow_order_lifecycle(self):
+        order = Order.objects.create(customer_id=self.test_user, order_type='R')
+        Order.objects.create(customer_id=self.test_user, created_date=timezone.now() - timedelta(days=3))
+        worker = OrderWorker.objects.create(order_id=order, worker_id=self.test_staff_user)
+        self.assertEqual(stored(), live())
+
+        order = Order.objects.get(pk=order.pk)
+        order.status = 'P'
+        order.save()
+        order.order_type = 'M'
+        order.save()
+        self.assertEqual(stored(), live())
+
+        worker = OrderWorker.objects.get(pk=worker.pk)
+        worker.worker_id = self.test_staff_user2
+        worker.save()
+        self.assertEqual(stored()[2], {self.test_staff_user2.id: 1})
+
+        order.status = 'D'
+        order.save()
+        self.assertEqual(stored(), live())
+        self.assertEqual(stored()[2], {})
+
+        Order.objects.filter(customer_id=self.test_user).delete()
+        self.assertEqual(stored(), ({}, {}, {}))
+
+    def test_nested_muted(self):
+        with signals.muted():
+            with signals.muted():
+                pass
+            Order.objects.create(customer_id=self.test_user)
+        self.assertEqual(stored(), ({}, {}, {}))
+        Order.objects.create(customer_id=self.test_user)
+        self.assertEqual(sum(stored()[0].values()), 1)
+
+    def test_delete_open_assigned_order(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        OrderWorker.objects.create(order_id=order, worker_id=self.test_staff_user)
+        self.assertEqual(stored()[2], {self.test_staff_user.id: 1})
+        order.delete()
+        self.assertEqual(stored(), ({}, {}, {}))
+
+    def test_staff_update(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        self.client.login(email='staff@test.org', password='12345')
+        self.client.post(reverse('order-staff-update', args=[order.order_id]),
+                         {'order_type': 'R', 'status': 'P', 'worker_id': self.test_staff_user.id})
+        self.assertEqual(stored(), live())
+        self.assertEqual(stored()[0], {('P', 'R'): 1})
+
+    def test_bulk_apply(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        OrderWorker.objects.create(order_id=order, worker_id=self.test_staff_user)
+        create_rows = [{'customer_id': self.test_user.id, 'order_type': 'M'}] * 3
+        update_rows = [{'order_id': order.order_id, 'status': 'D'}]
+        errors = bulk.validate(create_rows, update_rows)
+        self.assertEqual(errors, {})
+        bulk.apply(create_rows, update_rows)
+        self.assertEqual(stored(), live())
+
+    def test_bulk_apply_after_concurrent_edit(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        OrderWorker.objects.create(order_id=order, worker_id=self.test_staff_user)
+        update_rows = [{'order_id': order.order_id, 'order_type': 'R'}]
+        self.assertEqual(bulk.validate([], update_rows), {})
+        # Changed by somebody else between the validation and the update.
+        edited = Order.objects.get(pk=order.pk)
+        edited.status = 'P'
+        edited.save()
+        bulk.apply([], update_rows)
+        self.assertEqual(stored(), live())
+        self.assertEqual(Order.objects.get(pk=order.pk).status, 'P')
+
+    def test_rebuild(self):
+        order = Order.objects.create(customer_id=self.test_user)
+        OrderWorker.objects.create(order_id=order, worker_id=self.test_staff_user)
+        Order.objects.bulk_create([Order(customer_id=self.test_user, status='D') for _ in range(3)])
+        self.assertNotEqual(stored(), live())
+        call_command('rebuild_order_stats', stdout=StringIO())
+        self.assertEqual(stored(), live())
+
+
+class OrderStatsViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        for status in 'NNPD':
+            order = Order.objects.create(customer_id=cls.test_user, status=status)
+            OrderWorker.objects.create(order_id=order, worker_id=cls.test_staff_user)
+
+    def test_not_staff(self):
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('order-stats'))
+        self.assertEqual(resp.status_code, 403)
+
+    def test_dashboard(self):
+        self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('order-stats'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, 'orders/order_stats.html')
+        self.assertEqual(resp.context['total'], 4)
+        rows = {row['status']: row['total'] for row in resp.context['status_rows']}
+        self.assertEqual(rows, {'DONE': 1, 'IN_PROGRESS': 1, 'NEW': 2})
+        self.assertEqual(resp.context['intake'][-1]['count'], 4)
+        self.assertEqual([(row.worker_id, row.open_count) for row in resp.context['workers']],
+                         [(self.test_staff_user, 3)])
+        self.assertContains(resp, 'refresh_lead_times')
+        call_command('refresh_lead_times', stdout=StringIO())
+        resp = self.client.get(reverse('order-stats'))
+        self.assertEqual(resp.context['lead_time']['days'], 30)
+
+    def test_dashboard_does_not_scan_orders(self):
+        self.client.login(email='staff@test.org', password='12345')
+        # Session, user, three aggregate tables and the stored lead times.
+        with self.assertNumQueries(6):
+            self.client.get(reverse('order-stats'))
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from orders.models import Order, OrderWorker
 from users.models import User
 from django.urls import reverse
@@ -87,6 +89,65 @@ class OrderListViewTest(TestCase):
         self.assertTrue(resp3.context['is_paginated'])
         self.assertTrue(len(resp3.context['order_list']) == 2)
 
+    def test_filter_is_applied_to_list(self):
+        Order.objects.filter(customer_id=self.test_user1, description__in=['1', '3']).update(status='D')
+        login = self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('orders') + '?status=D')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual({order.description for order in resp.context['order_list']}, {'1', '3'})
+        self.assertFalse(resp.context['is_paginated'])
+
+    def test_pagination_links_keep_filter(self):
+        login = self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('orders') + '?status=N')
+        self.assertContains(resp, '?status=N&amp;page=2')
+
+    def test_keyset_pagination(self):
+        self.test_user1.is_staff = True
+        self.test_user1.save(update_fields=['is_staff', ])
+        login = self.client.login(email='testuser@test.org', password='12345')
+        expected = list(Order.objects.order_by('updated_date', 'order_id').values_list('order_id', flat=True))
+        seen = []
+        pages = []
+        cursor = ''
+        while cursor is not None:
+            resp = self.client.get(reverse('orders'), {'cursor': cursor})
+            self.assertEqual(resp.status_code, 200)
+            page = [order.order_id for order in resp.context['order_list']]
+            pages.append(page)
+            seen += page
+            cursor = resp.context['page_obj'].next_cursor
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(page) for page in pages], [10, 10, 2])
+        resp = self.client.get(reverse('orders'), {'cursor': resp.context['page_obj'].previous_cursor})
+        self.assertEqual([order.order_id for order in resp.context['order_list']], pages[1])
+        self.assertTrue(resp.context['page_obj'].has_previous())
+        self.assertTrue(resp.context['page_obj'].has_next())
+
+    def test_staff_list_links_use_cursors(self):
+        self.test_user1.is_staff = True
+        self.test_user1.save(update_fields=['is_staff', ])
+        login = self.client.login(email='testuser@test.org', password='12345')
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse('orders'))
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper()])
+        self.assertIsNone(resp.context['page_obj'].paginator)
+        self.assertContains(resp, f'?cursor={resp.context["page_obj"].next_cursor}')
+        self.assertNotContains(resp, 'page=2')
+
+    def test_keyset_pagination_with_filter(self):
+        login = self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('orders'), {'cursor': '', 'order_type': 'C'})
+        self.assertEqual(len(resp.context['order_list']), 10)
+        self.assertContains(resp, f'?order_type=C&amp;cursor={resp.context["page_obj"].next_cursor}')
+        resp = self.client.get(reverse('orders'), {'cursor': resp.context['page_obj'].next_cursor, 'order_type': 'R'})
+        self.assertEqual(len(resp.context['order_list']), 0)
+
+    def test_invalid_cursor(self):
+        login = self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('orders'), {'cursor': 'invalid'})
+        self.assertEqual(resp.status_code, 404)
+
 
 class OrderDetailViewTest(TestCase):
 
@@ -141,6 +202,17 @@ class OrderDetailViewTest(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertNotEqual(resp.context['user'], self.test_order.customer_id)
 
+    def test_order_is_fetched_once(self):
+        OrderWorker.objects.create(order_id=self.test_order, worker_id=self.test_user2)
+        self.client.login(email='testuser@test.org', password='12345')
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse('order-detail', args=[self.test_order.order_id]))
+        self.assertEqual(resp.status_code, 200)
+        # The ETag check reads a few columns, the page loads the order once.
+        order_queries = [query['sql'] for query in queries if '"orders_order"."description"' in query['sql']]
+        self.assertEqual(len(order_queries), 1)
+        self.assertIn('"users_user"', order_queries[0])
+
 
 class UserOrderListView(TestCase):
 
@@ -218,6 +290,48 @@ class UserOrderListView(TestCase):
         self.assertEqual(len(resp2.context['order_list']), 1)
 
 
+class UserOrderListQueriesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_customer = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        cls.test_workers = [User.objects.create_superuser(email=f'worker{i}@test.org', password='12345')
+                            for i in range(10)]
+
+    def create_orders(self, number):
+        for i in range(number):
+            order = Order.objects.create(customer_id=self.test_customer)
+            OrderWorker.objects.create(order_id=order, worker_id=self.test_workers[i])
+
+    def count_queries(self, pk):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse('user-orders', args=[pk]))
+        self.assertEqual(resp.status_code, 200)
+        return len(queries)
+
+    def test_customer_orders_constant_queries(self):
+        self.client.login(email='staff@test.org', password='12345')
+        self.create_orders(1)
+        one = self.count_queries(self.test_customer.id)
+        self.create_orders(9)
+        self.assertEqual(self.count_queries(self.test_customer.id), one)
+
+    def test_worker_orders_constant_queries(self):
+        self.client.login(email='staff@test.org', password='12345')
+        for i in range(10):
+            OrderWorker.objects.create(order_id=Order.objects.create(customer_id=self.test_customer),
+                                       worker_id=self.test_staff_user)
+            if i == 0:
+                one = self.count_queries(self.test_staff_user.id)
+        self.assertEqual(self.count_queries(self.test_staff_user.id), one)
+
+    def test_unknown_user(self):
+        self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('user-orders', args=[0]))
+        self.assertEqual(resp.status_code, 404)
+
+
 class OrderCreate(TestCase):
 
     @classmethod
@@ -350,6 +464,11 @@ class OrderUpdateTest(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, 'orders/order_form.html')
 
+    def test_missing_order(self):
+        login = self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('order-update', args=[self.test_order.order_id + 1000]))
+        self.assertEqual(resp.status_code, 404)
+
     # Не пойму что не так с POST запросом
     def test_redirects_to_order_detail_on_success(self):
         login = self.client.login(email='testuser@test.org', password='12345')
@@ -398,6 +517,11 @@ class OrderUpdateByStaff(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, 'order_staff_update.html')
 
+    def test_missing_order(self):
+        login = self.client.login(email='staf@test.org', password='12345')
+        resp = self.client.get(reverse('order-staff-update', args=[self.test_order.order_id + 1000]))
+        self.assertEqual(resp.status_code, 404)
+
     # Не пойму что не так с POST запросом
     def test_redirects_to_order_detail_on_success(self):
         login = self.client.login(email='staf@test.org', password='12345')
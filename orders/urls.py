@@ -4,6 +4,8 @@ from django.conf.urls import url
 
 urlpatterns = [
     url(r'^orders/$', views.OrderListView.as_view(), name='orders'),
+    url(r'^orders/stats/$', views.order_stats, name='order-stats'),
+    url(r'^orders/export\.(?P<fmt>csv|ndjson)$', views.order_export, name='orders-export'),
     url(r'^order/(?P<pk>\d+)$', views.OrderDetailView.as_view(), name='order-detail'),
     url(r'^user/(?P<pk>\d+)/orders/$', views.UserOrderListView.as_view(), name='user-orders'),
 ]
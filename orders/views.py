@@ -1,78 +1,209 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpResponse, HttpResponseRedirect
-from django.shortcuts import render
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.http import Http404, HttpResponse, HttpResponseRedirect, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import render, get_object_or_404
 from django.views import generic
-from crm import telegram_bot
+from crm.conditional import ConditionalGetMixin, make_etag
+from crm.pagination import ApproximateCountPaginator, KeysetPaginationMixin
+from orders import archive, assignment, export, history, page_cache, stats
 from orders.filters import OrderFilter
 from orders.forms import CustomerOrderForm, StaffOrderForm, OrderWorkerForm, OrderCreateForm
-from orders.models import Order, OrderWorker
+from orders.models import Order, OrderWorker, ArchivedOrder
+from orders.notifications import enqueue_status_notification
 from users.models import User
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy, reverse
 
 
-class OrderListView(LoginRequiredMixin, generic.ListView):
+def list_validators(request, queryset):
+    # The page is a slice of the filtered orders, they all are covered. Assignments do not touch the orders,
+    # the sum of the worker ids changes with them.
+    values = OrderFilter(request.GET, queryset=queryset).qs.order_by()\
+        .aggregate(last=Max('updated_date'), count=Count('order_id'), workers=Sum('orderworker__worker_id'))
+    return make_etag(request.user.id, request.get_full_path(), *values.values()), values['last']
+
+
+class ArchivedOrdersMixin:
+    # `?archived=1` adds the archived orders to the list, they are left out by default.
+    archived_kwarg = 'archived'
+
+    def include_archived(self):
+        return self.request.GET.get(self.archived_kwarg) == '1'
+
+    def with_archived(self, queryset, archived, hot_related=(), archived_related=()):
+        if not self.include_archived():
+            return queryset
+        archived = OrderFilter(self.request.GET, queryset=archived).qs
+        return archive.CombinedOrders(queryset, archived, self.keyset_fields, hot_related, archived_related)
+
+
+class CachedPageMixin:
+    # Rendered pages are kept per viewer, listed user and query string, orders.signals drop them when
+    # the listed user's orders change. cached_user_id() returning None leaves the page uncached.
+    page_key = None
+
+    def cached_user_id(self):
+        return None
+
+    def cached_page(self):
+        if not hasattr(self, '_cached_page'):
+            user_id = self.cached_user_id()
+            if user_id is not None and settings.ORDER_LIST_CACHE_TIMEOUT:
+                self.page_key = page_cache.page_key(self.request.user.id, user_id, self.request.get_full_path())
+            self._cached_page = self.page_key and page_cache.get_page(self.page_key)
+        return self._cached_page
+
+    def get(self, request, *args, **kwargs):
+        page = self.cached_page()
+        if page:
+            return HttpResponse(page['content'])
+        response = super().get(request, *args, **kwargs)
+        if self.page_key and response.status_code == 200:
+            # The ETag and Last-Modified of the page are kept with it, a cached page needs no query at all.
+            validators = getattr(self, 'validators', (None, None))
+            response.add_post_render_callback(lambda rendered: page_cache.set_page(
+                self.page_key, {'content': rendered.content, 'validators': validators}))
+        return response
+
+
+class OrderListView(LoginRequiredMixin, ConditionalGetMixin, CachedPageMixin, KeysetPaginationMixin,
+                    ArchivedOrdersMixin, generic.ListView):
     model = Order
     paginate_by = 10
+    paginator_class = ApproximateCountPaginator
+    keyset_fields = ('updated_date', 'order_id')
+
+    def keyset_by_default(self):
+        # The staff list spans the whole table, COUNT(*) and OFFSET would read all of it.
+        return self.request.user.is_staff
+
+    def cached_user_id(self):
+        # The staff list shows every order, any change would drop it.
+        return None if self.request.user.is_staff else self.request.user.id
+
+    def get_validators(self):
+        if self.request.user.is_staff or self.include_archived():
+            return None, None
+        if self.cached_page():
+            return self.cached_page()['validators']
+        return list_validators(self.request, Order.objects.filter(customer_id=self.request.user.id))
 
     def get_filter(self):
-        filter = OrderFilter(self.request.GET, queryset=Order.objects.all())
+        if not self.request.user.is_staff:
+            queryset = Order.objects.filter(customer_id=self.request.user.id)
+        else:
+            queryset = Order.objects.all()
+        filter = OrderFilter(self.request.GET, queryset=queryset.order_by(*self.keyset_fields))
         return filter
 
     def get_context_data(self, **kwargs):
         context = super(OrderListView, self).get_context_data(**kwargs)
-        filter = self.get_filter()
-        context['filter'] = filter
+        context['filter'] = self.filter
         return context
 
     def get_queryset(self):
-        if self.request.user:
-            if not self.request.user.is_staff:
-                id = self.request.user.id
-                return Order.objects.filter(customer_id=id).order_by('updated_date')
-            else:
-                return super().get_queryset()
+        self.filter = self.get_filter()
+        if self.request.user.is_staff:
+            archived = ArchivedOrder.objects.all()
+        else:
+            archived = ArchivedOrder.objects.filter(customer_id=self.request.user.id)
+        return self.with_archived(self.filter.qs, archived)
 
 
-class OrderDetailView(LoginRequiredMixin, generic.DetailView):
+class OrderDetailView(LoginRequiredMixin, ConditionalGetMixin, generic.DetailView):
     model = Order
+    # Archived orders are rendered with the same template.
+    template_name = 'orders/order_detail.html'
+    context_object_name = 'order'
 
     def get(self, request, *args, **kwargs):
-        order = Order.objects.get(order_id=self.kwargs['pk'])
-        if not self.request.user.is_staff and self.request.user.id != order.customer_id_id:
+        self.object = self.get_object()
+        if not self.request.user.is_staff and self.request.user.id != self.object.customer_id_id:
             return HttpResponse('<h1>403 Forbidden</h1>', status=403,)
         else:
-            return super().get(self, request, *args, **kwargs)
+            return self.render_to_response(self.get_context_data(object=self.object))
+
+    def get_queryset(self):
+        return Order.objects.select_related('customer_id', 'orderworker__worker_id')
+
+    def get_validators(self):
+        pk = self.kwargs['pk']
+        row = Order.objects.filter(order_id=pk).values_list('customer_id', 'updated_date', 'orderworker__worker_id')\
+            .first()
+        archived = row is None
+        if archived:
+            row = ArchivedOrder.objects.filter(order_id=pk).values_list('customer_id', 'updated_date', 'worker_id')\
+                .first()
+        user = self.request.user
+        if row is None or not user.is_staff and user.id != row[0]:
+            return None, None
+        # No Last-Modified: assigning a worker does not touch updated_date, the ETag covers the worker.
+        return make_etag(user.id, pk, archived, *row), None
+
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            return get_object_or_404(ArchivedOrder.objects.select_related('customer_id', 'worker_id'),
+                                     order_id=self.kwargs['pk'])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['status_timeline'] = history.timeline(self.object)
+        return context
 
 
-class UserOrderListView(LoginRequiredMixin, generic.ListView):
+class UserOrderListView(LoginRequiredMixin, ConditionalGetMixin, CachedPageMixin, KeysetPaginationMixin,
+                        ArchivedOrdersMixin, generic.ListView):
     model = Order
 
     template_name = 'orders/user_order_list.html'
     paginate_by = 10
     pk_url_kwarg = 'pk'
+    keyset_fields = ('updated_date', 'order_id')
+
+    def cached_user_id(self):
+        return int(self.kwargs[self.pk_url_kwarg])
+
+    def orders_of(self, pk, is_staff):
+        if is_staff:
+            return Order.objects.filter(orderworker__worker_id=pk), ArchivedOrder.objects.filter(worker_id=pk)
+        return Order.objects.filter(customer_id=pk), ArchivedOrder.objects.filter(customer_id=pk)
+
+    def get_validators(self):
+        pk = int(self.kwargs[self.pk_url_kwarg])
+        user = self.request.user
+        if self.include_archived() or not user.is_staff and user.id != pk:
+            return None, None
+        if self.cached_page():
+            return self.cached_page()['validators']
+        is_staff = user.is_staff if user.id == pk else \
+            User.objects.filter(id=pk).values_list('is_staff', flat=True).first()
+        if is_staff is None:
+            return None, None
+        return list_validators(self.request, self.orders_of(pk, is_staff)[0])
 
     def get_context_data(self, **kwargs):
         context = super(UserOrderListView, self).get_context_data(**kwargs)
-        pk = self.kwargs.get(self.pk_url_kwarg)
-        filter = OrderFilter(self.request.GET, queryset=self.get_queryset())
-        context['filter'] = filter
-        context['lookup_user'] = User.objects.get(id=pk)
+        context['filter'] = self.filter
+        context['lookup_user'] = self.lookup_user
         return context
 
     def get_queryset(self):
         pk = self.kwargs.get(self.pk_url_kwarg)
-        if self.request.user:
-            if not self.request.user.is_staff and self.request.user.id != int(pk):
-                return []
-            else:
-                lookup_user = User.objects.get(id=pk)
-                if lookup_user.is_staff:
-                    return Order.objects.filter(orderworker__worker_id=pk).order_by('updated_date')
-                else:
-                    return Order.objects.filter(customer_id=pk).order_by('updated_date')
+        self.lookup_user = get_object_or_404(User, id=pk)
+        if not self.request.user.is_staff and self.request.user.id != int(pk):
+            queryset = Order.objects.none()
+            archived = ArchivedOrder.objects.none()
+        else:
+            queryset, archived = self.orders_of(pk, self.lookup_user.is_staff)
+        queryset = queryset.select_related('customer_id', 'orderworker__worker_id')
+        self.filter = OrderFilter(self.request.GET, queryset=queryset.order_by(*self.keyset_fields))
+        return self.with_archived(self.filter.qs, archived, ('customer_id', 'orderworker__worker_id'),
+                                  ('customer_id', 'worker_id'))
 
 
 class OrderCreate(LoginRequiredMixin, CreateView):
@@ -86,6 +217,12 @@ class OrderCreate(LoginRequiredMixin, CreateView):
         form.base_fields['customer_id'].initial = self.request.user.id
         return form
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if settings.ORDER_AUTO_ASSIGN:
+            assignment.assign_order(self.object)
+        return response
+
 
 @login_required
 def order_create_by_staff(request):
@@ -98,7 +235,8 @@ def order_create_by_staff(request):
 
         if order_form.is_valid():
             new_data = order_form.save()
-            new_data.save()
+            if settings.ORDER_AUTO_ASSIGN:
+                assignment.assign_order(new_data)
             return HttpResponseRedirect(reverse('order-detail', args=[new_data.order_id]))
 
     else:
@@ -115,7 +253,7 @@ class OrderUpdate(LoginRequiredMixin, UpdateView):
         return CustomerOrderForm
 
     def get(self, request, *args, **kwargs):
-        order = Order.objects.get(order_id=self.kwargs['pk'])
+        order = get_object_or_404(Order, order_id=self.kwargs['pk'])
         if not self.request.user.is_staff and self.request.user != order.customer_id:
             return HttpResponse('<h1>403 Forbidden</h1>', status=403,)
         else:
@@ -128,33 +266,27 @@ def order_update_by_staff(request, pk):
     if not request.user.is_staff:
         return HttpResponse('<h1>403 Forbidden</h1>', status=403, )
 
-    lookup_order = Order.objects.get(order_id=pk)
-    try:
-        order_worker = OrderWorker.objects.get(order_id=pk)
-    except ObjectDoesNotExist:
-        order_worker = OrderWorker.objects.create(order_id=lookup_order)
+    lookup_order = get_object_or_404(Order, order_id=pk)
+    order_worker, _ = OrderWorker.objects.get_or_create(order_id=lookup_order)
 
     if request.method == 'POST':
         order_form = StaffOrderForm(request.POST, instance=lookup_order)
         order_worker_form = OrderWorkerForm(request.POST, instance=order_worker)
 
         if order_form.is_valid() and order_worker_form.is_valid():
-            new_data = order_form.save(commit=False)
-            new_data.save()
-            worker = order_worker_form.save()
-            worker.save()
-
-            if new_data.customer_id.is_sub:
-                message = f'Order #{new_data.order_id} {new_data.get_order_type_display()}\n' \
-                          f'Status: {new_data.get_status_display()} ' \
-                          f'{new_data.updated_date.strftime("%d %b, %Y - %Hh%Mm")}'
-                telegram_bot.send_message(new_data.customer_id.contact.chat_bot_id, message)
+            with transaction.atomic():
+                new_data = order_form.save()
+                order_worker_form.save()
+                enqueue_status_notification(new_data)
 
             return HttpResponseRedirect(reverse('order-detail', kwargs={'pk': pk}))
 
     else:
         order_form = StaffOrderForm(instance=lookup_order)
-        order_worker_form = OrderWorkerForm(instance=order_worker)
+        initial = None
+        if order_worker.worker_id_id is None and lookup_order.status == 'N':
+            initial = {'worker_id': assignment.Scheduler.load().pick(lookup_order.order_type)}
+        order_worker_form = OrderWorkerForm(instance=order_worker, initial=initial)
 
     context = {'order_form': order_form, 'order_worker_form': order_worker_form, 'lookup_order': lookup_order, 'pk': pk}
     return render(request, 'order_staff_update.html', context)
@@ -164,3 +296,30 @@ class OrderDelete(LoginRequiredMixin, DeleteView):
 
     model = Order
     success_url = reverse_lazy('orders')
+
+
+@login_required
+def order_export(request, fmt):
+
+    if not request.user.is_staff:
+        return HttpResponse('<h1>403 Forbidden</h1>', status=403, )
+
+    filter = OrderFilter(request.GET, queryset=Order.objects.all())
+    if not filter.is_valid():
+        return HttpResponseBadRequest(filter.errors.as_text())
+
+    content_type = export.FORMATS[fmt][1]
+    response = StreamingHttpResponse(export.export(filter.qs, fmt), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="orders.{fmt}"'
+    return response
+
+
+@login_required
+def order_stats(request):
+
+    if not request.user.is_staff:
+        return HttpResponse('<h1>403 Forbidden</h1>', status=403, )
+
+    context = stats.summary()
+    context['lead_time'] = history.stored_lead_times()
+    return render(request, 'orders/order_stats.html', context)
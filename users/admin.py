@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, Contact
+from .models import User, Contact, TelegramChat
 
 
 @admin.register(Contact)
@@ -10,3 +10,9 @@ class ContactAdmin(admin.ModelAdmin):
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(TelegramChat)
+class TelegramChatAdmin(admin.ModelAdmin):
+    list_display = ('username', 'chat_id', 'updated_date')
+    search_fields = ('username',)
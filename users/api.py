@@ -0,0 +1,37 @@
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import permissions, viewsets
+
+from crm.api import CursorPagination
+from users.filters import UserFilter
+from users.models import User, Contact
+from users.serializers import UserSerializer, ContactSerializer
+
+
+class IdPagination(CursorPagination):
+    ordering = ('id',)
+
+
+class UserViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = UserSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = IdPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UserFilter
+
+    def get_queryset(self):
+        queryset = User.objects.select_related('contact')
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(id=self.request.user.id)
+        return queryset
+
+
+class ContactViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = ContactSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = IdPagination
+
+    def get_queryset(self):
+        queryset = Contact.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user=self.request.user.id)
+        return queryset
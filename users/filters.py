@@ -1,17 +1,44 @@
 import django_filters
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Lower
+
 from users.models import User, USER_TYPE_CHOICES
 
+# Sorts after any other character, so [value, value + PREFIX_END) is the range of strings starting with value.
+PREFIX_END = '\U0010ffff'
 
-class UserFilter(django_filters.FilterSet):
 
-    def __init__(self, *args, **kwargs):
-        super(UserFilter, self).__init__(*args, **kwargs)
-        self.queryset = User.objects.select_related('contact').all()
+def prefix_range(field, value):
+    return Q(**{f'{field}__gte': value, f'{field}__lt': value + PREFIX_END})
+
+
+def is_postgresql(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+class UserFilter(django_filters.FilterSet):
+    # On PostgreSQL substring search is served by the pg_trgm indexes from users/migrations/0010,
+    # elsewhere the filters fall back to prefix search over the indexes declared in the models' Meta.
 
     is_staff = django_filters.MultipleChoiceFilter(choices=USER_TYPE_CHOICES)
-    email = django_filters.CharFilter(lookup_expr='icontains')
-    contact__phone = django_filters.CharFilter(label='Phone contains:', lookup_expr='icontains')
+    email = django_filters.CharFilter(method='filter_email')
+    contact__phone = django_filters.CharFilter(label='Phone:', method='filter_phone')
 
     class Meta:
         model = User
         fields = ['is_staff', 'email', 'contact__phone']
+
+    def filter_email(self, queryset, name, value):
+        if is_postgresql(queryset):
+            return queryset.filter(email__icontains=value)
+        return queryset.annotate(email_lower=Lower('email')).filter(prefix_range('email_lower', value.lower()))
+
+    def filter_phone(self, queryset, name, value):
+        if is_postgresql(queryset):
+            return queryset.filter(contact__phone__icontains=value)
+        value = value.strip()
+        condition = prefix_range('contact__phone', value)
+        if not value.startswith('+'):
+            condition |= prefix_range('contact__phone', f'+{value}')
+        return queryset.filter(condition)
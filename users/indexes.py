@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class LowerIndex(models.Index):
+    """Index over LOWER(column) of each field, Django 3.1 has no expression indexes."""
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        statement = super().create_sql(model, schema_editor, using=using, **kwargs)
+        statement.parts['columns'] = ', '.join(
+            f'LOWER({schema_editor.quote_name(model._meta.get_field(field_name).column)})'
+            for field_name, _ in self.fields_orders
+        )
+        return statement
+
+
+class SQLiteIndex(models.Index):
+    """Index created on SQLite only.
+
+    It backs the prefix search fallback of users.filters. PostgreSQL searches through the pg_trgm indexes
+    from users/migrations/0010 instead, there this index would never be used and only slow down writes.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'sqlite':
+            return self.skip_sql(schema_editor)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != 'sqlite':
+            return self.skip_sql(schema_editor)
+        return super().remove_sql(model, schema_editor, **kwargs)
+
+    def skip_sql(self, schema_editor):
+        # The schema editor executes whatever is returned, dropping a missing index is a no-op.
+        return f'DROP INDEX IF EXISTS {schema_editor.quote_name(self.name)}'
+
+
+class SQLiteLowerIndex(SQLiteIndex, LowerIndex):
+    """LowerIndex created on SQLite only."""
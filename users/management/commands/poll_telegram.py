@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from users import telegram
+
+
+class Command(BaseCommand):
+    help = ('Read new Telegram bot updates and index chat ids by username. '
+            'In webhook mode Telegram refuses getUpdates, so the webhook queue is processed instead.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep long-polling until interrupted.')
+        parser.add_argument('--timeout', type=int, default=30, help='Long-polling timeout in seconds.')
+
+    def handle(self, *args, **options):
+        if settings.TELEGRAM_WEBHOOK_SECRET:
+            call_command('process_telegram_updates', loop=options['loop'], stdout=self.stdout)
+            return
+        if not options['loop']:
+            self.stdout.write(f'Processed updates: {telegram.sync_updates()}')
+            return
+        while True:
+            received = telegram.poll_updates(poll_timeout=options['timeout'])
+            if received:
+                self.stdout.write(f'Processed updates: {received}')
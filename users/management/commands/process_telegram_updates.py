@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users import telegram
+
+
+class Command(BaseCommand):
+    help = 'Process Telegram updates queued by the webhook.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help='Keep processing the queue until interrupted.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = telegram.process_all_updates(options['batch_size'])
+            if processed:
+                self.stdout.write(f'Processed updates: {processed}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
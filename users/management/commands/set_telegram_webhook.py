@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from crm import telegram_bot
+
+
+class Command(BaseCommand):
+    help = 'Point the Telegram bot webhook at this site, or remove it with --delete.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', nargs='?', help='Public URL of the telegram-webhook view.')
+        parser.add_argument('--delete', action='store_true', help='Remove the webhook and go back to polling.')
+
+    def handle(self, *args, **options):
+        client = telegram_bot.get_client()
+        if options['delete']:
+            response = client.delete_webhook()
+        else:
+            if not options['url']:
+                raise CommandError('Webhook url is required.')
+            if not settings.TELEGRAM_WEBHOOK_SECRET:
+                raise CommandError('Set DJANGO_TELEGRAM_WEBHOOK_SECRET first.')
+            response = client.set_webhook(options['url'], settings.TELEGRAM_WEBHOOK_SECRET)
+        if not response.get('ok'):
+            raise CommandError(response.get('description', 'Telegram request failed.'))
+        self.stdout.write(response.get('description', 'OK'))
@@ -0,0 +1,29 @@
+# Generated by Django 3.1.2 on 2026-10-18 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_auto_20210727_1735'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelegramChat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150, unique=True, verbose_name='Telegram username')),
+                ('chat_id', models.TextField(verbose_name='chat_id')),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TelegramOffset',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('update_id', models.BigIntegerField(default=0, verbose_name='Last processed update_id')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.1.2 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_telegram_chat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelegramUpdate',
+            fields=[
+                ('update_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('payload', models.TextField()),
+                ('received_date', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+POSTGRESQL_INDEXES = [
+    ('users_user_email_trgm_idx', 'users_user', 'UPPER(email::text) gin_trgm_ops'),
+    ('users_contact_phone_trgm_idx', 'users_contact', 'UPPER(phone::text) gin_trgm_ops'),
+]
+
+
+class PostgreSQLRunSQL(migrations.RunSQL):
+    # Trigram indexes exist only on PostgreSQL and have no model state counterpart,
+    # the portable indexes are declared in the models' Meta.indexes.
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0009_telegram_update'),
+    ]
+
+    # icontains is compiled to UPPER(column::text) LIKE UPPER(%s), the trigram indexes cover that expression.
+    operations = [
+        PostgreSQLRunSQL('CREATE EXTENSION IF NOT EXISTS pg_trgm', migrations.RunSQL.noop),
+    ] + [
+        PostgreSQLRunSQL(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin ({expression})',
+            f'DROP INDEX CONCURRENTLY IF EXISTS {name}',
+        )
+        for name, table, expression in POSTGRESQL_INDEXES
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.1.2 on 2026-10-18 19:24
+
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+STATUS_FIELDS = {'N': 'new_orders_count', 'P': 'in_progress_orders_count', 'D': 'done_orders_count'}
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Order = apps.get_model('orders', 'Order')
+    OrderWorker = apps.get_model('orders', 'OrderWorker')
+    counts = defaultdict(Counter)
+    for row in Order.objects.values('customer_id', 'status').annotate(count=Count('order_id')).order_by():
+        counts[row['customer_id']]['orders_count'] += row['count']
+        counts[row['customer_id']][STATUS_FIELDS[row['status']]] += row['count']
+    for row in OrderWorker.objects.filter(worker_id__isnull=False).values('worker_id', 'order_id__status')\
+            .annotate(count=Count('id')).order_by():
+        counts[row['worker_id']]['orders_count'] += row['count']
+        counts[row['worker_id']][STATUS_FIELDS[row['order_id__status']]] += row['count']
+    users = [User(id=user_id, **user_counts) for user_id, user_counts in counts.items()]
+    User.objects.bulk_update(users, ['orders_count', *STATUS_FIELDS.values()], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_search_indexes'),
+        ('orders', '0011_order_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='done_orders_count',
+            field=models.IntegerField(default=0, verbose_name='done orders'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='in_progress_orders_count',
+            field=models.IntegerField(default=0, verbose_name='orders in progress'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='new_orders_count',
+            field=models.IntegerField(default=0, verbose_name='new orders'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='orders_count',
+            field=models.IntegerField(default=0, verbose_name='orders'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.1.2 on 2026-10-18 20:23
+
+from django.db import migrations, models
+import users.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_order_counters'),
+    ]
+
+    operations = [
+        # Databases migrated before the indexes moved into the model state have them as raw SQLite indexes.
+        migrations.RunSQL(
+            ['DROP INDEX IF EXISTS users_contact_phone_idx', 'DROP INDEX IF EXISTS users_user_email_lower_idx'],
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['phone'], name='users_contact_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=users.indexes.LowerIndex(fields=['email'], name='users_user_email_lower_idx'),
+        ),
+    ]
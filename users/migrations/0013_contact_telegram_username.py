@@ -0,0 +1,28 @@
+# Generated by Django 3.1.2 on 2026-10-18 20:25
+
+from django.db import migrations, models
+
+
+def fill_telegram_username(apps, schema_editor):
+    Contact = apps.get_model('users', 'Contact')
+    contacts = []
+    for contact in Contact.objects.exclude(telegram__isnull=True).only('id', 'telegram').iterator():
+        contact.telegram_username = (contact.telegram or '').strip().lstrip('@').lower()
+        contacts.append(contact)
+    Contact.objects.bulk_update(contacts, ['telegram_username'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_search_index_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='telegram_username',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=150, verbose_name='Telegram username'),
+        ),
+        migrations.RunPython(fill_telegram_username, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.2 on 2026-10-18 20:45
+
+from django.db import migrations
+import users.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_contact_telegram_username'),
+    ]
+
+    operations = [
+        # Drops the prefix indexes created on PostgreSQL by 0012, they are recreated on SQLite only.
+        migrations.RemoveIndex(
+            model_name='contact',
+            name='users_contact_phone_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='users_user_email_lower_idx',
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=users.indexes.SQLiteIndex(fields=['phone'], name='users_contact_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=users.indexes.SQLiteLowerIndex(fields=['email'], name='users_user_email_lower_idx'),
+        ),
+    ]
@@ -3,6 +3,13 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.urls import reverse
 
+from users.indexes import SQLiteIndex, SQLiteLowerIndex
+
+
+def normalize_username(username):
+    return (username or '').strip().lstrip('@').lower()
+
+
 USER_TYPE_CHOICES = (
     (True, 'worker'),
     (False, 'customer'),
@@ -51,6 +58,16 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField('active', default=True)
     is_verified = models.BooleanField('verified', default=False)
     verification_uuid = models.UUIDField('Unique Verification UUID', default=uuid.uuid4)
+    # Orders the user placed or is assigned to, kept up to date by orders.counters.
+    orders_count = models.IntegerField('orders', default=0)
+    new_orders_count = models.IntegerField('new orders', default=0)
+    in_progress_orders_count = models.IntegerField('orders in progress', default=0)
+    done_orders_count = models.IntegerField('done orders', default=0)
+
+    class Meta:
+        indexes = [
+            SQLiteLowerIndex(fields=['email'], name='users_user_email_lower_idx'),
+        ]
 
     def __str__(self):
         return f'{self.email}'
@@ -61,6 +78,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     def get_absolute_url(self):
         return reverse('user-detail', args=[str(self.id)])
 
+    @property
+    def open_orders_count(self):
+        return self.new_orders_count + self.in_progress_orders_count
+
 
 class Contact(models.Model):
 
@@ -74,9 +95,52 @@ class Contact(models.Model):
     phone = models.CharField(max_length=20, verbose_name='Phone')
     telegram = models.CharField(max_length=150, verbose_name='Telegram', null=True)
     chat_bot_id = models.TextField(verbose_name='chat_bot_id', null=True)
+    # Lowercase username without "@", bot updates are matched against it.
+    telegram_username = models.CharField(max_length=150, verbose_name='Telegram username', db_index=True,
+                                         blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            SQLiteIndex(fields=['phone'], name='users_contact_phone_idx'),
+        ]
 
     def __str__(self):
         return f'{self.phone}'
 
+    def save(self, *args, **kwargs):
+        self.telegram_username = normalize_username(self.telegram)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'telegram' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'telegram_username'}
+        super().save(*args, **kwargs)
+
     def get_address(self):
         return f'{self.city} {self.street} {self.house} {self.structure} {self.building} {self.apartment}'
+
+
+class TelegramChat(models.Model):
+
+    username = models.CharField(max_length=150, verbose_name='Telegram username', unique=True)
+    chat_id = models.TextField(verbose_name='chat_id')
+    updated_date = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'@{self.username} ({self.chat_id})'
+
+
+class TelegramOffset(models.Model):
+
+    update_id = models.BigIntegerField(verbose_name='Last processed update_id', default=0)
+
+    def __str__(self):
+        return f'{self.update_id}'
+
+
+class TelegramUpdate(models.Model):
+
+    update_id = models.BigIntegerField(primary_key=True)
+    payload = models.TextField()
+    received_date = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'Update #{self.update_id}'
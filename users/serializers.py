@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from crm.api import SparseFieldsetMixin
+from users.models import User, Contact
+
+
+class ContactSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = Contact
+        fields = ['id', 'user', 'phone', 'telegram', 'city', 'street', 'house', 'structure', 'building', 'apartment']
+
+
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    contact = ContactSerializer(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'first_name', 'last_name', 'is_staff', 'is_sub', 'contact']
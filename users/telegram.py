@@ -0,0 +1,138 @@
+import json
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from crm import telegram_bot
+from users.models import Contact, TelegramChat, TelegramOffset, TelegramUpdate, normalize_username
+
+UPDATES_LIMIT = 100
+
+
+def parse_update(payload):
+    # None for anything that is not a Telegram update, so a bad payload can not break a batch.
+    try:
+        update = json.loads(payload)
+        int(update['update_id'])
+    except (ValueError, KeyError, TypeError):
+        return None
+    for key in ('message', 'edited_message'):
+        message = update.get(key)
+        if message is not None and not (isinstance(message, dict) and isinstance(message.get('chat', {}), dict)):
+            return None
+    return update
+
+
+def extract_chats(updates):
+    chats = {}
+    for update in updates:
+        message = update.get('message') or update.get('edited_message') or {}
+        chat = message.get('chat') if isinstance(message, dict) else None
+        if not isinstance(chat, dict):
+            continue
+        username = normalize_username(chat.get('username')) if isinstance(chat.get('username'), str) else ''
+        if username and chat.get('id') is not None:
+            chats[username] = str(chat['id'])
+    return chats
+
+
+def save_chats(chats):
+    if not chats:
+        return
+    existing = TelegramChat.objects.in_bulk(list(chats), field_name='username')
+    changed = []
+    now = timezone.now()
+    for username, chat in existing.items():
+        if chat.chat_id != chats[username]:
+            chat.chat_id = chats[username]
+            chat.updated_date = now
+            changed.append(chat)
+    TelegramChat.objects.bulk_update(changed, ['chat_id', 'updated_date'])
+    TelegramChat.objects.bulk_create(
+        [TelegramChat(username=username, chat_id=chat_id) for username, chat_id in chats.items()
+         if username not in existing],
+        ignore_conflicts=True)
+
+
+def link_contacts(chats):
+    if not chats:
+        return
+    contacts = []
+    for contact in Contact.objects.filter(telegram_username__in=list(chats)):
+        chat_id = chats[contact.telegram_username]
+        if contact.chat_bot_id != chat_id:
+            contact.chat_bot_id = chat_id
+            contacts.append(contact)
+    Contact.objects.bulk_update(contacts, ['chat_bot_id'])
+
+
+def ingest_updates(updates):
+    if not updates:
+        return
+    last_update_id = max(update['update_id'] for update in updates)
+    chats = extract_chats(updates)
+    with transaction.atomic():
+        save_chats(chats)
+        link_contacts(chats)
+        TelegramOffset.objects.get_or_create(pk=1)
+        TelegramOffset.objects.filter(pk=1, update_id__lt=last_update_id).update(update_id=last_update_id)
+
+
+def poll_updates(client=None, poll_timeout=0):
+    client = client or telegram_bot.get_client()
+    offset = TelegramOffset.objects.filter(pk=1).values_list('update_id', flat=True).first()
+    response = client.get_updates(offset=offset + 1 if offset else None, limit=UPDATES_LIMIT,
+                                  poll_timeout=poll_timeout)
+    updates = response.get('result', []) if response.get('ok') else []
+    ingest_updates(updates)
+    return len(updates)
+
+
+def sync_updates(client=None):
+    # Telegram returns at most UPDATES_LIMIT updates per call, keep reading until the backlog is drained.
+    total = 0
+    while True:
+        received = poll_updates(client)
+        total += received
+        if received < UPDATES_LIMIT:
+            return total
+
+
+def enqueue_update(update_id, payload):
+    TelegramUpdate.objects.bulk_create([TelegramUpdate(update_id=update_id, payload=payload)],
+                                       ignore_conflicts=True)
+
+
+def process_queued_updates(batch_size=500):
+    with transaction.atomic():
+        queryset = TelegramUpdate.objects.order_by('update_id')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        batch = list(queryset[:batch_size])
+        # Malformed rows are dropped with the batch instead of blocking the head of the queue.
+        updates = [parse_update(update.payload) for update in batch]
+        ingest_updates([update for update in updates if update is not None])
+        TelegramUpdate.objects.filter(update_id__in=[update.update_id for update in batch]).delete()
+    return len(batch)
+
+
+def process_all_updates(batch_size=500):
+    total = 0
+    while True:
+        processed = process_queued_updates(batch_size)
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+def lookup_chat_id(username):
+    return TelegramChat.objects.filter(username=normalize_username(username))\
+        .values_list('chat_id', flat=True).first()
+
+
+def find_chat_id(username):
+    # Only the local index is read: updates come from the bot process (getUpdates or the webhook queue),
+    # a getUpdates call here would block the request and conflict with the poller's long poll.
+    if not normalize_username(username):
+        return None
+    return lookup_chat_id(username)
@@ -0,0 +1,39 @@
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from users.models import User, Contact
+
+
+class UserApiTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_staff_user = User.objects.create_superuser(email='staff@test.org', password='12345')
+        Contact.objects.create(user=cls.test_user, city='City', house='1', phone='+9999999999')
+
+    def get(self, user, url, **params):
+        token = Token.objects.get_or_create(user=user)[0]
+        return self.client.get(url, params, HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_customer_sees_only_self(self):
+        resp = self.get(self.test_user, '/api/users/')
+        results = resp.json()['results']
+        self.assertEqual([user['email'] for user in results], ['testuser@test.org'])
+        self.assertEqual(results[0]['contact']['phone'], '+9999999999')
+
+    def test_staff_sees_all_users(self):
+        resp = self.get(self.test_staff_user, '/api/users/')
+        results = resp.json()['results']
+        self.assertEqual(len(results), 2)
+        self.assertIsNone(results[1]['contact'])
+
+    def test_sparse_fields_keep_nested_fields(self):
+        resp = self.get(self.test_staff_user, f'/api/users/{self.test_user.id}/', fields='email,contact')
+        data = resp.json()
+        self.assertEqual(set(data), {'email', 'contact'})
+        self.assertIn('city', data['contact'])
+
+    def test_contacts(self):
+        self.assertEqual(len(self.get(self.test_staff_user, '/api/contacts/').json()['results']), 1)
+        self.assertEqual(len(self.get(self.test_staff_user, '/api/contacts/', fields='phone').json()['results'][0]), 1)
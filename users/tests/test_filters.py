@@ -0,0 +1,41 @@
+from django.db import connection
+from django.test import TestCase
+
+from users.filters import UserFilter
+from users.models import User, Contact
+
+
+class UserFilterTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, phone in enumerate(['+79991234567', '89997654321', '+71112223344']):
+            user = User.objects.create_user(email=f'User{i}@Test.org', password='12345')
+            Contact.objects.create(user=user, city='City', house='1', phone=phone)
+
+    def emails(self, data):
+        return sorted(user.email for user in UserFilter(data, queryset=User.objects.all()).qs)
+
+    def test_email_search(self):
+        self.assertEqual(self.emails({'email': 'user1'}), ['User1@test.org'])
+        self.assertEqual(self.emails({'email': 'USER'}), ['User0@test.org', 'User1@test.org', 'User2@test.org'])
+        self.assertEqual(self.emails({'email': 'nobody'}), [])
+
+    def test_phone_search(self):
+        self.assertEqual(self.emails({'contact__phone': '7999'}), ['User0@test.org'])
+        self.assertEqual(self.emails({'contact__phone': '+7'}), ['User0@test.org', 'User2@test.org'])
+        self.assertEqual(self.emails({'contact__phone': '8999'}), ['User1@test.org'])
+
+    def test_substring_search_on_postgresql(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Substring search needs the pg_trgm indexes.')
+        self.assertEqual(self.emails({'email': 'test.org'}), ['User0@test.org', 'User1@test.org', 'User2@test.org'])
+        self.assertEqual(self.emails({'contact__phone': '7654'}), ['User1@test.org'])
+
+    def test_search_uses_index_on_sqlite(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Prefix indexes are created on SQLite only.')
+        plan = UserFilter({'email': 'user1'}, queryset=User.objects.all()).qs.explain()
+        self.assertIn('users_user_email_lower_idx', plan)
+        plan = UserFilter({'contact__phone': '7999'}, queryset=User.objects.all()).qs.explain()
+        self.assertIn('users_contact_phone_idx', plan)
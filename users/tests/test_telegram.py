@@ -0,0 +1,152 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from users import telegram
+from users.models import User, Contact, TelegramChat, TelegramOffset, TelegramUpdate
+
+
+def make_update(update_id, username, chat_id):
+    return {'update_id': update_id,
+            'message': {'chat': {'id': chat_id, 'username': username}, 'text': 'hi'}}
+
+
+class FakeClient:
+
+    def __init__(self, updates):
+        self.updates = updates
+        self.offsets = []
+
+    def get_updates(self, offset=None, limit=100, poll_timeout=0):
+        self.offsets.append(offset)
+        result = [u for u in self.updates if offset is None or u['update_id'] >= offset][:limit]
+        return {'ok': True, 'result': result}
+
+
+class TelegramIngestTest(TestCase):
+
+    def test_normalize_username(self):
+        self.assertEqual(telegram.normalize_username(' @UserName '), 'username')
+        self.assertEqual(telegram.normalize_username(None), '')
+
+    def test_sync_reads_past_updates_window(self):
+        updates = [make_update(i, f'user{i}', i * 10) for i in range(1, 151)]
+        client = FakeClient(updates)
+        self.assertEqual(telegram.sync_updates(client), 150)
+        self.assertEqual(client.offsets, [None, 101])
+        self.assertEqual(TelegramChat.objects.count(), 150)
+        self.assertEqual(TelegramOffset.objects.get(pk=1).update_id, 150)
+        self.assertEqual(telegram.lookup_chat_id('@User150'), '1500')
+
+    def test_poll_continues_from_stored_offset(self):
+        telegram.ingest_updates([make_update(5, 'user', 1)])
+        client = FakeClient([make_update(5, 'user', 1), make_update(6, 'user', 2)])
+        self.assertEqual(telegram.poll_updates(client), 1)
+        self.assertEqual(client.offsets, [6])
+        self.assertEqual(telegram.lookup_chat_id('user'), '2')
+
+    @mock.patch('users.telegram.sync_updates')
+    def test_find_chat_id_uses_index(self, sync_updates):
+        TelegramChat.objects.create(username='user', chat_id='1')
+        self.assertEqual(telegram.find_chat_id('@user'), '1')
+        self.assertIsNone(telegram.find_chat_id(None))
+        self.assertIsNone(telegram.find_chat_id('@unknown'))
+        sync_updates.assert_not_called()
+
+
+class TelegramQueueTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user1 = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_user2 = User.objects.create_user(email='testuser2@test.org', password='12345')
+        cls.test_contact1 = Contact.objects.create(user=cls.test_user1, city='City', house='1', phone='+9999999999',
+                                                   telegram='@First_User')
+        cls.test_contact2 = Contact.objects.create(user=cls.test_user2, city='City', house='1', phone='+9999999998',
+                                                   telegram='@second_user')
+
+    def enqueue(self, *updates):
+        for update in updates:
+            telegram.enqueue_update(update['update_id'], json.dumps(update))
+
+    def test_process_queued_updates(self):
+        self.enqueue(make_update(1, 'first_user', 11), make_update(2, 'Second_User', 22), make_update(3, 'other', 33))
+        self.assertEqual(telegram.process_queued_updates(), 3)
+        self.assertFalse(TelegramUpdate.objects.exists())
+        self.assertEqual(TelegramChat.objects.count(), 3)
+        self.test_contact1.refresh_from_db()
+        self.test_contact2.refresh_from_db()
+        self.assertEqual(self.test_contact1.chat_bot_id, '11')
+        self.assertEqual(self.test_contact2.chat_bot_id, '22')
+
+    def test_malformed_rows_do_not_block_queue(self):
+        TelegramUpdate.objects.create(update_id=1, payload='{"update_id": 1, "message": "x"}')
+        TelegramUpdate.objects.create(update_id=2, payload='not json')
+        self.enqueue(make_update(3, 'first_user', 11))
+        self.assertEqual(telegram.process_all_updates(), 3)
+        self.assertFalse(TelegramUpdate.objects.exists())
+        self.assertEqual(Contact.objects.get(pk=self.test_contact1.pk).chat_bot_id, '11')
+
+    def test_process_in_batches(self):
+        self.enqueue(*[make_update(i, f'user{i}', i) for i in range(1, 6)])
+        self.assertEqual(telegram.process_all_updates(batch_size=2), 5)
+        self.assertEqual(TelegramChat.objects.count(), 5)
+        self.assertEqual(TelegramOffset.objects.get(pk=1).update_id, 5)
+
+    def test_contact_telegram_username(self):
+        self.assertEqual(self.test_contact1.telegram_username, 'first_user')
+        contact = Contact.objects.get(pk=self.test_contact1.pk)
+        contact.telegram = '@Renamed_User'
+        contact.save(update_fields=['telegram'])
+        self.assertEqual(Contact.objects.get(pk=contact.pk).telegram_username, 'renamed_user')
+
+    @override_settings(TELEGRAM_WEBHOOK_SECRET='secret')
+    @mock.patch('users.telegram.sync_updates')
+    def test_poll_command_processes_queue_in_webhook_mode(self, sync_updates):
+        self.enqueue(make_update(1, 'first_user', 11))
+        call_command('poll_telegram', stdout=StringIO())
+        self.assertFalse(TelegramUpdate.objects.exists())
+        self.assertEqual(Contact.objects.get(pk=self.test_contact1.pk).chat_bot_id, '11')
+        sync_updates.assert_not_called()
+
+    @override_settings(TELEGRAM_WEBHOOK_SECRET='secret')
+    @mock.patch('users.telegram.sync_updates')
+    def test_find_chat_id_in_webhook_mode(self, sync_updates):
+        self.enqueue(make_update(1, 'first_user', 11))
+        self.assertIsNone(telegram.find_chat_id('@first_user'))
+        telegram.process_all_updates()
+        self.assertEqual(telegram.find_chat_id('@first_user'), '11')
+        sync_updates.assert_not_called()
+
+
+class SubscribeToUpdatesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user = User.objects.create_user(email='testuser@test.org', password='12345')
+        cls.test_contact = Contact.objects.create(user=cls.test_user, city='City', house='1', phone='+9999999999',
+                                                  telegram='@TestUser')
+
+    def test_subscribe_with_known_chat(self):
+        TelegramChat.objects.create(username='testuser', chat_id='42')
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.post(reverse('confirm-subscribe'))
+        self.assertRedirects(resp, reverse('user-detail', kwargs={'pk': self.test_user.id}))
+        self.test_user.refresh_from_db()
+        self.test_contact.refresh_from_db()
+        self.assertTrue(self.test_user.is_sub)
+        self.assertEqual(self.test_contact.chat_bot_id, '42')
+
+    @mock.patch('users.telegram.sync_updates')
+    def test_subscribe_with_unknown_chat(self, sync_updates):
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.post(reverse('confirm-subscribe'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, 'sub_confirm.html')
+        self.test_user.refresh_from_db()
+        self.assertFalse(self.test_user.is_sub)
+        sync_updates.assert_not_called()
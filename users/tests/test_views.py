@@ -57,6 +57,26 @@ class UserListView(TestCase):
         self.assertTrue(resp.context['is_paginated'])
         self.assertTrue(len(resp.context['user_list']) == 1)
 
+    def test_filter_is_applied_to_list(self):
+        login = self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('users') + '?is_staff=True')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(list(resp.context['user_list']), [self.test_staf_user])
+        self.assertFalse(resp.context['is_paginated'])
+
+    def test_keyset_pagination(self):
+        login = self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('users'), {'cursor': ''})
+        self.assertEqual(len(resp.context['user_list']), 25)
+        resp = self.client.get(reverse('users'), {'cursor': resp.context['page_obj'].next_cursor})
+        self.assertEqual([user.email for user in resp.context['user_list']], ['user24@test.org'])
+        self.assertFalse(resp.context['page_obj'].has_next())
+
+    def test_exact_count_for_small_table(self):
+        login = self.client.login(email='staff@test.org', password='12345')
+        resp = self.client.get(reverse('users'))
+        self.assertEqual(resp.context['paginator'].count, 26)
+
 
 class UserDetailView(TestCase):
 
@@ -101,6 +121,23 @@ class UserDetailView(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, 'users/user_detail.html')
 
+    def test_not_modified(self):
+        self.client.login(email='testuser@test.org', password='12345')
+        resp = self.client.get(reverse('user-detail', args=[self.test_user1.id]))
+        etag = resp['ETag']
+        resp = self.client.get(reverse('user-detail', args=[self.test_user1.id]), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        Contact.objects.create(user=self.test_user1, city='City', phone='123')
+        resp = self.client.get(reverse('user-detail', args=[self.test_user1.id]), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, '123')
+
+    def test_no_etag_for_another_user(self):
+        self.client.login(email='testuser2@test.org', password='12345')
+        resp = self.client.get(reverse('user-detail', args=[self.test_user1.id]), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(resp.has_header('ETag'))
+
 
 class UserDetailUpdate(TestCase):
 
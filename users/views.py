@@ -9,16 +9,20 @@ from django.urls import reverse
 from django.views import generic
 
 import local_settings
-from crm import telegram_bot
+from crm.conditional import ConditionalGetMixin, make_etag
+from crm.pagination import ApproximateCountPaginator, KeysetPaginationMixin
+from . import telegram
 from .filters import UserFilter
 from .models import User, Contact
 from .forms import UserRegistrationForm, UserDetailForm, UserContactsForm
 
 
-class UserListView(LoginRequiredMixin, generic.ListView):
+class UserListView(LoginRequiredMixin, KeysetPaginationMixin, generic.ListView):
 
     model = User
     paginate_by = 25
+    paginator_class = ApproximateCountPaginator
+    keyset_fields = ('id',)
 
     def get(self, request, *args, **kwargs):
         if not self.request.user.is_staff:
@@ -26,15 +30,32 @@ class UserListView(LoginRequiredMixin, generic.ListView):
         else:
             return super().get(self, request, *args, **kwargs)
 
+    def get_queryset(self):
+        self.filter = UserFilter(self.request.GET, queryset=User.objects.select_related('contact').order_by('id'))
+        return self.filter.qs
+
     def get_context_data(self, **kwargs):
         context = super(UserListView, self).get_context_data(**kwargs)
-        filter = UserFilter(self.request.GET, queryset=User.objects.all())
-        context['filter'] = filter
+        context['filter'] = self.filter
         return context
 
 
-class UserDetailView(LoginRequiredMixin, generic.DetailView):
+class UserDetailView(LoginRequiredMixin, ConditionalGetMixin, generic.DetailView):
     model = User
+    # Everything the page shows, the users have no modification date.
+    etag_fields = ('first_name', 'last_name', 'email', 'is_staff', 'is_sub', 'orders_count', 'new_orders_count',
+                   'in_progress_orders_count', 'contact__phone', 'contact__telegram', 'contact__city',
+                   'contact__street', 'contact__house', 'contact__structure', 'contact__building',
+                   'contact__apartment')
+
+    def get_validators(self):
+        pk = int(self.kwargs['pk'])
+        if not self.request.user.is_staff and self.request.user.id != pk:
+            return None, None
+        values = User.objects.filter(id=pk).values_list(*self.etag_fields).first()
+        if values is None:
+            return None, None
+        return make_etag(self.request.user.id, pk, *values), None
 
     def get_context_data(self, **kwargs):
         context = super(UserDetailView, self).get_context_data(**kwargs)
@@ -104,9 +125,7 @@ def subscribe_to_updates(request):
 
     if request.method == 'POST':
         contact = Contact.objects.get(user=request.user.id)
-        telegram_bot.get_update()
-        username = contact.telegram
-        chat_id = telegram_bot.get_chat_id(username)
+        chat_id = telegram.find_chat_id(contact.telegram)
         if chat_id:
             request.user.is_sub = True
             request.user.save(update_fields=['is_sub'])